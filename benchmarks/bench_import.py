@@ -0,0 +1,75 @@
+#! /usr/bin/env python3
+
+#
+# Import-time budget for `import hz_convert`.
+#
+# Imports the package in fresh interpreters with -X importtime and reports the
+# median cumulative import time along with the slowest modules it loaded. Exits
+# with status 1 if the median is over budget or if the import loaded a module
+# that should only load on demand (NumPy, the test suite, asyncio, ...).
+#
+# Usage: python benchmarks/bench_import.py [--runs N] [--budget-ms MS]
+#
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+IMPORT_BUDGET_MS = 30.0
+DEFERRED_MODULES = ('numpy', 'test', 'unittest', 'asyncio', 'multiprocessing', 'concurrent', 're')
+
+CHECK_SCRIPT = '''
+import sys
+import hz_convert
+print(' '.join(sorted(name for name in sys.modules if name.split('.')[0] in %r)))
+''' % (DEFERRED_MODULES,)
+
+def import_once():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHECK_SCRIPT], cwd=REPO_ROOT, \
+        capture_output=True, text=True, check=True)
+
+    # Lines look like 'import time:  self [us] | cumulative | module'
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        name = fields[2].strip()
+        if name == 'site': # interpreter startup, not part of the import
+            times = {}
+        elif fields[0].strip().isdigit():
+            times[name] = int(fields[1]) / 1000
+
+    return times, result.stdout.split()
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the import time of hz_convert.')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    runs = [import_once() for _ in range(args.runs)]
+    total = statistics.median(times['hz_convert'] for times, _ in runs)
+    (times, loaded) = runs[-1]
+
+    print('import hz_convert: %.1f ms median of %i runs (budget %.1f ms)' % (total, args.runs, args.budget_ms))
+    for name in sorted(times, key=times.get, reverse=True)[1:6]:
+        print('  %-28s %6.1f ms' % (name, times[name]))
+
+    failed = False
+    if total > args.budget_ms:
+        print('[error] Import time is over budget.')
+        failed = True
+    if loaded:
+        print('[error] Import loaded deferred modules: %s' % ', '.join(loaded))
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#! /usr/bin/env python3
+
+#
+# Benchmark for the streaming MIDI file reader. Writes a generated multi-track
+# file (running status, pitch bends, a tempo track) to a temporary directory,
+# then reports events per second and the peak memory allocated while
+#   read    iterating over smf.read_notes
+#   convert converting every chunk of smf.convert_notes
+# Peak memory should not grow with --events.
+#
+# Usage: python benchmarks/bench_smf.py [--events N] [--tracks N] [--chunk N]
+#
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hz_convert import smf
+
+SEED = 2022
+
+def varlen(value):
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        encoded.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(encoded))
+
+def make_track(rng, channel, events):
+    # Notes in running status, with a pitch bend before every 16th note
+    body = bytearray()
+    for i in range(events // 2):
+        if i % 16 == 0:
+            bend = rng.randint(0, 16383)
+            body += varlen(0) + bytes([0xE0 | channel, bend & 0x7F, bend >> 7])
+            status = bytes([0x90 | channel])
+        else:
+            status = b''
+
+        key = rng.randint(36, 96)
+        body += varlen(rng.randint(0, 240)) + status + bytes([key, rng.randint(1, 127)])
+        body += varlen(rng.randint(1, 480)) + bytes([key, 0])
+
+    body += b'\x00\xff\x2f\x00'
+    return b'MTrk' + len(body).to_bytes(4, 'big') + body
+
+def write_file(path, events, tracks):
+    rng = random.Random(SEED)
+    tempo_body = b'\x00\xff\x51\x03\x07\xa1\x20' + b'\x00\xff\x2f\x00'
+
+    with open(path, 'wb') as f:
+        f.write(b'MThd' + (6).to_bytes(4, 'big') + (1).to_bytes(2, 'big') + (tracks + 1).to_bytes(2, 'big') + \
+            (480).to_bytes(2, 'big'))
+        f.write(b'MTrk' + len(tempo_body).to_bytes(4, 'big') + tempo_body)
+        for track in range(tracks):
+            f.write(make_track(rng, track % 16, events // tracks))
+
+def count_events(mode, path, chunk_size):
+    if mode == 'read':
+        return sum(1 for _ in smf.read_notes(path))
+    return sum(len(result['events']) for result in smf.convert_notes(path, chunk_size=chunk_size))
+
+def run(mode, path, chunk_size):
+    start = time.perf_counter()
+    count = count_events(mode, path, chunk_size)
+    seconds = time.perf_counter() - start
+
+    # Memory is traced in a second pass, since tracing slows the reader down
+    tracemalloc.start()
+    count_events(mode, path, chunk_size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return count, seconds, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the streaming MIDI file reader.')
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--tracks', type=int, default=8)
+    parser.add_argument('--chunk', type=int, default=smf.CHUNK_SIZE, help='events per conversion')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.mid')
+        write_file(path, args.events, args.tracks)
+        print('file: %.1f MiB, %i tracks' % (os.path.getsize(path) / 2**20, args.tracks + 1))
+
+        for mode in ('read', 'convert'):
+            (count, seconds, peak) = run(mode, path, args.chunk)
+            print('%-8s %9i events  %7.3f s  %10.0f events/s  peak %7.1f MiB' % \
+                (mode, count, seconds, count / seconds, peak / 2**20))
+
+
+if __name__ == '__main__':
+    main()
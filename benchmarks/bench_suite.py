@@ -0,0 +1,292 @@
+#! /usr/bin/env python3
+
+#
+# Benchmark suite covering every conversion path.
+#
+# Inputs are generated from fixed seeds and mix common spellings with
+# microtones, out-of-range MIDI values, non-440 references for A4, a 31-EDO
+# tuning and a just intonation scale. For each case the suite reports items
+# per second (best of several repeats) and, from one traced call, the peak
+# memory allocated and the number of memory blocks the result keeps alive per
+# item.
+#
+# Usage:
+#   python benchmarks/bench_suite.py                       # print results
+#   python benchmarks/bench_suite.py --save baseline.json  # store a baseline
+#   python benchmarks/bench_suite.py --compare baseline.json [--tolerance 0.2]
+#
+# --compare exits with status 1 if any case is slower than the baseline by more
+# than the tolerance.
+#
+
+import argparse
+import configparser
+import contextlib
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+from hz_convert import converters
+from hz_convert import scala
+from hz_convert.tracker import PitchTracker
+from hz_convert.tuning import edo
+
+try:
+    import numpy as np
+
+    from hz_convert import batch
+    from hz_convert import chords
+    from hz_convert import retune
+    from hz_convert import spectrum
+except ImportError:
+    batch = None
+
+SEED = 2022
+SIZE = 20000
+A4_VALUES = (440.0, 415.0, 442.0, 466.0)
+
+# 12-note 5-limit just intonation
+JUST_SCALE = scala.Scale('5-limit chromatic', [1200 * math.log2(ratio) for ratio in \
+    (16/15, 9/8, 6/5, 5/4, 4/3, 45/32, 3/2, 8/5, 5/3, 9/5, 15/8, 2)])
+
+# Input generation
+def make_pitch_strs(rng, count):
+    letters = 'CDEFGAB'
+    accidentals = ['', '', '', 'b', '#', 'n', 'x', 'd']
+    microtones = ['(1/2)b', '(1/2)#', '(1/4)#', '(2/3)b', '(3/2)#']
+
+    pitch_strs = []
+    for _ in range(count):
+        roll = rng.random()
+        octave = rng.randint(1, 7) if roll < 0.95 else rng.choice([-2, -1, 9, 10])
+        accidental = rng.choice(microtones) if roll < 0.1 else rng.choice(accidentals)
+        pitch_strs.append('%s%s%i' % (rng.choice(letters), accidental, octave))
+
+    return pitch_strs
+
+def make_midi_notes(rng, count):
+    return [rng.choice([
+        float(rng.randint(21, 108)),
+        round(rng.uniform(21, 108), 2),
+        round(rng.uniform(-24, 0), 2),
+        round(rng.uniform(127, 150), 2)
+    ]) for _ in range(count)]
+
+def make_hzs(rng, count):
+    return [rng.choice([
+        round(rng.uniform(27.5, 4186.0), 3),
+        round(rng.uniform(1.0, 8.0), 3),
+        round(rng.uniform(12544.0, 20000.0), 3)
+    ]) for _ in range(count)]
+
+def make_inputs(size):
+    rng = random.Random(SEED)
+    return {
+        'pitch_strs': make_pitch_strs(rng, size),
+        'midi_notes': make_midi_notes(rng, size),
+        'hzs': make_hzs(rng, size),
+        'a4': [rng.choice(A4_VALUES) for _ in range(size)]
+    }
+
+# Cases. Each returns a function of no arguments and the number of items that
+# one call processes.
+def make_cases(inputs):
+    pitch_strs = inputs['pitch_strs']
+    midi_notes = inputs['midi_notes']
+    hzs = inputs['hzs']
+    a4 = inputs['a4'][0]
+    pitches = converters.from_midi(midi_notes)['pitch']
+    tuning = edo(31)
+    scale_table = scala.ScaleTable(JUST_SCALE, a4_hz=a4)
+    tracker = PitchTracker(a4_hz=a4)
+    chord_strs = [pitch_strs[i:i + 4] for i in range(0, len(pitch_strs), 4)]
+
+    def parse_uncached():
+        converters.parse_pitch_str.cache_clear()
+        for pitch_str in pitch_strs:
+            converters.parse_pitch_str(pitch_str)
+
+    def mixed_a4():
+        for midi_note, a4_hz in zip(midi_notes, inputs['a4']):
+            converters.one_midi_to_hz(midi_note, a4_hz)
+
+    cases = {
+        'from_pitch': lambda: converters.from_pitch(pitch_strs, a4),
+        'from_midi': lambda: converters.from_midi(midi_notes, a4),
+        'from_hz': lambda: converters.from_hz(hzs, a4),
+        'from_hz_31edo': lambda: converters.from_hz(hzs, a4, tuning=tuning),
+        'scale_nearest': lambda: scale_table.from_hz(hzs),
+        'tracker_push_block': lambda: tracker.push_block(hzs),
+        'one_midi_to_hz_mixed_a4': mixed_a4,
+        'parse_pitch_str_uncached': parse_uncached,
+        'match_pitch_str': lambda: [converters.match_pitch_str(pitch_str) for pitch_str in pitch_strs],
+        'pitch_string': lambda: converters.pitch_string(pitches),
+        'hz_string': lambda: converters.hz_string(hzs),
+        'midi_string': lambda: converters.midi_string(midi_notes, microtonal=True)
+    }
+
+    if batch is not None:
+        # One bin per item for the bins case, one 65-bin frame per item for the
+        # peaks case
+        bin_mapper = spectrum.BinMapper(44100, 128, a4_hz=a4)
+        fft_rng = np.random.default_rng(SEED)
+        fft_bins = fft_rng.integers(1, bin_mapper.bin_count, len(pitch_strs))
+        fft_frames = fft_rng.random((bin_mapper.bin_count, len(pitch_strs)))
+
+        # MIDI values within reach of both playback encoders
+        score = np.clip(midi_notes, 0, 127.99)
+
+        # Historical and modern references, converted in one call
+        a4_refs = [415.0, 430.0, 432.0, 440.0, 442.0]
+
+        cases.update({
+            'batch_from_pitch': lambda: batch.batch_from_pitch(pitch_strs, a4),
+            'batch_from_midi': lambda: batch.batch_from_midi(midi_notes, a4),
+            'batch_from_hz': lambda: batch.batch_from_hz(hzs, a4),
+            'batch_from_hz_5_a4': lambda: batch.batch_from_hz(hzs, a4_refs),
+            'batch_from_midi_5_a4': lambda: batch.batch_from_midi(midi_notes, a4_refs),
+            'batch_from_hz_31edo': lambda: batch.batch_from_hz(hzs, a4, tuning=tuning),
+            'batch_from_scale': lambda: batch.batch_from_scale(hzs, scale_table),
+            'batch_pitch_names': lambda: batch.batch_from_midi(midi_notes, a4)['pitch'].names(),
+            'chords_intervals': lambda: chords.ChordArray.from_strings(chord_strs).intervals(),
+            'spectrum_bins': lambda: bin_mapper.bins(fft_bins),
+            'spectrum_peaks': lambda: bin_mapper.peaks(fft_frames),
+            'retune_bends': lambda: retune.encode_bends(score, allocation='cycle'),
+            'retune_mts': lambda: retune.encode_mts(score)
+        })
+
+    return {name: (fn, len(pitch_strs)) for name, fn in cases.items()}
+
+# Measurement
+def time_case(fn, items, repeat, min_time):
+    # Best of `repeat` runs, each calling fn enough times to take min_time
+    calls = 1
+    while True:
+        elapsed = run_calls(fn, calls)
+        if elapsed >= min_time:
+            break
+        calls *= 2
+
+    best = min([elapsed] + [run_calls(fn, calls) for _ in range(repeat - 1)])
+    return items * calls / best
+
+def run_calls(fn, calls):
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return time.perf_counter() - start
+
+def trace_case(fn, items):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    del result
+
+    return peak, blocks / items
+
+def run_suite(size, repeat, min_time, only=None):
+    inputs = make_inputs(size)
+    results = {}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+            contextlib.redirect_stderr(devnull):
+        for name, (fn, items) in make_cases(inputs).items():
+            if only and name not in only:
+                continue
+            fn() # warm up caches and imports
+            peak, blocks = trace_case(fn, items)
+            results[name] = {
+                'items_per_second': time_case(fn, items, repeat, min_time),
+                'peak_bytes_per_call': peak,
+                'retained_blocks_per_item': round(blocks, 3)
+            }
+
+    return {
+        'version': hz_convert_version(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': SEED,
+        'size': size,
+        'results': results
+    }
+
+def hz_convert_version():
+    config = configparser.ConfigParser()
+    config.read(os.path.join(REPO_ROOT, 'setup.cfg'))
+    return config.get('metadata', 'version', fallback='unknown')
+
+# Reporting
+def print_results(report, baseline=None):
+    print('hz_convert %s, Python %s, %i items per call' % (report['version'], report['python'], report['size']))
+    print('%-26s %14s %14s %10s %9s' % ('case', 'items/s', 'peak KiB/call', 'blocks/it', 'change'))
+
+    for name, result in report['results'].items():
+        change = ''
+        if baseline and name in baseline['results']:
+            change = '%+.1f%%' % (100 * (result['items_per_second'] / baseline['results'][name]['items_per_second'] - 1))
+        print('%-26s %14.0f %14.1f %10.3f %9s' % (name, result['items_per_second'], \
+            result['peak_bytes_per_call'] / 1024, result['retained_blocks_per_item'], change))
+
+def find_regressions(report, baseline, tolerance):
+    regressions = []
+
+    for name, result in report['results'].items():
+        if name in baseline['results']:
+            ratio = result['items_per_second'] / baseline['results'][name]['items_per_second']
+            if ratio < 1 - tolerance:
+                regressions.append((name, ratio))
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every hz_convert conversion path.')
+    parser.add_argument('--size', type=int, default=SIZE, help='items per call (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5, help='timing repeats (default: %(default)s)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per repeat (default: %(default)s)')
+    parser.add_argument('--only', nargs='+', help='run only these cases')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+        help='allowed slowdown before --compare fails (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = run_suite(args.size, args.repeat, args.min_time, args.only)
+    print_results(report, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+    if baseline:
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for name, ratio in regressions:
+            print('[regression] %s: %.0f%% of baseline throughput' % (name, 100 * ratio))
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
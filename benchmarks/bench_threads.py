@@ -0,0 +1,72 @@
+#! /usr/bin/env python3
+
+#
+# Benchmark for conversion from a thread pool. Converts the same random
+# frequencies with an increasing number of threads and reports throughput and
+# speedup over one thread for three paths:
+#   scalar  from_hz on one chunk per task (holds the GIL, so it cannot scale)
+#   batch   batch.batch_from_hz on one chunk per task
+#   into    binio.hz_to_midi_into over the whole array with workers=threads
+#           (the NumPy core runs without the GIL)
+#
+# Usage: python benchmarks/bench_threads.py [--values N] [--chunk N] [--threads 1 2 4 8] [--only into]
+#
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from hz_convert import batch, binio, converters
+
+SEED = 2022
+MODES = ('scalar', 'batch', 'into')
+
+def run(mode, hzs, chunk_size, threads):
+    start = time.perf_counter()
+
+    if mode == 'into':
+        binio.hz_to_midi_into(hzs, np.empty(len(hzs)), workers=threads)
+    else:
+        chunks = [hzs[i:i + chunk_size] for i in range(0, len(hzs), chunk_size)]
+        if mode == 'scalar':
+            chunks = [chunk.tolist() for chunk in chunks]
+            convert = converters.from_hz
+        else:
+            convert = batch.batch_from_hz
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(convert, chunks))
+
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark conversion throughput by thread count.')
+    parser.add_argument('--values', type=int, default=4000000)
+    parser.add_argument('--chunk', type=int, default=65536, help='values per task in the scalar and batch modes')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--only', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+
+    print('cpu count: %i, values: %i' % (os.cpu_count(), args.values))
+    hzs = np.random.default_rng(SEED).uniform(27.5, 4186.0, args.values).round(3)
+
+    for mode in args.only:
+        # The scalar path is slow, so it converts a tenth of the values
+        values = hzs[:len(hzs) // 10] if mode == 'scalar' else hzs
+
+        baseline = None
+        for threads in args.threads:
+            seconds = run(mode, values, args.chunk, threads)
+            baseline = baseline or seconds
+            print('%-6s threads %2i: %7.3f s  %12.0f values/s  speedup %.2fx' % \
+                (mode, threads, seconds, len(values) / seconds, baseline / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#! /usr/bin/env python3
+
+#
+# Benchmark for sharded multiprocess conversion (hz_convert.stream --workers).
+# Writes a file of random frequencies, converts it with an increasing number of
+# worker processes, and reports throughput and speedup over one worker.
+#
+# Usage: python benchmarks/bench_workers.py [--values N] [--workers 1 2 4 8]
+#
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hz_convert import stream
+
+SEED = 2022
+
+def write_input(path, count):
+    rng = random.Random(SEED)
+    with open(path, 'w') as f:
+        for _ in range(count):
+            f.write('%.3f\n' % rng.uniform(27.5, 4186.0))
+
+def run(path, workers):
+    columns = ['hz', 'midi', 'pitch']
+    start = time.perf_counter()
+
+    if workers == 1:
+        with open(path) as f:
+            chunks = stream.convert_chunks(stream.chunked(stream.read_tokens(f), stream.CHUNK_SIZE), 'hz', 440.0)
+            sink = CountingSink()
+            stream.write_output(chunks, columns, 'csv', sink)
+    else:
+        sink = CountingSink()
+        for text in stream.convert_file_sharded(path, 'hz', 440.0, columns, 'csv', None, \
+                stream.CHUNK_SIZE, workers):
+            sink.write(text)
+
+    return time.perf_counter() - start, sink.size
+
+class CountingSink():
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sharded multiprocess conversion.')
+    parser.add_argument('--values', type=int, default=4000000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print('cpu count: %i, values: %i' % (os.cpu_count(), args.values))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'hz.txt')
+        write_input(path, args.values)
+
+        baseline = None
+        for workers in args.workers:
+            seconds, size = run(path, workers)
+            baseline = baseline or seconds
+            print('workers %2i: %7.2f s  %10.0f values/s  speedup %.2fx  (%i bytes out)' % \
+                (workers, seconds, args.values / seconds, baseline / seconds, size))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,9 @@
+import sys
+
 import hz_convert
+
+if len(sys.argv) > 1:
+    from hz_convert import stream
+    sys.exit(stream.main(sys.argv[1:]))
+
 hz_convert.main()
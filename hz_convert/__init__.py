@@ -1,2 +1,20 @@
 from .start import main
-from .converters import Pitch, from_pitch, from_midi, from_hz
+from .converters import STD_A4, Pitch, from_pitch, from_midi, from_hz
+from .cache import enable_cache, disable_cache
+from .profiling import enable_profiling, disable_profiling
+from .diagnostics import get_diagnostics, set_range_policy
+from .tuning import EqualTemperament, edo
+
+# Submodules that need NumPy or pull in large parts of the standard library are
+# imported on first access, so that `import hz_convert` stays cheap.
+LAZY_SUBMODULES = frozenset(['batch', 'binio', 'chords', 'lut', 'retune', 'scala', 'server', 'smf', 'spectrum',
+    'stream', 'tracker'])
+
+def __getattr__(name):
+    if name in LAZY_SUBMODULES:
+        import importlib
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | LAZY_SUBMODULES)
@@ -0,0 +1,472 @@
+import math
+import numbers
+from functools import lru_cache
+
+import numpy as np
+
+from . import converters, diagnostics, output
+from .converters import OCTAVE_DIV, ST_HZ, MIDI_REF, STD_A4, Pitch
+from .spelling import get_spelling
+
+# Vectorized rounding matches round() everywhere except within this distance
+# (in units of the last kept digit) of a .5 tie. Those few elements are
+# recomputed with the scalar expressions so results match them bit for bit.
+TIE_TOL = 1e-6
+
+# Spelling of each chromatic pitch class, as assigned by converters.assign_name
+PC_LETTERS = np.array([converters.assign_name(pc)[0] for pc in range(OCTAVE_DIV)])
+PC_ACCIDENTALS = np.array([converters.assign_name(pc)[1] for pc in range(OCTAVE_DIV)])
+
+class PitchArray():
+    # Columnar counterpart of a list of Pitch objects. Pitch objects and their
+    # names are only built when an element is requested. The columns are 2-D
+    # (values x references) in results for several values of A4.
+    __slots__ = ('diatonic_pc', 'accidental', 'octave', 'cents_dev')
+
+    def __init__(self, diatonic_pc, accidental, octave, cents_dev):
+        self.diatonic_pc = diatonic_pc
+        self.accidental = accidental
+        self.octave = octave
+        self.cents_dev = cents_dev
+
+    @classmethod
+    def from_pitch_classes(cls, pitch_classes, octaves, cents_devs, note_spelling=None):
+        # octaves must already include the octave offsets of the spelling (see
+        # midi_to_pitch_columns)
+        if note_spelling is None:
+            return cls(PC_LETTERS[pitch_classes], PC_ACCIDENTALS[pitch_classes], octaves, cents_devs)
+
+        (letters, accidentals, _) = spelling_tables(note_spelling)
+        return cls(letters[pitch_classes], accidentals[pitch_classes], octaves, cents_devs)
+
+    @classmethod
+    def from_pitches(cls, pitches):
+        pitches = list(pitches)
+        return cls(
+            np.array([pitch.diatonic_pc for pitch in pitches], dtype='U1'),
+            np.array([pitch.accidental for pitch in pitches], dtype='U1'),
+            np.array([pitch.octave for pitch in pitches], dtype=np.int64),
+            np.array([pitch.cents_dev for pitch in pitches], dtype=np.float64)
+        )
+
+    def __len__(self):
+        return len(self.octave)
+
+    def __getitem__(self, index):
+        if np.ndim(self.octave[index]) == 0:
+            return Pitch(None, str(self.diatonic_pc[index]), str(self.accidental[index]), \
+                int(self.octave[index]), float(self.cents_dev[index]))
+
+        return PitchArray(self.diatonic_pc[index], self.accidental[index], \
+            self.octave[index], self.cents_dev[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return 'PitchArray(%i pitches)' % len(self)
+
+    @property
+    def shape(self):
+        return self.octave.shape
+
+    def names(self):
+        # A list of names, or a list of rows of names for 2-D columns
+        names = output.pitch_names(self.diatonic_pc.ravel().tolist(), self.accidental.ravel().tolist(), \
+            self.octave.ravel().tolist(), self.cents_dev.ravel().tolist())
+
+        if self.octave.ndim == 1:
+            return names
+
+        width = self.shape[1]
+        return [names[start:start + width] for start in range(0, len(names), width)]
+
+    def tolist(self):
+        return list(self)
+
+# Conversion functions. In tunings other than 12-TET (see hz_convert.tuning),
+# the 'midi' column holds step numbers of the tuning, and 'pitch_class' the
+# 12-TET pitch class each step is named after.
+#
+# a4_hz may also be a sequence of several references. The columns that depend
+# on A4 are then 2-D, with one row per value and one column per reference, and
+# 'a4' holds the references as an array.
+def batch_from_hz(hzs, a4_hz=STD_A4, tuning=None, spelling=None):
+    hzs = as_float_array(hzs, 'batch_from_hz')
+    check_values(hzs, 'batch_from_hz', positive=True)
+    a4_hz = as_a4(a4_hz, 'batch_from_hz')
+    note_spelling = None if spelling is None else get_spelling(spelling)
+
+    if tuning is None or tuning.standard:
+        midi_notes = hz_to_midi(hzs, a4_hz) if np.ndim(a4_hz) == 0 else hz_to_midi_table(hzs, a4_hz)
+        check_midi_range(midi_notes)
+        pitch_classes, octaves, cents_devs = midi_to_pitch_columns(midi_notes, note_spelling)
+    else:
+        midi_notes = hz_to_step(hzs, a4_hz, tuning) if np.ndim(a4_hz) == 0 else \
+            hz_to_step_table(hzs, a4_hz, tuning)
+        pitch_classes, octaves, cents_devs = step_to_pitch_columns(midi_notes, tuning, note_spelling)
+
+    return {
+        'hz': hzs,
+        'midi': midi_notes,
+        'pitch': PitchArray.from_pitch_classes(pitch_classes, octaves, cents_devs, note_spelling),
+        'pitch_class': pitch_classes,
+        'octave': octaves,
+        'cents_dev': cents_devs,
+        'a4': a4_hz
+    }
+
+def batch_from_midi(midi_notes, a4_hz=STD_A4, tuning=None, spelling=None):
+    midi_notes = as_float_array(midi_notes, 'batch_from_midi')
+    check_values(midi_notes, 'batch_from_midi')
+    a4_hz = as_a4(a4_hz, 'batch_from_midi')
+    note_spelling = None if spelling is None else get_spelling(spelling)
+
+    if tuning is None or tuning.standard:
+        check_midi_range(midi_notes)
+        hzs = midi_to_hz(midi_notes, a4_hz) if np.ndim(a4_hz) == 0 else midi_to_hz_table(midi_notes, a4_hz)
+        pitch_classes, octaves, cents_devs = midi_to_pitch_columns(midi_notes, note_spelling)
+    else:
+        hzs = step_to_hz(midi_notes, a4_hz, tuning) if np.ndim(a4_hz) == 0 else \
+            step_to_hz_table(midi_notes, a4_hz, tuning)
+        pitch_classes, octaves, cents_devs = step_to_pitch_columns(midi_notes, tuning, note_spelling)
+
+    return {
+        'hz': hzs,
+        'midi': midi_notes,
+        'pitch': PitchArray.from_pitch_classes(pitch_classes, octaves, cents_devs, note_spelling),
+        'pitch_class': pitch_classes,
+        'octave': octaves,
+        'cents_dev': cents_devs,
+        'a4': a4_hz
+    }
+
+def batch_from_pitch(pitch_strs, a4_hz=STD_A4, tuning=None):
+    # 'pitch' keeps the names as written. The other pitch columns are derived
+    # from the MIDI values as in batch_from_midi, so Cb4 has pitch class 11 in
+    # octave 3, like MIDI 59.
+    pitch_strs = converters.normalize_pitch_strs(pitch_strs, 'batch_from_pitch')
+    midi_notes, pitches, diatonic_classes, accidental_cents = parse_pitch_columns(pitch_strs)
+
+    a4_hz = as_a4(a4_hz, 'batch_from_pitch')
+    hzs = midi_to_hz(midi_notes, a4_hz) if np.ndim(a4_hz) == 0 else midi_to_hz_table(midi_notes, a4_hz)
+
+    if tuning is None or tuning.standard:
+        check_midi_range(midi_notes)
+        pitch_classes, octaves, cents_devs = midi_to_pitch_columns(midi_notes)
+    else:
+        midi_notes = pitch_columns_to_step(pitches, diatonic_classes, accidental_cents, tuning)
+        pitch_classes, octaves, cents_devs = step_to_pitch_columns(midi_notes, tuning)
+
+    return {
+        'hz': hzs,
+        'midi': midi_notes,
+        'pitch': pitches,
+        'pitch_class': pitch_classes,
+        'octave': octaves,
+        'cents_dev': cents_devs,
+        'a4': a4_hz
+    }
+
+def batch_from_scale(hzs, table):
+    # Nearest key of a scala.ScaleTable for each frequency, by searchsorted
+    # over the sorted log2 frequencies of the table
+    hzs = as_float_array(hzs, 'batch_from_scale')
+    check_values(hzs, 'batch_from_scale', positive=True)
+
+    log_hzs = np.log2(hzs)
+    table_log_hzs = np.array(table.log_hzs)
+    last = len(table_log_hzs) - 1
+
+    upper = np.searchsorted(table_log_hzs, log_hzs)
+    lower = np.maximum(upper - 1, 0)
+    np.minimum(upper, last, out=upper)
+
+    distance_down = log_hzs - table_log_hzs[lower]
+    distance_up = table_log_hzs[upper] - log_hzs
+    nearest = np.where(distance_down <= distance_up, lower, upper)
+
+    cents_devs = log_hzs - table_log_hzs[nearest]
+    cents_devs *= 1200
+
+    # np.log2 can differ from math.log2 in the last bit, which only matters
+    # near a rounding tie or halfway between two keys
+    fixups = round_half_even(cents_devs, 1)
+    halfway = np.flatnonzero(np.abs(distance_down - distance_up) < 1e-12)
+
+    for i in np.union1d(fixups, halfway):
+        (nearest[i], cents_devs[i]) = table.nearest_index(float(hzs[i]))
+
+    return {
+        'hz': hzs,
+        'key': np.array(table.keys)[nearest],
+        'degree': np.array(table.degrees)[nearest],
+        'cents_dev': cents_devs
+    }
+
+# Vectorized math. Each function writes into out when it is given a float64
+# array of the right length, so callers can convert into preallocated buffers.
+def hz_to_midi(hzs, a4_hz, out=None):
+    midi_notes = np.divide(hzs, a4_hz, out=out, dtype=np.float64)
+    np.log(midi_notes, out=midi_notes)
+    midi_notes /= math.log(2)
+    midi_notes *= OCTAVE_DIV
+    midi_notes += MIDI_REF
+
+    for i in round_half_even(midi_notes, 3):
+        midi_notes[i] = round(OCTAVE_DIV * (math.log(float(hzs[i]) / a4_hz, 2)) + MIDI_REF, 3)
+
+    return midi_notes
+
+def midi_to_hz(midi_notes, a4_hz, out=None):
+    hzs = np.subtract(midi_notes, MIDI_REF, out=out, dtype=np.float64)
+    np.power(ST_HZ, hzs, out=hzs)
+    hzs *= a4_hz
+
+    for i in round_half_even(hzs, 3):
+        hzs[i] = converters.one_midi_to_hz(float(midi_notes[i]), a4_hz)
+
+    return hzs
+
+def midi_to_cents_dev(midi_notes, out=None):
+    cents_devs = np.rint(midi_notes, out=out, dtype=np.float64)
+    np.subtract(midi_notes, cents_devs, out=cents_devs)
+    cents_devs *= 100
+
+    for i in round_half_even(cents_devs, 1):
+        cents_devs[i] = converters.get_cents_dev(float(midi_notes[i]), round(float(midi_notes[i])))
+
+    return cents_devs
+
+def midi_to_pitch_columns(midi_notes, note_spelling=None):
+    # Same octave rule as one_midi_to_pitch: the octave of the nearest
+    # chromatic pitch, plus the octave offset of its spelling. The columns have
+    # the shape of midi_notes.
+    shape = midi_notes.shape
+    midi_notes = midi_notes.reshape(-1)
+
+    nearest_notes = np.rint(midi_notes)
+    pitch_classes = np.mod(nearest_notes, OCTAVE_DIV).astype(np.int64)
+    octaves = np.floor_divide(nearest_notes, OCTAVE_DIV).astype(np.int64) - 1
+    cents_devs = midi_to_cents_dev(midi_notes)
+
+    if note_spelling is not None:
+        octaves += spelling_tables(note_spelling)[2][pitch_classes]
+
+    return pitch_classes.reshape(shape), octaves.reshape(shape), cents_devs.reshape(shape)
+
+# Vectorized math for other tunings, with the same rounding as the scalar
+# methods of the tuning
+def hz_to_step(hzs, a4_hz, tuning, out=None):
+    steps = np.divide(hzs, a4_hz, out=out, dtype=np.float64)
+    np.log(steps, out=steps)
+    steps /= math.log(2)
+    steps *= tuning.divisions
+    steps += tuning.ref_step
+
+    for i in round_half_even(steps, 3):
+        steps[i] = tuning.hz_to_step(float(hzs[i]), a4_hz)
+
+    return steps
+
+def step_to_hz(steps, a4_hz, tuning, out=None):
+    hzs = np.subtract(steps, tuning.ref_step, out=out, dtype=np.float64)
+    np.power(tuning.step_ratio, hzs, out=hzs)
+    hzs *= a4_hz
+
+    for i in round_half_even(hzs, 3):
+        hzs[i] = tuning.step_to_hz(float(steps[i]), a4_hz)
+
+    return hzs
+
+def step_to_pitch_columns(steps, tuning, note_spelling=None):
+    (pc_table, octave_offsets, class_cents) = tuning_tables(tuning)
+    shape = steps.shape
+    steps = steps.reshape(-1)
+
+    nearest_steps = np.rint(steps)
+    step_classes = np.mod(nearest_steps, tuning.divisions).astype(np.intp)
+    pitch_classes = pc_table[step_classes]
+
+    octaves = np.floor_divide(nearest_steps, tuning.divisions).astype(np.int64) - 1
+    octaves += octave_offsets[step_classes]
+    if note_spelling is not None:
+        octaves += spelling_tables(note_spelling)[2][pitch_classes]
+
+    cents_devs = np.subtract(steps, nearest_steps, dtype=np.float64)
+    cents_devs *= tuning.step_cents
+    cents_devs += class_cents[step_classes]
+
+    for i in round_half_even(cents_devs, 1):
+        cents_devs[i] = tuning.step_to_pitch(float(steps[i])).cents_dev
+
+    return pitch_classes.reshape(shape), octaves.reshape(shape), cents_devs.reshape(shape)
+
+def pitch_columns_to_step(pitches, diatonic_classes, accidental_cents, tuning):
+    letter_steps = (diatonic_classes - MIDI_REF) * tuning.divisions / OCTAVE_DIV + tuning.ref_step
+    total_cents_devs = pitches.cents_dev + accidental_cents
+
+    steps = letter_steps + tuning.divisions * (pitches.octave + 1)
+    steps += total_cents_devs * tuning.divisions / 1200
+
+    for i in round_half_even(steps, 3):
+        steps[i] = tuning.pitch_fields_to_step(str(pitches.diatonic_pc[i]), str(pitches.accidental[i]), \
+            int(pitches.octave[i]), float(pitches.cents_dev[i]))
+
+    return steps
+
+# Vectorized math over several values of A4. The logarithm or power of each
+# input is computed once, and each reference only shifts or scales it. Tables
+# have one row per input and one column per reference, rounded like the scalar
+# functions.
+def hz_to_midi_table(hzs, a4_hzs):
+    midi_notes = np.subtract.outer(np.log2(hzs), np.log2(a4_hzs))
+    midi_notes *= OCTAVE_DIV
+    midi_notes += MIDI_REF
+
+    return fix_table(midi_notes, hzs, a4_hzs, converters.hz_to_midi_value)
+
+def midi_to_hz_table(midi_notes, a4_hzs):
+    ratios = np.subtract(midi_notes, MIDI_REF, dtype=np.float64)
+    np.power(ST_HZ, ratios, out=ratios)
+
+    return fix_table(np.multiply.outer(ratios, a4_hzs), midi_notes, a4_hzs, converters.one_midi_to_hz)
+
+def hz_to_step_table(hzs, a4_hzs, tuning):
+    steps = np.subtract.outer(np.log2(hzs), np.log2(a4_hzs))
+    steps *= tuning.divisions
+    steps += tuning.ref_step
+
+    return fix_table(steps, hzs, a4_hzs, tuning.hz_to_step)
+
+def step_to_hz_table(steps, a4_hzs, tuning):
+    ratios = np.subtract(steps, tuning.ref_step, dtype=np.float64)
+    np.power(tuning.step_ratio, ratios, out=ratios)
+
+    return fix_table(np.multiply.outer(ratios, a4_hzs), steps, a4_hzs, tuning.step_to_hz)
+
+def fix_table(table, values, a4_hzs, scalar_function):
+    # Rounds a table to 3 digits in place, recomputing the elements near a tie
+    # with scalar_function(value, a4_hz)
+    flat_table = table.reshape(-1)
+    for i in round_half_even(flat_table, 3):
+        (row, column) = divmod(int(i), len(a4_hzs))
+        flat_table[i] = scalar_function(float(values[row]), float(a4_hzs[column]))
+
+    return table
+
+@lru_cache(maxsize=None)
+def tuning_tables(tuning):
+    # 12-TET pitch class, octave offset and cents of each step class
+    return (
+        np.array([name[4] for name in tuning.step_names], dtype=np.int64),
+        np.array([name[2] for name in tuning.step_names], dtype=np.int64),
+        np.array([name[3] for name in tuning.step_names], dtype=np.float64)
+    )
+
+@lru_cache(maxsize=None)
+def spelling_tables(note_spelling):
+    # Letter, accidental and octave offset of each pitch class in a spelling
+    return (
+        np.array(note_spelling.letters),
+        np.array(note_spelling.accidentals),
+        np.array(note_spelling.octave_offsets, dtype=np.int64)
+    )
+
+# Helper functions
+def as_float_array(values, caller):
+    # Like converters.normalize_values, but returns a float64 array and
+    # leaves validation to check_values. Arrays and buffers are not copied
+    # when they are already float64.
+    if type(values) == str:
+        values = values.split()
+    elif not hasattr(values, '__len__') and not isinstance(values, numbers.Real):
+        # Iterators and generators can only be read once
+        try:
+            values = list(values)
+        except TypeError:
+            raise ValueError('%s requires a number, string, or iterable input.' % caller)
+
+    try:
+        values = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError, OverflowError):
+        # Names every bad element, or falls through for other shapes
+        converters.normalize_values(values, caller)
+        raise ValueError('%s requires a number, string, or iterable input.' % caller)
+
+    return values.reshape(-1)
+
+def as_a4(a4_hz, caller):
+    # One reference is returned as a float, several as a float64 array. Either
+    # way each must be finite and greater than 0.
+    if np.ndim(a4_hz) == 0:
+        try:
+            a4_hz = float(a4_hz)
+        except (TypeError, ValueError, OverflowError):
+            a4_hz = math.nan
+        if not 0 < a4_hz < math.inf:
+            raise ValueError('%s requires A4 to be greater than 0 and finite.' % caller)
+        return a4_hz
+
+    try:
+        a4_hzs = as_float_array(a4_hz, caller)
+    except ValueError:
+        a4_hzs = np.array([np.nan])
+    if not len(a4_hzs):
+        raise ValueError('%s requires at least one value of A4.' % caller)
+    if not np.all(np.isfinite(a4_hzs) & (a4_hzs > 0)):
+        raise ValueError('%s requires A4 to be greater than 0 and finite.' % caller)
+    return a4_hzs
+
+def check_values(values, caller, positive=False):
+    valid = np.isfinite(values)
+    if positive:
+        valid &= values > 0
+
+    if not valid.all():
+        raise converters.invalid_values_error(caller, positive, np.flatnonzero(~valid).tolist())
+
+def parse_pitch_columns(pitch_strs):
+    count = len(pitch_strs)
+    midi_notes = np.empty(count, dtype=np.float64)
+    letters = np.empty(count, dtype='U1')
+    accidentals = np.empty(count, dtype='U1')
+    diatonic_classes = np.empty(count, dtype=np.int64)
+    accidental_cents = np.empty(count, dtype=np.int64)
+    octaves = np.empty(count, dtype=np.int64)
+    cents_devs = np.empty(count, dtype=np.float64)
+
+    for i, fields in enumerate(converters.parse_pitch_strs(pitch_strs)):
+        (diatonic_pc, accidental, octave, cents_dev, midi_note) = fields
+        midi_notes[i] = midi_note
+        letters[i] = diatonic_pc
+        accidentals[i] = accidental
+        diatonic_classes[i] = converters.assign_diatonic_pc(diatonic_pc)
+        accidental_cents[i] = converters.accidental_to_cents_dev(accidental)
+        octaves[i] = octave
+        cents_devs[i] = cents_dev
+
+    pitches = PitchArray(letters, accidentals, octaves, cents_devs)
+
+    return midi_notes, pitches, diatonic_classes, accidental_cents
+
+def round_half_even(values, ndigits):
+    # Rounds values in place and returns the indices of elements that were
+    # too close to a tie to trust.
+    scale = 10.0 ** ndigits
+    values *= scale
+
+    # Infinite values (from binio input, for one) are left as they are
+    with np.errstate(invalid='ignore'):
+        near_tie = np.abs(values - np.floor(values) - 0.5) < TIE_TOL + np.abs(values) * 1e-15
+    near_tie |= np.abs(values) >= 2.0**52
+
+    np.rint(values, out=values)
+    values /= scale
+
+    return np.flatnonzero(near_tie)
+
+def check_midi_range(midi_notes):
+    out_of_range = (midi_notes < diagnostics.MIDI_MIN) | (midi_notes > diagnostics.MIDI_MAX)
+    return diagnostics.active.record(midi_notes.size, np.flatnonzero(out_of_range))
@@ -0,0 +1,137 @@
+#
+# Memory-mapped conversion of raw little-endian float arrays and .npy files
+#
+
+import os
+
+import numpy as np
+
+from . import batch
+from .converters import STD_A4
+
+BLOCK_SIZE = 1 << 20 # elements converted at a time
+MIN_THREAD_BLOCK = 1 << 16 # smallest block worth handing to a thread
+
+CONVERSIONS = ('midi', 'cents_dev', 'hz')
+
+# Readers and writers
+def open_array(path, dtype='<f4'):
+    if path.endswith('.npy'):
+        values = np.load(path, mmap_mode='r')
+    elif os.path.getsize(path) == 0:
+        values = np.empty(0, dtype=dtype)
+    else:
+        values = np.memmap(path, dtype=np.dtype(dtype), mode='r')
+
+    if values.ndim != 1:
+        raise ValueError('Binary input must be a one-dimensional array.')
+
+    return values
+
+def create_array(path, count, dtype='<f8'):
+    if path.endswith('.npy'):
+        return np.lib.format.open_memmap(path, mode='w+', dtype=np.dtype(dtype), shape=(count,))
+
+    if count == 0:
+        open(path, 'wb').close()
+        return np.empty(0, dtype=dtype)
+
+    return np.memmap(path, dtype=np.dtype(dtype), mode='w+', shape=(count,))
+
+def convert_file(in_path, out_path, conversion='midi', a4_hz=STD_A4, in_dtype='<f4', out_dtype='<f8', block_size=BLOCK_SIZE, \
+        workers=1):
+    if conversion not in CONVERSIONS:
+        raise ValueError('Conversion must be one of: %s.' % ', '.join(CONVERSIONS))
+
+    values = open_array(in_path, in_dtype)
+    out = create_array(out_path, len(values), out_dtype)
+
+    if conversion == 'midi':
+        hz_to_midi_into(values, out, a4_hz, block_size, workers)
+    elif conversion == 'cents_dev':
+        hz_to_cents_dev_into(values, out, a4_hz, block_size, workers)
+    else:
+        midi_to_hz_into(values, out, a4_hz, block_size, workers)
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return out
+
+# Block conversions. Each block is read straight from the input mapping and
+# the result is written straight into out. Blocks are computed in float64 and
+# cast to the dtype of out, so results match the scalar functions when out is
+# float64.
+#
+# With workers > 1 the input is split into one contiguous range of blocks per
+# thread. The NumPy ufuncs that do the work release the GIL, so the threads run
+# in parallel; each keeps its own scratch buffers and writes a disjoint part of
+# out.
+def hz_to_midi_into(hzs, out, a4_hz=STD_A4, block_size=BLOCK_SIZE, workers=1):
+    def convert(block, start, work, scratch):
+        check_hz_block(block, start)
+        return batch.hz_to_midi(block, a4_hz, out=work)
+
+    return convert_blocks(hzs, out, convert, block_size, workers)
+
+def hz_to_cents_dev_into(hzs, out, a4_hz=STD_A4, block_size=BLOCK_SIZE, workers=1):
+    def convert(block, start, work, scratch):
+        check_hz_block(block, start)
+        midi_notes = batch.hz_to_midi(block, a4_hz, out=scratch[:len(block)])
+        return batch.midi_to_cents_dev(midi_notes, out=work)
+
+    return convert_blocks(hzs, out, convert, block_size, workers)
+
+def midi_to_hz_into(midi_notes, out, a4_hz=STD_A4, block_size=BLOCK_SIZE, workers=1):
+    def convert(block, start, work, scratch):
+        return batch.midi_to_hz(block, a4_hz, out=work)
+
+    return convert_blocks(midi_notes, out, convert, block_size, workers)
+
+def convert_blocks(values, out, convert, block_size, workers=1):
+    if len(out) != len(values):
+        raise ValueError('Output buffer must have the same length as the input.')
+
+    if workers <= 1 or len(values) <= MIN_THREAD_BLOCK:
+        return convert_range(values, out, convert, block_size, 0, len(values))
+
+    # Blocks small enough to give every thread work
+    block_size = max(min(block_size, -(-len(values) // workers)), MIN_THREAD_BLOCK)
+    block_count = -(-len(values) // block_size)
+    bounds = [block_count * i // workers * block_size for i in range(workers)] + [len(values)]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(convert_range, values, out, convert, block_size, start, stop) \
+            for start, stop in zip(bounds, bounds[1:]) if start < stop]
+
+        # Ranges are checked in order, so an error names the first bad index
+        for future in futures:
+            future.result()
+
+    return out
+
+def convert_range(values, out, convert, block_size, start, stop):
+    direct = out.dtype == np.float64 and out.dtype.isnative
+    work_size = min(block_size, stop - start)
+    scratch = np.empty(work_size, dtype=np.float64)
+    out_scratch = None if direct else np.empty(work_size, dtype=np.float64)
+
+    for block_start in range(start, stop, block_size):
+        block_stop = min(block_start + block_size, stop)
+        work = out[block_start:block_stop] if direct else out_scratch[:block_stop - block_start]
+
+        result = convert(values[block_start:block_stop], block_start, work, scratch)
+
+        if not direct:
+            out[block_start:block_stop] = result
+
+    return out
+
+def check_hz_block(block, start):
+    # Reports the first bad value of the block, in the wording of
+    # converters.invalid_values_error
+    bad = np.flatnonzero(~(np.isfinite(block) & (block > 0)))
+    if len(bad):
+        raise ValueError('Hz values must be greater than 0 and finite (bad value at index %i).' % (start + bad[0]))
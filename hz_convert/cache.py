@@ -0,0 +1,115 @@
+#
+# Memoization of per-note conversions, shared by every from_* call
+#
+# When enabled, from_midi, from_hz and from_pitch look up one_midi_to_pitch,
+# one_midi_to_hz and one_hz_to_midi in a bounded LRU cache keyed by the input
+# value and, for conversions involving Hz, the value of A4. Conversions in other
+# tunings or spellings get their own entries, keyed by the tuning or spelling
+# as well. Cached Pitch objects are shared between results and should be
+# treated as read-only.
+#
+# The cache can be shared by threads without a lock. Every change to the
+# entries is a single OrderedDict call, which is atomic, and lookup tolerates
+# another thread evicting the key it just found. Under contention two threads
+# may compute the same missing value, the cache may briefly hold one entry
+# less than maxsize, and the hit and miss counters may undercount.
+#
+
+from collections import OrderedDict, namedtuple
+
+from . import converters
+
+DEFAULT_MAXSIZE = 65536
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class ConversionCache():
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError('Cache size must be at least 1.')
+
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def midi_to_pitch(self, midi_note, spelling=None):
+        if spelling is None:
+            return self.lookup(('pitch', midi_note), converters.one_midi_to_pitch, midi_note)
+        return self.lookup(('pitch', midi_note, spelling), converters.one_midi_to_pitch, midi_note, spelling)
+
+    def midi_to_hz(self, midi_note, a4_hz):
+        return self.lookup(('hz', midi_note, a4_hz), converters.one_midi_to_hz, midi_note, a4_hz)
+
+    def hz_to_midi(self, hz, a4_hz):
+        # Unchecked, like converters.hz_to_midi_value: from_hz checks the range
+        # of the whole batch
+        return self.lookup(('midi', hz, a4_hz), converters.hz_to_midi_value, hz, a4_hz)
+
+    def tuning_functions(self, tuning):
+        # Per-note functions for a tuning other than 12-TET. Keys include the
+        # tuning, so each tuning keeps its own entries.
+        def step_to_pitch(step, spelling=None):
+            return self.lookup(('pitch', step, tuning, spelling), tuning.step_to_pitch, step, spelling)
+
+        def step_to_hz(step, a4_hz):
+            return self.lookup(('hz', step, a4_hz, tuning), tuning.step_to_hz, step, a4_hz)
+
+        def hz_to_step(hz, a4_hz):
+            return self.lookup(('midi', hz, a4_hz, tuning), tuning.hz_to_step, hz, a4_hz)
+
+        return (step_to_pitch, step_to_hz, hz_to_step)
+
+    def lookup(self, key, compute, *args):
+        entries = self.entries
+
+        try:
+            value = entries[key]
+        except KeyError:
+            self.misses += 1
+            value = entries[key] = compute(*args)
+            if len(entries) > self.maxsize:
+                try:
+                    entries.popitem(last=False)
+                except KeyError:
+                    pass
+        else:
+            self.hits += 1
+            try:
+                entries.move_to_end(key)
+            except KeyError:
+                pass
+
+        return value
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def invalidate(self, a4_hz=None):
+        # Drops the entries that depend on a4_hz, or every entry if it is None
+        if a4_hz is None:
+            self.entries.clear()
+            return
+
+        # list() copies the keys in one step, so other threads can keep using
+        # the cache meanwhile
+        for key in [key for key in list(self.entries) if key[0] != 'pitch' and key[2] == a4_hz]:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+def enable_cache(maxsize=DEFAULT_MAXSIZE):
+    converters.conversion_cache = ConversionCache(maxsize)
+    return converters.conversion_cache
+
+def disable_cache():
+    converters.conversion_cache = None
+
+def get_cache():
+    return converters.conversion_cache
@@ -0,0 +1,155 @@
+#
+# Batch analysis of chords (requires NumPy)
+#
+# A ChordArray holds a corpus of chords in ragged form: the MIDI values of all
+# chords packed end to end in one array, plus an offsets array where chord i
+# spans midi[offsets[i]:offsets[i + 1]]. Every pitch string is parsed once, when
+# the corpus is built; intervals, root-relative pitch-class sets and
+# transpositions are then computed for all chords at once.
+#
+# The root of a chord is its lowest note. Pitch-class sets are stored as 12-bit
+# masks, with bit k set when a note lies k semitones (rounded, modulo the
+# octave) above the root. A major triad with its root in the bass is 0b10010001
+# in any key and spacing; its inversions have other sets.
+#
+
+import numpy as np
+
+from .batch import PitchArray, parse_pitch_columns, midi_to_hz, midi_to_pitch_columns, check_midi_range, \
+    round_half_even
+from .converters import OCTAVE_DIV, STD_A4
+
+class ChordArray():
+    __slots__ = ('midi', 'offsets', 'pitches')
+
+    def __init__(self, midi, offsets, pitches=None):
+        self.midi = midi
+        self.offsets = offsets
+        self.pitches = pitches
+
+    @classmethod
+    def from_strings(cls, chords):
+        # Takes chords like 'C4 E4 G4' or ['C4', 'E4', 'G4']
+        if type(chords) == str:
+            chords = [chords]
+
+        pitch_strs = []
+        offsets = np.empty(len(chords) + 1, dtype=np.int64)
+        offsets[0] = 0
+
+        for i, chord in enumerate(chords):
+            notes = chord.split() if type(chord) == str else list(chord)
+            if not notes:
+                raise ValueError('Chord %i has no notes.' % i)
+            pitch_strs.extend(notes)
+            offsets[i + 1] = len(pitch_strs)
+
+        midi_notes, pitches, _, _ = parse_pitch_columns(pitch_strs)
+        check_midi_range(midi_notes)
+
+        return cls(midi_notes, offsets, pitches)
+
+    @classmethod
+    def from_midi(cls, chords):
+        # Takes a list of sequences of MIDI values
+        sizes = np.array([len(chord) for chord in chords], dtype=np.int64)
+        if np.any(sizes == 0):
+            raise ValueError('Chord %i has no notes.' % np.flatnonzero(sizes == 0)[0])
+
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        try:
+            midi_notes = np.concatenate([np.asarray(chord, dtype=np.float64) for chord in chords]) \
+                if len(sizes) else np.empty(0)
+        except (TypeError, ValueError):
+            raise ValueError('from_midi requires a list of numerical sequences.')
+
+        check_midi_range(midi_notes)
+
+        return cls(midi_notes, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        # The MIDI values of one chord
+        if index < 0:
+            index += len(self)
+        return self.midi[self.offsets[index]:self.offsets[index + 1]]
+
+    def __repr__(self):
+        return 'ChordArray(%i chords, %i notes)' % (len(self), len(self.midi))
+
+    # Layout
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def chord_index(self):
+        # The chord each packed note belongs to
+        return np.repeat(np.arange(len(self)), self.sizes())
+
+    def padded(self, fill=np.nan):
+        # Dense 2-D copy with one row per chord, padded on the right with fill
+        sizes = self.sizes()
+        table = np.full((len(self), sizes.max(initial=0)), fill, dtype=np.float64)
+        columns = np.arange(len(self.midi)) - np.repeat(self.offsets[:-1], sizes)
+        table[self.chord_index(), columns] = self.midi
+        return table
+
+    # Analysis
+    def roots(self):
+        if not len(self):
+            return np.empty(0)
+        return np.minimum.reduceat(self.midi, self.offsets[:-1])
+
+    def root_cents(self):
+        # Distance of every note above the root of its chord, in cents, in
+        # the packed layout
+        return round_exact((self.midi - np.repeat(self.roots(), self.sizes())) * 100, 1)
+
+    def intervals(self):
+        # Cents between neighbouring notes as written. Chord i has
+        # sizes[i] - 1 intervals, which start at offsets[i] - i.
+        steps = np.delete(np.diff(self.midi), self.offsets[1:-1] - 1)
+        return round_exact(steps * 100, 1)
+
+    def interval_offsets(self):
+        return self.offsets - np.arange(len(self.offsets))
+
+    def pitch_class_sets(self):
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+
+        semitones = np.rint(self.midi - np.repeat(self.roots(), self.sizes())).astype(np.int64)
+        bits = np.left_shift(1, np.mod(semitones, OCTAVE_DIV))
+        return np.bitwise_or.reduceat(bits, self.offsets[:-1])
+
+    # Transformations
+    def transpose(self, semitones):
+        # semitones is one value for every chord or an array with one per chord
+        shifts = np.asarray(semitones, dtype=np.float64)
+        if shifts.ndim:
+            if shifts.shape != (len(self),):
+                raise ValueError('Transpositions need one value, or one value per chord.')
+            shifts = np.repeat(shifts, self.sizes())
+
+        return ChordArray(round_exact(self.midi + shifts, 3), self.offsets)
+
+    def to_hz(self, a4_hz=STD_A4):
+        return midi_to_hz(self.midi, a4_hz)
+
+    def spelled(self):
+        # Pitches as written, or as spelled by from_midi for computed chords
+        if self.pitches is None:
+            return PitchArray.from_pitch_classes(*midi_to_pitch_columns(self.midi))
+        return self.pitches
+
+# Helper functions
+def round_exact(values, ndigits):
+    # Same result as round() on every element
+    rounded = values.copy()
+    for i in round_half_even(rounded, ndigits):
+        rounded[i] = round(float(values[i]), ndigits)
+
+    return rounded
@@ -1,22 +1,65 @@
 import math
-import re
-from dataclasses import dataclass
+import numbers
+from functools import lru_cache, partial
 
-from test.test_converters import STD_A4
+from . import diagnostics, output, spelling
 
 # Constants
+STD_A4 = 440.0 # Hz
 OCTAVE_DIV = 12
 ST_HZ = 2**(1.0/OCTAVE_DIV)
 MIDI_REF = 69 # A4
 START_CHAR = '- '
+PITCH_PATTERN = r'([a-gA-G])(\(([0-9]+)\/([0-9]+)\))?([nb#xd])?(-?[0-9]+)'
+DIATONIC_NAMES = frozenset('ABCDEFGabcdefg')
+ACCIDENTALS = frozenset('nb#xd')
+PARSE_CACHE_SIZE = 4096
+MAX_REPORTED_INDICES = 10 # bad inputs listed in an error message
+
+# Lookup tables for the helper functions below
+PC_NAMES = dict(enumerate(spelling.DEFAULT.spell(pitch_class) for pitch_class in range(OCTAVE_DIV)))
+DIATONIC_PC_NUMBERS = spelling.LETTER_PCS
+ACCIDENTAL_CENTS = {None: 0, '': 0, 'd': -200, 'b': -100, 'n': 0, '#': 100, 'x': 200}
+
+# Set through hz_convert.cache.enable_cache()
+conversion_cache = None
+
+# Compiled on first use, so that importing the package does not load re
+pitch_format = None
 
-@dataclass
 class Pitch():
-    name: str
-    diatonic_pc: str
-    accidental: str
-    octave: int
-    cents_dev: float
+    # A slotted class rather than a dataclass keeps large lists of pitches
+    # small. The name is only formatted the first time it is read.
+    __slots__ = ('_name', 'diatonic_pc', 'accidental', 'octave', 'cents_dev')
+
+    def __init__(self, name, diatonic_pc, accidental, octave, cents_dev):
+        self._name = name or None
+        self.diatonic_pc = diatonic_pc
+        self.accidental = accidental
+        self.octave = octave
+        self.cents_dev = cents_dev
+
+    @property
+    def name(self):
+        if self._name is None:
+            self._name = one_pitch_string(self)
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+
+    def __repr__(self):
+        return 'Pitch(name=%r, diatonic_pc=%r, accidental=%r, octave=%r, cents_dev=%r)' % \
+            (self.name, self.diatonic_pc, self.accidental, self.octave, self.cents_dev)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.name, self.diatonic_pc, self.accidental, self.octave, self.cents_dev) == \
+            (other.name, other.diatonic_pc, other.accidental, other.octave, other.cents_dev)
+
+    __hash__ = None
 
 # Interaction loops
 def pitch_to_hz_loop(a4_hz):
@@ -94,92 +137,228 @@ def midi_to_pitch_loop(a4_hz):
         print(hz_string(hzs))
 
 # Conversion functions
-def from_pitch(pitch_strs, a4_hz=STD_A4):
-    if type(pitch_strs) == str:
-        pitch_strs = pitch_strs.split(' ')
+def from_pitch(pitch_strs, a4_hz=STD_A4, tuning=None):
+    pitch_strs = normalize_pitch_strs(pitch_strs, 'from_pitch')
+
+    # One cached parse per distinct spelling yields both the Pitch fields and
+    # the MIDI value; Hz is computed once per distinct MIDI value.
+    parsed = parse_pitch_strs(pitch_strs)
+    midi_notes = [fields[4] for fields in parsed]
+
+    to_hz = one_midi_to_hz if conversion_cache is None else conversion_cache.midi_to_hz
+    hz_by_midi = {midi_note: to_hz(float(midi_note), a4_hz) for midi_note in set(midi_notes)}
+    hzs = [hz_by_midi[midi_note] for midi_note in midi_notes]
+
+    # Names stand for the same frequency in every tuning, so only the MIDI
+    # values are replaced by steps
+    if tuning is None or tuning.standard:
+        diagnostics.active.check_midi(midi_notes)
+    else:
+        midi_notes = [tuning.pitch_fields_to_step(*fields[:4]) for fields in parsed]
+
+    return {
+        'hz': hzs,
+        'midi': midi_notes,
+        'pitch': [Pitch(None, *fields[:4]) for fields in parsed],
+        'pitch_names': pitch_strs,
+        'a4': a4_hz
+    }
+
+def from_midi(midi_notes, a4_hz=STD_A4, tuning=None, spelling=None):
+    midi_notes = normalize_values(midi_notes, 'from_midi')
+    (to_pitch, to_hz, _) = conversion_functions(tuning, spelling)
+
+    pitches = [to_pitch(midi_note) for midi_note in midi_notes]
+
+    if tuning is None or tuning.standard:
+        diagnostics.active.check_midi(midi_notes)
+
+    hzs = [to_hz(midi_note, a4_hz) for midi_note in midi_notes]
 
-    if type(pitch_strs) != list:
-        raise ValueError('[error] from_pitch requires a string or list input.')
+    return {
+        'hz': hzs,
+        'midi': midi_notes,
+        'pitch': pitches,
+        'pitch_names': [pitch.name for pitch in pitches],
+        'a4': a4_hz
+    }
+
+def from_hz(hzs, a4_hz=STD_A4, tuning=None, spelling=None):
+    hzs = normalize_values(hzs, 'from_hz', positive=True)
+    (to_pitch, _, to_midi) = conversion_functions(tuning, spelling)
+
+    midi_notes = [to_midi(hz, a4_hz) for hz in hzs]
+    pitches = [to_pitch(midi_note) for midi_note in midi_notes]
+
+    if tuning is None or tuning.standard:
+        diagnostics.active.check_midi(midi_notes)
+
+    return {
+        'hz': hzs,
+        'midi': midi_notes,
+        'pitch': pitches,
+        'pitch_names': [pitch.name for pitch in pitches],
+        'a4': a4_hz
+    }
+
+def conversion_functions(tuning, spelling_policy=None):
+    # Returns the per-note (to_pitch, to_hz, to_midi) functions for a tuning,
+    # going through the conversion cache when it is enabled. In tunings other
+    # than 12-TET, MIDI values are the step numbers of the tuning. Pitches are
+    # spelled by assign_name unless a policy of hz_convert.spelling is given.
+    if tuning is None or tuning.standard:
+        if conversion_cache is None:
+            functions = (one_midi_to_pitch, one_midi_to_hz, hz_to_midi_value)
+        else:
+            functions = (conversion_cache.midi_to_pitch, conversion_cache.midi_to_hz, conversion_cache.hz_to_midi)
+    elif conversion_cache is None:
+        functions = (tuning.step_to_pitch, tuning.step_to_hz, tuning.hz_to_step)
+    else:
+        functions = conversion_cache.tuning_functions(tuning)
+
+    if spelling_policy is None:
+        return functions
+
+    to_pitch = partial(functions[0], spelling=spelling.get_spelling(spelling_policy))
+    return (to_pitch,) + functions[1:]
+
+def normalize_values(values, caller, positive=False):
+    # Returns a list of floats from a number, a space-delimited string, or any
+    # iterable or buffer of numbers (list, tuple, generator, array.array,
+    # NumPy array). Every value must be finite, and greater than 0 if positive
+    # is set. A string must hold at least one value.
+    if type(values) == str:
+        values = values.split()
+        if not values:
+            raise ValueError('%s requires a number, string, or iterable input.' % caller)
+    elif isinstance(values, numbers.Real): # including NumPy scalars
+        values = [values]
+    elif not isinstance(values, (list, tuple)):
+        try:
+            values = list(values)
+        except TypeError:
+            raise ValueError('%s requires a number, string, or iterable input.' % caller)
 
     try:
-        midi_notes = [one_pitch_str_to_midi(pitch_str) for pitch_str in pitch_strs]
-        hz = [one_midi_to_hz(float(midi_note), a4_hz) for midi_note in midi_notes]
-    except ValueError as e:
-        raise e
+        floats = list(map(float, values))
+    except (TypeError, ValueError, OverflowError):
+        floats = None
     else:
-        return {
-            'hz': hz,
-            'midi': midi_notes,
-            'pitch': [one_pitch_str_to_pitch_obj(pitch_str) for pitch_str in pitch_strs],
-            'pitch_names': pitch_strs,
-            'a4': a4_hz
-        }
+        # The sum is finite only if every value is, which leaves the common
+        # case to C (a sum that overflows only costs the scan below)
+        total = sum(floats)
+        if total - total == 0 and not (positive and floats and min(floats) <= 0):
+            return floats
 
-def from_midi(midi_notes, a4_hz=STD_A4):
-    if type(midi_notes) == str:
-        midi_notes = midi_notes.split(' ')
+    bad_indices = [i for i, value in enumerate(values) if not is_valid_value(value, positive)]
+    if bad_indices:
+        raise invalid_values_error(caller, positive, bad_indices)
 
-    if type(midi_notes) in (float, int):
-        midi_notes = [float(midi_notes)]
+    return floats
 
-    if type(midi_notes) != list:
-        print('[error] from_midi requires a number, string, or list input.')
+def normalize_pitch_strs(pitch_strs, caller):
+    if type(pitch_strs) == str:
+        pitch_strs = pitch_strs.split()
+        if not pitch_strs:
+            raise ValueError('%s requires a string or iterable input.' % caller)
+        return pitch_strs
 
     try:
-        pitches = [one_midi_to_pitch(float(midi_note)) for midi_note in midi_notes]
-        hzs = [one_midi_to_hz(float(midi_note), a4_hz) for midi_note in midi_notes]
-    except ValueError as e:
-        print('[error] from_midi requires a number, string, or list input.')
-    else:
-        return {
-            'hz': hzs,
-            'midi': midi_notes,
-            'pitch': pitches,
-            'pitch_names': [pitch.name for pitch in pitches],
-            'a4': a4_hz
-        }
+        pitch_strs = list(pitch_strs)
+    except TypeError:
+        raise ValueError('%s requires a string or iterable input.' % caller)
 
-def from_hz(hzs, a4_hz=STD_A4):
-    if type(hzs) == str:
-        hzs = hzs.split(' ')
+    bad_indices = [i for i, pitch_str in enumerate(pitch_strs) if type(pitch_str) != str]
+    if bad_indices:
+        raise ValueError('%s requires pitch strings (bad %s).' % (caller, describe_indices(bad_indices)))
 
-    if type(hzs) in (float, int):
-        hzs = [float(hzs)]
+    return pitch_strs
 
-    if type(hzs) != list:
-        raise ValueError('from_hz requires a number, string, or list input.')
+def parse_pitch_strs(pitch_strs):
+    try:
+        return [parse_pitch_str(pitch_str) for pitch_str in pitch_strs]
+    except ValueError as e:
+        error = e
 
-    if any([float(hz) <= 0 for hz in hzs]):
-        raise ValueError('Hz values must be greater than 0.')
+    bad_indices = []
+    for i, pitch_str in enumerate(pitch_strs):
+        try:
+            parse_pitch_str(pitch_str)
+        except ValueError:
+            bad_indices.append(i)
 
+    raise ValueError('%s (bad %s)' % (str(error).strip(), describe_indices(bad_indices)))
+
+def is_valid_value(value, positive):
     try:
-        midi_notes = [one_hz_to_midi(float(hz), a4_hz) for hz in hzs]
-        pitches = [one_midi_to_pitch(midi_note) for midi_note in midi_notes]
-    except ValueError:
-        raise ValueError('Not a numerical input.')
-    else:
-        return {
-            'hz': hzs,
-            'midi': midi_notes,
-            'pitch': pitches,
-            'pitch_names': [pitch.name for pitch in pitches],
-            'a4': a4_hz
-        }
+        value = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return False
+
+    return math.isfinite(value) and (value > 0 or not positive)
+
+def invalid_values_error(caller, positive, bad_indices):
+    if positive:
+        return ValueError('Hz values must be greater than 0 and finite (bad %s).' % describe_indices(bad_indices))
+
+    return ValueError('%s requires a number, string, or iterable of finite numbers (bad %s).' % \
+        (caller, describe_indices(bad_indices)))
+
+def describe_indices(indices):
+    shown = ', '.join('%i' % i for i in indices[:MAX_REPORTED_INDICES])
+    more = len(indices) - MAX_REPORTED_INDICES
+
+    if len(indices) == 1:
+        return 'value at index ' + shown
+    if more > 0:
+        return 'values at indices %s and %i more' % (shown, more)
+    return 'values at indices ' + shown
 
 def one_pitch_str_to_midi(pitch_str):
-    pitch_obj = one_pitch_str_to_pitch_obj(pitch_str)
-    return one_pitch_obj_to_midi(pitch_obj)
+    midi_note = parse_pitch_str(pitch_str)[4]
+    check_midi_range(midi_note)
+    return midi_note
 
 def one_pitch_str_to_pitch_obj(pitch_str):
-    pitch_name_format = '([a-gA-G])'
-    microtone_format = '(\(([0-9]+)\/([0-9]+)\))'
-    accidental_format = '([nb#xd])'
-    octave_format = '(-?[0-9]+)'
+    return Pitch(None, *parse_pitch_str(pitch_str)[:4])
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_pitch_str(pitch_str):
+    # Returns (diatonic_pc, accidental, octave, cents_dev, midi_note). Results
+    # are immutable, so repeated spellings share one cached entry.
+    fields = scan_pitch_str(pitch_str)
+
+    if fields is None:
+        fields = match_pitch_str(pitch_str)
+
+    return fields + (pitch_fields_to_midi(*fields),)
+
+def scan_pitch_str(pitch_str):
+    # Fast path for spellings without a microtone, such as 'C4' or 'Bb-1'.
+    # Returns None for anything else, which is left to the regex.
+    if len(pitch_str) < 2 or pitch_str[0] not in DIATONIC_NAMES:
+        return None
+
+    if pitch_str[1] in ACCIDENTALS:
+        accidental = pitch_str[1]
+        octave = pitch_str[2:]
+    else:
+        accidental = ''
+        octave = pitch_str[1:]
+
+    digits = octave[1:] if octave[:1] == '-' else octave
+    if not digits or digits.strip('0123456789'):
+        return None
+
+    return (pitch_str[0], accidental, int(octave), 0)
 
-    pitch_format = pitch_name_format + microtone_format + '?' + \
-                   accidental_format + '?' + octave_format
+def match_pitch_str(pitch_str):
+    global pitch_format
+    if pitch_format is None:
+        import re
+        pitch_format = re.compile(PITCH_PATTERN)
 
-    match = re.fullmatch(pitch_format, pitch_str)
+    match = pitch_format.fullmatch(pitch_str)
 
     if not match:
         raise ValueError("Invalid pitch format. At minimum, a pitch and octave (e.g. 'C4', 'Bb3') are required. Refer to instructions.\n")
@@ -198,38 +377,48 @@ def one_pitch_str_to_pitch_obj(pitch_str):
     else:
         accidental, cents_dev = compute_cents_dev(accidental, numerator, denominator)
 
-    pitch = add_pitch_name(Pitch('', diatonic_pc, accidental, octave, cents_dev))
-
-    return pitch
+    return (diatonic_pc, accidental, octave, cents_dev)
 
 def one_pitch_obj_to_midi(pitch):
-    diatonic_class = assign_diatonic_pc(pitch.diatonic_pc)
-
-    # Account for the accidental
-    total_cents_dev = pitch.cents_dev + accidental_to_cents_dev(pitch.accidental)
-
-    midi_note = round(diatonic_class + OCTAVE_DIV * (pitch.octave + 1) + total_cents_dev / 100, 2)
+    midi_note = pitch_fields_to_midi(pitch.diatonic_pc, pitch.accidental, pitch.octave, pitch.cents_dev)
     check_midi_range(midi_note)
 
     return midi_note
 
-def one_midi_to_pitch(midi_note):
+def pitch_fields_to_midi(diatonic_pc, accidental, octave, cents_dev):
+    diatonic_class = assign_diatonic_pc(diatonic_pc)
+
+    # Account for the accidental
+    total_cents_dev = cents_dev + accidental_to_cents_dev(accidental)
+
+    return round(diatonic_class + OCTAVE_DIV * (octave + 1) + total_cents_dev / 100, 2)
+
+def one_midi_to_pitch(midi_note, spelling=None):
+    # The octave is that of the nearest chromatic pitch, so 71.6 is C5 (-40 c)
+    # rather than C4. Spellings like B# and Cb name a note from the next octave.
     rounded_pitch = round(midi_note)
-    (diatonic_pc, accidental) = assign_name(rounded_pitch % 12)
-    cents_dev = get_cents_dev(midi_note, rounded_pitch)
-    octave = get_octave(midi_note)
-    if diatonic_pc == 'C':
-        octave += 1
+    octave = get_octave(rounded_pitch)
 
-    pitch = add_pitch_name(Pitch('', diatonic_pc, accidental, octave, cents_dev))
+    if spelling is None:
+        (diatonic_pc, accidental) = assign_name(rounded_pitch % 12)
+    else:
+        (diatonic_pc, accidental, octave_offset) = spelling.names[rounded_pitch % 12]
+        octave += octave_offset
 
-    return pitch
+    cents_dev = get_cents_dev(midi_note, rounded_pitch)
+
+    return Pitch(None, diatonic_pc, accidental, octave, cents_dev)
 
 def one_hz_to_midi(hz, a4_hz):
-    midi_note = round(OCTAVE_DIV * (math.log(hz / a4_hz, 2)) + MIDI_REF, 3)
+    midi_note = hz_to_midi_value(hz, a4_hz)
     check_midi_range(midi_note)
     return midi_note
 
+def hz_to_midi_value(hz, a4_hz):
+    # Unchecked conversion for the from_* functions, which check the range of
+    # a whole batch at once
+    return round(OCTAVE_DIV * (math.log(hz / a4_hz, 2)) + MIDI_REF, 3)
+
 def one_midi_to_hz(midi_note, a4_hz):
     distance = midi_note - MIDI_REF
     return round(a4_hz * (ST_HZ**distance), 3)
@@ -246,8 +435,7 @@ def pitch_string(pitches):
 
     if type(pitches[0]) == Pitch:
         try:
-            out_str = START_CHAR + prefix + \
-                ', '.join([one_pitch_string(pitch) for pitch in pitches])
+            out_str = START_CHAR + prefix + ', '.join(output.pitch_obj_names(pitches))
         except TypeError:
             raise TypeError('Unable to process pitch string data.')
         else:
@@ -257,9 +445,7 @@ def pitch_string(pitches):
 
 def one_pitch_string(pitch):
     try:
-        out_str = pitch.diatonic_pc + pitch.accidental + '%i ' % pitch.octave \
-            + '(' + ('+' if pitch.cents_dev >= 0 else '-') + \
-            '%.1f c)' % abs(pitch.cents_dev)
+        out_str = output.pitch_name(pitch.diatonic_pc, pitch.accidental, pitch.octave, pitch.cents_dev)
     except TypeError:
         raise TypeError('Unable to process pitch string data.')
     else:
@@ -275,7 +461,7 @@ def hz_string(hzs):
         prefix = 'Hz value: '
 
     try:
-        out_str = START_CHAR + prefix + ', '.join('%.2f' % hz for hz in hzs)
+        out_str = START_CHAR + prefix + ', '.join(['%.2f'] * len(hzs)) % tuple(hzs)
     except TypeError:
         raise TypeError("Hz values must be floats.")
     else:
@@ -293,7 +479,7 @@ def midi_string(midi_notes, microtonal = False):
     num_format = '%.2f' if microtonal else '%i'
 
     try:
-        out_str = START_CHAR + prefix + ', '.join(num_format % midi_note for midi_note in midi_notes)
+        out_str = START_CHAR + prefix + ', '.join([num_format] * len(midi_notes)) % tuple(midi_notes)
     except TypeError:
         raise TypeError("MIDI values must be numerical.")
     else:
@@ -301,66 +487,22 @@ def midi_string(midi_notes, microtonal = False):
 
 # Helper functions
 def assign_name(pitch_class):
-    pc_names = {
-        0: ('C', ''),
-        1: ('C', '#'),
-        2: ('D', ''),
-        3: ('E', 'b'),
-        4: ('E', ''),
-        5: ('F', ''),
-        6: ('F', '#'),
-        7: ('G', ''),
-        8: ('G', '#'),
-        9: ('A', ''),
-        10: ('B', 'b'),
-        11: ('B', '')
-    }
-
     try:
-        pc_name = pc_names[pitch_class]
+        return PC_NAMES[pitch_class]
     except KeyError:
         raise KeyError('Invalid pitch class number')
-    else:
-        return pc_name
 
 def assign_diatonic_pc(name):
-    diatonic_pc_numbers = {
-        'C': 0,
-        'D': 2,
-        'E': 4,
-        'F': 5,
-        'G': 7,
-        'A': 9,
-        'B': 11
-    }
-
     try:
-        diatonic_pc_number = diatonic_pc_numbers[name.upper()]
-    except KeyError:
+        return DIATONIC_PC_NUMBERS[name.upper()]
+    except (KeyError, AttributeError): # AttributeError if .upper() fails
         raise KeyError('Invalid pitch class name.')
-    except AttributeError: # if .upper() fails
-        raise KeyError('Invalid pitch class name.')
-    else:
-        return diatonic_pc_number
 
 def accidental_to_cents_dev(accidental):
-    accidental_values = {
-        'd': -2,
-        'b': -1,
-        'n': 0,
-        '#': 1,
-        'x': 2
-    }
-
-    if accidental is None or accidental == '':
-        accidental = 'n'
-
     try:
-        accidental_value = accidental_values[accidental]
+        return ACCIDENTAL_CENTS[accidental]
     except KeyError:
         raise KeyError('Invalid accidental type.\n')
-    else:
-        return 100 * accidental_value
 
 def compute_cents_dev(accidental, numerator, denominator):
     if numerator is None and denominator is None:
@@ -392,8 +534,8 @@ def get_octave(midi_note):
     return math.floor(midi_note/12.0) - 1
 
 def check_midi_range(midi_note):
-    if midi_note < 0 or midi_note > 127:
-        print('[warning] MIDI note outside of the defined range 0-127.')
+    if midi_note < diagnostics.MIDI_MIN or midi_note > diagnostics.MIDI_MAX:
+        diagnostics.active.record(1, [0])
 
 def add_pitch_name(pitch):
     name = one_pitch_string(pitch)
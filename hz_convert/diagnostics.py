@@ -0,0 +1,119 @@
+#
+# Reporting of MIDI values outside of the defined range 0-127
+#
+# Conversions record each batch they check with the active Diagnostics object,
+# which keeps running totals and the indices of the out-of-range values in the
+# last batch. What happens when a batch has out-of-range values depends on the
+# policy:
+#   'warn'      print one warning per batch to stderr (default)
+#   'warn_once' print a warning for the first such batch only
+#   'strict'    raise ValueError
+#   'silent'    only record the batch
+#
+# Batches from several threads can be recorded at once: a lock keeps the totals
+# exact, and 'warn_once' still warns once. last is the report of whichever
+# batch finished last, so threads should use the report a check returns.
+#
+
+import sys
+import threading
+from collections import namedtuple
+
+MIDI_MIN = 0
+MIDI_MAX = 127
+
+POLICIES = ('warn', 'warn_once', 'strict', 'silent')
+
+# indices is a list for list input and a NumPy array for array input
+RangeReport = namedtuple('RangeReport', ['size', 'count', 'indices'])
+
+class Diagnostics():
+    def __init__(self, policy='warn', stream=None):
+        check_policy(policy)
+
+        self.policy = policy
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        return 'Diagnostics(policy=%r, batches=%i, values=%i, out_of_range=%i)' % \
+            (self.policy, self.batches, self.values, self.out_of_range)
+
+    def reset(self):
+        self.batches = 0
+        self.values = 0
+        self.out_of_range = 0
+        self.last = None
+        self.warned = False
+
+    def check_midi(self, midi_notes):
+        # min and max run in C, so in-range batches are never scanned in Python
+        if midi_notes and (min(midi_notes) < MIDI_MIN or max(midi_notes) > MIDI_MAX):
+            indices = [i for i, midi_note in enumerate(midi_notes) \
+                if midi_note < MIDI_MIN or midi_note > MIDI_MAX]
+        else:
+            indices = []
+
+        return self.record(len(midi_notes), indices)
+
+    def record(self, size, indices):
+        count = len(indices)
+        report = RangeReport(size, count, indices)
+
+        with self.lock:
+            self.batches += 1
+            self.values += size
+            self.out_of_range += count
+            self.last = report
+
+        if count:
+            self.handle(count, indices)
+
+        return report
+
+    def handle(self, count, indices):
+        if self.policy == 'strict':
+            raise ValueError('%s outside of the defined range 0-127 (first at index %i).' % \
+                (describe_count(count), indices[0]))
+
+        if self.policy == 'silent':
+            return
+
+        with self.lock:
+            (warned, self.warned) = (self.warned, True)
+
+        if self.policy == 'warn_once' and warned:
+            return
+
+        print('[warning] %s outside of the defined range 0-127.' % describe_count(count), \
+            file=self.stream or sys.stderr)
+
+    def summary(self):
+        return {
+            'policy': self.policy,
+            'batches': self.batches,
+            'values': self.values,
+            'out_of_range': self.out_of_range
+        }
+
+# Helper functions
+def check_policy(policy):
+    if policy not in POLICIES:
+        raise ValueError('Policy must be one of: %s.' % ', '.join(POLICIES))
+
+def describe_count(count):
+    return 'MIDI note' if count == 1 else '%i MIDI notes' % count
+
+# Module-level access to the Diagnostics object used by all conversions
+active = Diagnostics()
+
+def get_diagnostics():
+    return active
+
+def set_range_policy(policy):
+    check_policy(policy)
+    active.policy = policy
+    active.warned = False
+
+    return active
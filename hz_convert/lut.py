@@ -0,0 +1,87 @@
+#
+# Table-driven conversions for quantized MIDI values
+#
+# A LookupTable precomputes Hz for every MIDI value on a fixed grid (for
+# example every cent from MIDI 0 to 127) at a handful of A4 references.
+#
+# Grid values are answered by direct index. The table holds exactly what
+# converters.one_midi_to_hz returns, so results differ from it by zero and from
+# the unrounded frequency by at most 0.0005 Hz, the rounding of
+# one_midi_to_hz. Values off the grid, outside its range, or at other A4
+# references fall back to the exact math.
+#
+# Hz to MIDI has no table: it needs a logarithm to find the index anyway, and
+# NumPy's vectorized log is already faster than searching a table.
+#
+
+import numpy as np
+
+from . import batch, converters
+from .converters import STD_A4
+
+class LookupTable():
+    def __init__(self, a4_hz=STD_A4, low=0, high=127, steps_per_semitone=100):
+        if type(a4_hz) in (float, int):
+            a4_hz = [a4_hz]
+
+        if int(low) != low or int(high) != high or high <= low:
+            raise ValueError('Table range must be given by integer MIDI values with low < high.')
+
+        if int(steps_per_semitone) != steps_per_semitone or steps_per_semitone < 1:
+            raise ValueError('steps_per_semitone must be a positive integer.')
+
+        self.a4_hz = tuple(float(a4) for a4 in a4_hz)
+        self.low = int(low)
+        self.high = int(high)
+        self.steps_per_semitone = int(steps_per_semitone)
+
+        self.first_step = self.low * self.steps_per_semitone
+        self.grid = np.arange(self.first_step, self.high * self.steps_per_semitone + 1) / self.steps_per_semitone
+
+        # Each A4 gets an array for vectorized lookups and a list for scalar ones
+        self.hz = {}
+        self.hz_lists = {}
+
+        for a4 in self.a4_hz:
+            self.hz[a4] = batch.midi_to_hz(self.grid, a4)
+            self.hz_lists[a4] = self.hz[a4].tolist()
+
+    def __repr__(self):
+        return 'LookupTable(a4_hz=%r, low=%i, high=%i, steps_per_semitone=%i)' % \
+            (self.a4_hz, self.low, self.high, self.steps_per_semitone)
+
+    def midi_to_hz(self, midi_notes, a4_hz=STD_A4):
+        midi_notes = batch.as_float_array(midi_notes, 'midi_to_hz')
+        table = self.hz.get(float(a4_hz))
+
+        if table is None:
+            return batch.midi_to_hz(midi_notes, a4_hz)
+
+        steps = np.rint(midi_notes * self.steps_per_semitone)
+        hits = steps / self.steps_per_semitone == midi_notes
+        steps -= self.first_step
+        hits &= (steps >= 0) & (steps < len(table))
+
+        with np.errstate(invalid='ignore'): # non-finite values are misses
+            hzs = table.take(steps.astype(np.intp), mode='clip')
+
+        if not hits.all():
+            misses = ~hits
+            hzs[misses] = batch.midi_to_hz(midi_notes[misses], a4_hz)
+
+        return hzs
+
+    def one_midi_to_hz(self, midi_note, a4_hz=STD_A4):
+        table = self.hz_lists.get(a4_hz)
+
+        if table is not None:
+            try:
+                step = round(midi_note * self.steps_per_semitone)
+            except (ValueError, OverflowError): # NaN or infinity
+                step = None
+            else:
+                index = step - self.first_step
+                if 0 <= index < len(table) and step / self.steps_per_semitone == midi_note:
+                    return table[index]
+
+        return converters.one_midi_to_hz(midi_note, a4_hz)
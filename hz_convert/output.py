@@ -0,0 +1,128 @@
+#
+# Bulk output formatting
+#
+# Formatters for large tables write into a text buffer (an io.StringIO, an open
+# file, sys.stdout) one block of values at a time, formatting each block with a
+# single %-template instead of building one string per value. Pitch names are
+# assembled from two tables: name prefixes such as 'C#4 (' for every
+# (diatonic_pc, accidental, octave) triple, and cents suffixes such as
+# '+12.3 c)'. Both tables fill on first use.
+#
+
+from itertools import chain
+
+BLOCK_SIZE = 4096 # values or rows per write
+FORMATS = ('csv', 'tsv', 'jsonl')
+
+class NamePrefixes(dict):
+    def __missing__(self, key):
+        (diatonic_pc, accidental, octave) = key
+        prefix = self[key] = diatonic_pc + accidental + '%i (' % octave
+        return prefix
+
+class CentsSuffixes(dict):
+    # Only tenths of a cent within +/-100 cents are stored, which bounds the
+    # table at 2001 entries. Other values are formatted on every call.
+    def __missing__(self, cents_dev):
+        suffix = ('+' if cents_dev >= 0 else '-') + '%.1f c)' % abs(cents_dev)
+        if -100 <= cents_dev <= 100 and round(cents_dev, 1) == cents_dev:
+            self[cents_dev] = suffix
+        return suffix
+
+NAME_PREFIXES = NamePrefixes()
+CENTS_SUFFIXES = CentsSuffixes()
+
+# Pitch names
+def pitch_name(diatonic_pc, accidental, octave, cents_dev):
+    return NAME_PREFIXES[(diatonic_pc, accidental, octave)] + CENTS_SUFFIXES[cents_dev]
+
+def pitch_names(diatonic_pcs, accidentals, octaves, cents_devs):
+    # Takes four columns of plain Python values (use tolist() on arrays)
+    prefixes = map(NAME_PREFIXES.__getitem__, zip(diatonic_pcs, accidentals, octaves))
+    return list(map(str.__add__, prefixes, map(CENTS_SUFFIXES.__getitem__, cents_devs)))
+
+def pitch_obj_names(pitches):
+    return pitch_names([pitch.diatonic_pc for pitch in pitches], [pitch.accidental for pitch in pitches], \
+        [pitch.octave for pitch in pitches], [pitch.cents_dev for pitch in pitches])
+
+# Writers
+def write_values(values, out, precision=None, sep='\n', block_size=BLOCK_SIZE):
+    # With a precision every value is formatted as '%.<precision>f', otherwise
+    # as str(). Values are written with sep after each one.
+    value_format = '%s' if precision is None else '%%.%if' % precision
+
+    for start in range(0, len(values), block_size):
+        block = tuple(values[start:start + block_size])
+        out.write((value_format + sep) * len(block) % block)
+
+def write_pitch_names(pitches, out, sep='\n', block_size=BLOCK_SIZE):
+    for start in range(0, len(pitches), block_size):
+        names = pitch_obj_names(pitches[start:start + block_size])
+        out.write(sep.join(names) + sep)
+
+def write_header(names, out, out_format='csv'):
+    check_format(out_format)
+
+    if out_format != 'jsonl':
+        out.write(('\t' if out_format == 'tsv' else ',').join(names) + '\n')
+
+def write_rows(names, columns, out, out_format='csv', block_size=BLOCK_SIZE):
+    # Writes one row per index of the columns (sequences of str, int or float)
+    # in the same text as csv.writer or json.dumps would produce.
+    check_format(out_format)
+    row_count = min(len(column) for column in columns) if columns else 0
+
+    for start in range(0, row_count, block_size):
+        stop = min(start + block_size, row_count)
+        block = [column[start:stop] for column in columns]
+
+        if out_format == 'jsonl':
+            write_jsonl_block(names, block, out)
+        else:
+            write_delimited_block(block, out, '\t' if out_format == 'tsv' else ',')
+
+def write_delimited_block(block, out, delimiter):
+    for column in block:
+        if column and isinstance(column[0], str) and needs_quoting(column, delimiter, len(block)):
+            import csv
+            csv.writer(out, delimiter=delimiter, lineterminator='\n').writerows(zip(*block))
+            return
+
+    template = delimiter.join(['%s'] * len(block)) + '\n'
+    out.write(template * len(block[0]) % tuple(chain.from_iterable(zip(*block))))
+
+def write_jsonl_block(names, block, out):
+    from json.encoder import encode_basestring_ascii
+
+    fields = []
+    for column in block:
+        if column and isinstance(column[0], str):
+            column = list(map(encode_basestring_ascii, column))
+        elif not is_finite_sum(column):
+            # json.dumps spells non-finite floats NaN and Infinity
+            import json
+            out.writelines(json.dumps(dict(zip(names, row))) + '\n' for row in zip(*block))
+            return
+        fields.append(column)
+
+    template = '{' + ', '.join(encode_basestring_ascii(name) + ': %s' for name in names) + '}\n'
+    out.write(template * len(fields[0]) % tuple(chain.from_iterable(zip(*fields))))
+
+# Helper functions
+def check_format(out_format):
+    if out_format not in FORMATS:
+        raise ValueError('Output format must be one of: %s.' % ', '.join(FORMATS))
+
+def needs_quoting(column, delimiter, field_count):
+    text = ''.join(column)
+    if delimiter in text or '"' in text or '\n' in text or '\r' in text:
+        return True
+
+    # csv.writer quotes an empty string when it is the only field in a row
+    return field_count == 1 and '' in column
+
+def is_finite_sum(column):
+    # The sum of a numeric column is finite only if every value is (a large
+    # enough column can also overflow, which only costs the fast path)
+    total = sum(column)
+    return total - total == 0
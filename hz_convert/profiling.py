@@ -0,0 +1,184 @@
+#
+# Opt-in per-stage timing of conversions
+#
+# enable_profiling() replaces the per-note and formatting functions of
+# converters (and Diagnostics.check_midi) with timed wrappers, along with the
+# from_* functions that the package re-exports, and disable_profiling() puts
+# the originals back, so profiling costs nothing while it is off. Every function belongs to one stage:
+#   convert  from_pitch, from_midi, from_hz (the whole call)
+#   parse    pitch strings to fields and MIDI values
+#   math     Hz <-> MIDI arithmetic
+#   pitch    Pitch construction from MIDI values
+#   format   pitch names and output strings
+#   range    MIDI range checks
+# Times include everything a function calls, so the convert stage contains the
+# others. A call nested inside another call of the same stage is not counted
+# again. Functions cached through hz_convert.cache are only timed on a miss.
+#
+# Counters are not locked; profile from one thread at a time.
+#
+
+import sys
+import time
+from functools import wraps
+
+from . import converters, diagnostics
+
+# Items of a call counted from the 'midi' list of its result
+RESULT = 'result'
+
+# (stage, owner, attribute, position of the argument that holds the items,
+# RESULT, or None for one item per call)
+STAGE_FUNCTIONS = (
+    ('convert', converters, 'from_pitch', RESULT),
+    ('convert', converters, 'from_midi', RESULT),
+    ('convert', converters, 'from_hz', RESULT),
+    ('parse', converters, 'parse_pitch_str', None),
+    ('parse', converters, 'one_pitch_str_to_pitch_obj', None),
+    ('parse', converters, 'one_pitch_str_to_midi', None),
+    ('math', converters, 'hz_to_midi_value', None),
+    ('math', converters, 'one_hz_to_midi', None),
+    ('math', converters, 'one_midi_to_hz', None),
+    ('pitch', converters, 'one_midi_to_pitch', None),
+    ('format', converters, 'one_pitch_string', None),
+    ('format', converters, 'add_pitch_name', None),
+    ('format', converters, 'pitch_string', 0),
+    ('format', converters, 'hz_string', 0),
+    ('format', converters, 'midi_string', 0),
+    ('range', diagnostics.Diagnostics, 'check_midi', 1)
+)
+
+STAGES = ('convert', 'parse', 'math', 'pitch', 'format', 'range')
+
+class StageCounter():
+    __slots__ = ('calls', 'items', 'ns', 'depth')
+
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.ns = 0
+        self.depth = 0
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'items': self.items,
+            'ns': self.ns,
+            'items_per_sec': self.items / (self.ns / 1e9) if self.ns else 0.0
+        }
+
+class Profiler():
+    def __init__(self):
+        self.counters = {stage: StageCounter() for stage in STAGES}
+        self.originals = []
+
+    def __repr__(self):
+        return 'Profiler(%s)' % ('enabled' if self.enabled else 'disabled')
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    @property
+    def enabled(self):
+        return bool(self.originals)
+
+    def enable(self):
+        if self.enabled:
+            return
+
+        # hz_convert re-exports the from_* functions, which would otherwise
+        # keep the untimed originals
+        package = sys.modules[__package__]
+
+        for (stage, owner, attribute, items_arg) in STAGE_FUNCTIONS:
+            function = getattr(owner, attribute)
+            wrapper = timed(function, self.counters[stage], items_arg)
+
+            for target in (owner, package):
+                if target is owner or getattr(target, attribute, None) is function:
+                    self.originals.append((target, attribute, function))
+                    setattr(target, attribute, wrapper)
+
+    def disable(self):
+        for (owner, attribute, function) in reversed(self.originals):
+            setattr(owner, attribute, function)
+        self.originals = []
+
+    def reset(self):
+        for counter in self.counters.values():
+            (counter.calls, counter.items, counter.ns) = (0, 0, 0)
+
+    def report(self):
+        return {stage: counter.as_dict() for stage, counter in self.counters.items()}
+
+    def to_json(self, path=None):
+        import json
+
+        text = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+
+        return text
+
+def timed(function, counter, items_arg):
+    perf_counter_ns = time.perf_counter_ns
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if counter.depth:
+            return function(*args, **kwargs)
+
+        counter.depth = 1
+        start = perf_counter_ns()
+        result = None
+        try:
+            result = function(*args, **kwargs)
+            return result
+        finally:
+            counter.ns += perf_counter_ns() - start
+            counter.depth = 0
+            counter.calls += 1
+            if items_arg is None:
+                counter.items += 1
+            elif items_arg == RESULT:
+                counter.items += len(result['midi']) if result is not None else 0
+            else:
+                counter.items += count_items(args[items_arg] if len(args) > items_arg else None)
+
+    # Keep the lru_cache controls of parse_pitch_str reachable
+    for attribute in ('cache_info', 'cache_clear'):
+        if hasattr(function, attribute):
+            setattr(wrapper, attribute, getattr(function, attribute))
+
+    return wrapper
+
+def count_items(value):
+    if isinstance(value, str):
+        return len(value.split())
+    if hasattr(value, '__len__'):
+        return len(value)
+    return 1
+
+# Module-level access, like hz_convert.cache
+profiler = None
+
+def enable_profiling():
+    global profiler
+
+    if profiler is None:
+        profiler = Profiler()
+    profiler.enable()
+
+    return profiler
+
+def disable_profiling():
+    if profiler is not None:
+        profiler.disable()
+
+def get_profiler():
+    return profiler
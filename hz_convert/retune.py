@@ -0,0 +1,185 @@
+#
+# Encoding fractional MIDI values for playback (requires NumPy)
+#
+# A synthesizer plays fractional MIDI values in one of two ways:
+#
+# - Pitch bend. Each note is played on its nearest key and bent by the rest.
+#   encode_bends() returns the key, the 14-bit bend value and the channel of
+#   every note, plus ready-made messages: a pitch bend followed by a note-on
+#   (6 bytes per note) and a note-off (3 bytes per note). Pitch bend applies
+#   to a whole channel, so notes with different bends that sound together need
+#   different channels. With allocation='bend', notes share a channel exactly
+#   when they share a bend value, which is safe for any polyphony as long as
+#   the score uses no more distinct bends than there are channels (two for
+#   24-EDO, for instance). With allocation='cycle', notes take the channels in
+#   turn, which suits scores whose polyphony is below the number of channels.
+#   A value is decoded as key + (bend - 8192) / 8192 * bend_range, the same
+#   rule as hz_convert.smf uses.
+#
+# - MIDI Tuning Standard. encode_mts() retunes a key to each value with
+#   real-time single note tuning changes (F0 7F <device> 08 02 ...), up to 127
+#   keys per message. Each key gets its semitone and a 14-bit fraction of a
+#   semitone (100/16384 cents). 7F 7F 7F means "no change" in the standard, so
+#   values at the very top of the range stop one fraction short of it.
+#
+# Everything is computed with array operations; no Python objects are built
+# per note. Byte buffers are uint8 arrays, and .tobytes() packs them.
+#
+
+import numpy as np
+
+from .batch import as_float_array, check_values
+
+BEND_CENTER = 8192
+BEND_MAX = 16383
+MTS_STEPS = 16384 # fractions of a semitone in a tuning change
+MTS_MAX_FRACTION = MTS_STEPS - 2 # the last fraction of key 127 means "no change"
+MAX_TUNING_CHANGES = 127 # keys per tuning change message
+DEFAULT_VELOCITY = 64
+PLAYBACK_CHANNELS = tuple(channel for channel in range(16) if channel != 9) # 10 is for percussion
+ALLOCATIONS = ('bend', 'cycle')
+
+def encode_bends(midi_notes, bend_range=2.0, channels=PLAYBACK_CHANNELS, allocation='bend', \
+        velocity=DEFAULT_VELOCITY):
+    midi_notes = as_float_array(midi_notes, 'encode_bends')
+    check_values(midi_notes, 'encode_bends')
+    (semitones, cents) = split_bend_range(bend_range)
+    bend_range = semitones + cents / 100 # as the receiver will set it
+    channels = check_channels(channels)
+    if not 0 <= velocity <= 127:
+        raise ValueError('The velocity must be from 0 to 127.')
+
+    # Halfway values take the key above, so quarter tones always bend down
+    keys = np.clip(np.floor(midi_notes + 0.5), 0, 127)
+    offsets = midi_notes - keys
+    out_of_range = np.flatnonzero(np.abs(offsets) > bend_range)
+    if len(out_of_range):
+        raise ValueError('MIDI value %r at index %i is out of reach of a bend range of %r semitones.' % \
+            (float(midi_notes[out_of_range[0]]), out_of_range[0], bend_range))
+
+    bends = np.rint(offsets * (BEND_CENTER / bend_range))
+    bends += BEND_CENTER
+    np.clip(bends, 0, BEND_MAX, out=bends)
+    bends = bends.astype(np.int64)
+    keys = keys.astype(np.int64)
+
+    # Channel allocation
+    if allocation == 'bend':
+        (distinct_bends, bend_indices) = np.unique(bends, return_inverse=True)
+        if len(distinct_bends) > len(channels):
+            raise ValueError('The notes use %i different bends but only %i channels are available.' % \
+                (len(distinct_bends), len(channels)))
+        note_channels = channels[bend_indices.reshape(-1)]
+    elif allocation == 'cycle':
+        note_channels = channels[np.arange(len(keys)) % len(channels)]
+    else:
+        raise ValueError('Channel allocation must be one of %s.' % ', '.join(ALLOCATIONS))
+
+    # Pitch bend and note-on messages
+    note_on = np.empty((len(keys), 6), dtype=np.uint8)
+    note_on[:, 0] = 0xE0 | note_channels
+    note_on[:, 1] = bends & 0x7F
+    note_on[:, 2] = bends >> 7
+    note_on[:, 3] = 0x90 | note_channels
+    note_on[:, 4] = keys
+    note_on[:, 5] = velocity
+
+    note_off = np.empty((len(keys), 3), dtype=np.uint8)
+    note_off[:, 0] = 0x80 | note_channels
+    note_off[:, 1] = keys
+    note_off[:, 2] = 0
+
+    return {
+        'midi': midi_notes,
+        'key': keys,
+        'bend': bends,
+        'channel': note_channels,
+        'note_on': note_on,
+        'note_off': note_off,
+        'setup': bend_range_messages(np.unique(note_channels), bend_range)
+    }
+
+def bend_range_messages(channels, bend_range=2.0):
+    # RPN 0 messages that set the bend range of each channel, followed by the
+    # null RPN, as one uint8 buffer
+    (semitones, cents) = split_bend_range(bend_range)
+    channels = check_channels(channels)
+
+    messages = np.empty((len(channels), 6, 3), dtype=np.uint8)
+    messages[:, :, 0] = (0xB0 | channels)[:, np.newaxis]
+    messages[:, :, 1:] = [[101, 0], [100, 0], [6, semitones], [38, cents], [101, 127], [100, 127]]
+
+    return messages.reshape(-1)
+
+def encode_mts(midi_notes, keys=None, device=0x7F, program=0):
+    # keys are the keys to retune, by default the nearest key of each value
+    midi_notes = as_float_array(midi_notes, 'encode_mts')
+    check_values(midi_notes, 'encode_mts')
+
+    if np.any((midi_notes < 0) | (midi_notes >= 128)):
+        raise ValueError('The MIDI Tuning Standard covers MIDI values from 0 up to 128.')
+
+    if keys is None:
+        keys = np.minimum(np.rint(midi_notes), 127).astype(np.int64)
+    else:
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+        if keys.shape != midi_notes.shape or np.any((keys < 0) | (keys > 127)):
+            raise ValueError('encode_mts needs one key from 0 to 127 for every MIDI value.')
+
+    semitones = np.floor(midi_notes)
+    fractions = np.rint((midi_notes - semitones) * MTS_STEPS).astype(np.int64)
+    semitones = semitones.astype(np.int64)
+
+    # A fraction that rounds up to a whole semitone moves to the next one,
+    # except at the top of the range, which ends below 7F 7F 7F
+    carry = fractions == MTS_STEPS
+    semitones[carry] += 1
+    fractions[carry] = 0
+    top = (semitones > 127) | ((semitones == 127) & (fractions > MTS_MAX_FRACTION))
+    semitones[top] = 127
+    fractions[top] = MTS_MAX_FRACTION
+
+    tuning = np.empty((len(keys), 4), dtype=np.uint8)
+    tuning[:, 0] = keys
+    tuning[:, 1] = semitones
+    tuning[:, 2] = fractions >> 7
+    tuning[:, 3] = fractions & 0x7F
+
+    return {
+        'midi': midi_notes,
+        'key': keys,
+        'tuning': tuning,
+        'sysex': pack_tuning_changes(tuning, device, program)
+    }
+
+def pack_tuning_changes(tuning, device, program):
+    # Single note tuning change messages of up to MAX_TUNING_CHANGES keys,
+    # as one uint8 buffer
+    counts = np.diff(np.append(np.arange(0, len(tuning), MAX_TUNING_CHANGES), len(tuning)))
+    sysex = np.empty(8 * len(counts) + 4 * len(tuning), dtype=np.uint8)
+
+    position = 0
+    for message, count in enumerate(counts.tolist()):
+        first = message * MAX_TUNING_CHANGES
+        sysex[position:position + 7] = [0xF0, 0x7F, device, 0x08, 0x02, program, count]
+        sysex[position + 7:position + 7 + 4 * count] = tuning[first:first + count].reshape(-1)
+        position += 7 + 4 * count
+        sysex[position] = 0xF7
+        position += 1
+
+    return sysex
+
+# Helper functions
+def split_bend_range(bend_range):
+    # Semitones and cents, as sent through RPN 0
+    total_cents = round(bend_range * 100)
+    if not 0 < total_cents < 12800:
+        raise ValueError('The bend range must be at least 1 cent and less than 128 semitones.')
+
+    return divmod(total_cents, 100)
+
+def check_channels(channels):
+    channels = np.asarray(channels, dtype=np.int64).reshape(-1)
+    if not len(channels) or np.any((channels < 0) | (channels > 15)):
+        raise ValueError('Channels must be numbered from 0 to 15.')
+    return channels
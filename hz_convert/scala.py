@@ -0,0 +1,239 @@
+#
+# Tuning tables from Scala scale (.scl) and keyboard mapping (.kbm) files
+#
+# A ScaleTable assigns a frequency to every mapped key of the keyboard, sorts
+# the keys by log2 frequency, and answers 'which key is nearest to this
+# frequency, and how far off is it in cents?' by binary search. This works for
+# any scale, including just intonation, where no closed-form formula does.
+#
+# Without a keyboard mapping, scale degree 0 sits on key 60 and the scale
+# repeats linearly up and down the keyboard, with key 69 tuned to a4_hz. A
+# keyboard mapping sets its own reference frequency, and a4_hz is ignored.
+#
+# See https://www.huygens-fokker.org/scala/scl_format.html for the formats.
+#
+
+import math
+import os
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+from .converters import STD_A4, normalize_values
+
+SCALE_CACHE_SIZE = 64
+
+# cents lists degrees 1 through n; the last entry is the period (usually the
+# octave) and degree 0 is always 0 cents
+Scale = namedtuple('Scale', ['description', 'cents'])
+
+# mapping holds one scale degree (or None for an unmapped key) per key in the
+# repeating pattern, which is empty for a linear mapping
+KeyboardMap = namedtuple('KeyboardMap', ['first_key', 'last_key', 'middle_key', 'ref_key', 'ref_hz', \
+    'octave_degree', 'mapping'])
+
+class ScaleTable():
+    def __init__(self, scale, keyboard_map=None, a4_hz=STD_A4):
+        if keyboard_map is None:
+            keyboard_map = KeyboardMap(0, 127, 60, 69, float(a4_hz), len(scale.cents), [])
+
+        self.scale = scale
+        self.keyboard_map = keyboard_map
+        self.degree_cents = [0.0] + list(scale.cents[:-1])
+        self.period_cents = scale.cents[-1]
+
+        ref_cents = self.key_cents(keyboard_map.ref_key)
+        if ref_cents is None:
+            raise ValueError('The reference key of the keyboard mapping is not mapped to a scale degree.')
+
+        # Sorted index of (log2 Hz, key, degree) over every mapped key
+        entries = []
+        self.hz_by_key = {}
+
+        for key in range(keyboard_map.first_key, keyboard_map.last_key + 1):
+            cents = self.key_cents(key)
+            if cents is not None:
+                hz = keyboard_map.ref_hz * 2**((cents - ref_cents) / 1200)
+                entries.append((math.log2(hz), key, self.key_degree(key)))
+                self.hz_by_key[key] = round(hz, 3)
+
+        if not entries:
+            raise ValueError('The keyboard mapping does not map any keys.')
+
+        entries.sort()
+        self.log_hzs = [entry[0] for entry in entries]
+        self.keys = [entry[1] for entry in entries]
+        self.degrees = [entry[2] for entry in entries]
+
+    def __repr__(self):
+        return 'ScaleTable(%r, %i notes, %i keys)' % (self.scale.description, len(self.scale.cents), len(self.keys))
+
+    def __len__(self):
+        return len(self.keys)
+
+    # Keyboard mapping
+    def total_degree(self, key):
+        # Scale degree of a key counted from degree 0 on the middle key, or
+        # None if the key is unmapped
+        offset = key - self.keyboard_map.middle_key
+        mapping = self.keyboard_map.mapping
+
+        if not mapping:
+            return offset
+
+        (octaves, index) = divmod(offset, len(mapping))
+        if mapping[index] is None:
+            return None
+
+        return mapping[index] + octaves * self.keyboard_map.octave_degree
+
+    def key_cents(self, key):
+        total_degree = self.total_degree(key)
+        if total_degree is None:
+            return None
+
+        (periods, degree) = divmod(total_degree, len(self.degree_cents))
+        return periods * self.period_cents + self.degree_cents[degree]
+
+    def key_degree(self, key):
+        return self.total_degree(key) % len(self.degree_cents)
+
+    def key_to_hz(self, key):
+        try:
+            return self.hz_by_key[key]
+        except KeyError:
+            raise ValueError('Key %r is not mapped to a scale degree.' % key)
+
+    # Nearest-key search
+    def nearest(self, hz):
+        # Returns (key, degree, cents_dev) for the key nearest to hz
+        (i, cents_dev) = self.nearest_index(hz)
+        return (self.keys[i], self.degrees[i], cents_dev)
+
+    def nearest_index(self, hz):
+        # Returns the position of the nearest key in the index and the
+        # deviation from it in cents
+        if not hz > 0:
+            raise ValueError('Hz values must be greater than 0.')
+
+        log_hz = math.log2(hz)
+        log_hzs = self.log_hzs
+        i = bisect_left(log_hzs, log_hz)
+
+        if i == len(log_hzs) or (i > 0 and log_hz - log_hzs[i - 1] <= log_hzs[i] - log_hz):
+            i -= 1
+
+        return (i, round(1200 * (log_hz - log_hzs[i]), 1))
+
+    def from_hz(self, hzs):
+        hzs = normalize_values(hzs, 'from_hz', positive=True)
+        nearest = [self.nearest(hz) for hz in hzs]
+
+        return {
+            'hz': hzs,
+            'key': [result[0] for result in nearest],
+            'degree': [result[1] for result in nearest],
+            'cents_dev': [result[2] for result in nearest]
+        }
+
+# Loading
+def load_scale(scl_path, kbm_path=None, a4_hz=STD_A4):
+    # Tables are cached by path, modification time and size, so a file that
+    # changes on disk is read again
+    return cached_table(file_signature(scl_path), file_signature(kbm_path), float(a4_hz))
+
+@lru_cache(maxsize=SCALE_CACHE_SIZE)
+def cached_table(scl_signature, kbm_signature, a4_hz):
+    with open(scl_signature[0], encoding='latin-1') as f:
+        scale = parse_scl(f.read())
+
+    keyboard_map = None
+    if kbm_signature is not None:
+        with open(kbm_signature[0], encoding='latin-1') as f:
+            keyboard_map = parse_kbm(f.read())
+
+    return ScaleTable(scale, keyboard_map, a4_hz)
+
+def file_signature(path):
+    if path is None:
+        return None
+
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+# Parsing
+def parse_scl(text):
+    lines = content_lines(text)
+
+    try:
+        description = next(lines).strip()
+        count = int(next(lines).split()[0])
+    except (StopIteration, IndexError, ValueError):
+        raise ValueError('Invalid Scala file: missing description or note count.')
+
+    if count < 1:
+        raise ValueError('Invalid Scala file: the scale must have at least one note.')
+
+    cents = []
+    for line in lines:
+        if len(cents) == count:
+            break
+        cents.append(parse_pitch_value(line))
+
+    if len(cents) < count:
+        raise ValueError('Invalid Scala file: expected %i notes, found %i.' % (count, len(cents)))
+
+    if cents[-1] <= 0:
+        raise ValueError('Invalid Scala file: the period must be greater than 0 cents.')
+
+    return Scale(description, cents)
+
+def parse_kbm(text):
+    lines = (line for line in content_lines(text) if line.strip())
+
+    try:
+        size = int(next(lines).split()[0])
+        (first_key, last_key, middle_key, ref_key) = [int(next(lines).split()[0]) for _ in range(4)]
+        ref_hz = float(next(lines).split()[0])
+        octave_degree = int(next(lines).split()[0])
+    except (StopIteration, IndexError, ValueError):
+        raise ValueError('Invalid keyboard mapping: the header needs seven numbers.')
+
+    if size < 0 or not first_key <= last_key or not ref_hz > 0:
+        raise ValueError('Invalid keyboard mapping: bad map size, key range or reference frequency.')
+
+    mapping = []
+    for line in lines:
+        if len(mapping) == size:
+            break
+        entry = line.split()[0]
+        try:
+            mapping.append(None if entry.lower() == 'x' else int(entry))
+        except ValueError:
+            raise ValueError('Invalid keyboard mapping: %r is not a scale degree or x.' % entry)
+
+    # Missing entries at the end of the map are unmapped
+    mapping += [None] * (size - len(mapping))
+
+    return KeyboardMap(first_key, last_key, middle_key, ref_key, ref_hz, octave_degree, mapping)
+
+def parse_pitch_value(line):
+    # A value with a period is in cents, anything else is a ratio like 3/2 or 2
+    token = line.split()[0] if line.split() else ''
+
+    try:
+        if '.' in token:
+            return float(token)
+
+        (numerator, _, denominator) = token.partition('/')
+        ratio = int(numerator) / int(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        raise ValueError('Invalid Scala file: %r is not a cents value or ratio.' % token)
+
+    if ratio <= 0:
+        raise ValueError('Invalid Scala file: ratios must be positive.')
+
+    return 1200 * math.log2(ratio)
+
+def content_lines(text):
+    return (line for line in text.splitlines() if not line.startswith('!'))
@@ -0,0 +1,316 @@
+#! /usr/bin/env python3
+
+#
+# Asyncio conversion server with request batching
+#
+# Clients send one request per line over TCP or a Unix socket, either as JSON
+#   {"id": 1, "from": "hz", "values": [440, 261.6], "a4": 442}
+# or in the line protocol
+#   hz a4=442 440 261.6
+# Concurrent requests with the same input type and A4 that arrive within the
+# batch window are converted together by one batch call, then split up again.
+#
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+
+from . import batch
+from .converters import STD_A4
+
+BATCH_WINDOW = 0.002 # seconds
+MAX_BATCH = 65536 # values
+LINE_BYTES_PER_VALUE = 32 # room per value in the longest accepted request line
+MIN_LINE_LIMIT = 2**16 # bytes, asyncio's default
+
+CONVERTERS = {
+    'hz': batch.batch_from_hz,
+    'midi': batch.batch_from_midi,
+    'pitch': batch.batch_from_pitch
+}
+
+class ServerStats():
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.values = 0
+        self.batches = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record_request(self, values, latency, error=False):
+        self.requests += 1
+        self.errors += error
+        self.values += values
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'values': self.values,
+            'batches': self.batches,
+            'mean_batch_size': self.values / self.batches if self.batches else 0.0,
+            'mean_latency_ms': 1000 * self.total_latency / self.requests if self.requests else 0.0,
+            'max_latency_ms': 1000 * self.max_latency,
+            'values_per_second': self.values / elapsed if elapsed > 0 else 0.0,
+            'uptime_s': elapsed
+        }
+
+class Batcher():
+    def __init__(self, window=BATCH_WINDOW, max_batch=MAX_BATCH, stats=None):
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = stats if stats is not None else ServerStats()
+        self.pending = {}
+        self.counts = {}
+        self.timers = {}
+
+    async def convert(self, source, values, a4_hz=STD_A4):
+        if source not in CONVERTERS:
+            raise ValueError('Input type must be one of: %s.' % ', '.join(CONVERTERS))
+
+        key = (source, float(a4_hz))
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self.pending.setdefault(key, [])
+        queue.append((list(values), future))
+        self.counts[key] = self.counts.get(key, 0) + len(queue[-1][0])
+
+        if self.counts[key] >= self.max_batch:
+            self.flush(key)
+        elif key not in self.timers:
+            self.timers[key] = loop.call_later(self.window, self.flush, key)
+
+        return await future
+
+    def flush(self, key):
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        queue = self.pending.pop(key, [])
+        self.counts.pop(key, None)
+        if not queue:
+            return
+
+        (source, a4_hz) = key
+        convert = CONVERTERS[source]
+        values = [value for queued, _ in queue for value in queued]
+        self.stats.batches += 1
+
+        try:
+            result = convert(values, a4_hz)
+        except (TypeError, ValueError):
+            # Convert the requests one at a time so only the bad ones fail
+            for queued, future in queue:
+                self.resolve(future, convert, queued, a4_hz)
+            return
+        except Exception as e:
+            # Anything else fails the whole batch, but every client gets a reply
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        start = 0
+        for queued, future in queue:
+            stop = start + len(queued)
+            if not future.done():
+                future.set_result(slice_result(result, start, stop))
+            start = stop
+
+    def resolve(self, future, convert, values, a4_hz):
+        if future.done():
+            return
+
+        try:
+            future.set_result(slice_result(convert(values, a4_hz), 0, len(values)))
+        except (TypeError, ValueError) as e:
+            future.set_exception(ValueError(str(e)))
+        except Exception as e:
+            future.set_exception(e)
+
+class ConversionServer():
+    def __init__(self, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.stats = ServerStats()
+        self.batcher = Batcher(window, max_batch, self.stats)
+        # Long enough for a request of max_batch values
+        self.line_limit = max(MIN_LINE_LIMIT, LINE_BYTES_PER_VALUE * max_batch)
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path=path, limit=self.line_limit)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=self.line_limit)
+
+    async def handle_connection(self, reader, writer):
+        # Requests on one connection are handled concurrently so that they can
+        # share batches, but responses are written in request order.
+        responses = asyncio.Queue()
+        sender = asyncio.ensure_future(self.send_responses(responses, writer))
+
+        try:
+            while True:
+                (line, complete) = await read_line(reader)
+                if not line:
+                    break
+                if not complete:
+                    responses.put_nowait(asyncio.ensure_future(self.respond_too_long(line)))
+                elif line.strip():
+                    responses.put_nowait(asyncio.ensure_future(self.respond(line)))
+        except (asyncio.CancelledError, ConnectionError):
+            sender.cancel()
+            writer.close()
+            raise
+
+        responses.put_nowait(None)
+        await sender
+        writer.close()
+
+    async def send_responses(self, responses, writer):
+        while True:
+            task = await responses.get()
+            if task is None:
+                return
+            writer.write(await task)
+            await writer.drain()
+
+    async def respond(self, line):
+        line = line.decode().strip()
+
+        if line.startswith('{'):
+            return await self.respond_json(line)
+        return await self.respond_line(line)
+
+    async def respond_too_long(self, head):
+        # head is the start of a line longer than the limit, which was skipped
+        self.stats.record_request(0, 0.0, error=True)
+        message = 'Requests must be shorter than %i bytes.' % self.line_limit
+
+        if head.lstrip().startswith(b'{'):
+            return (json.dumps({'error': message}) + '\n').encode()
+        return ('error %s\n' % message).encode()
+
+    async def respond_json(self, line):
+        request_id = None
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('Requests must be JSON objects.')
+            request_id = request.get('id')
+
+            if request.get('stats'):
+                response = {'stats': self.stats.as_dict()}
+            else:
+                response = await self.timed_convert(request.get('from'), request.get('values', []), \
+                    request.get('a4', STD_A4))
+        except Exception as e:
+            response = {'error': str(e)}
+
+        if request_id is not None:
+            response = dict(id=request_id, **response)
+
+        return (json.dumps(response) + '\n').encode()
+
+    async def respond_line(self, line):
+        # Line protocol: '<from> [a4=<Hz>] <values...>', or 'stats'. The reply
+        # has one 'hz,midi,pitch name' triple per value, separated by tabs.
+        tokens = line.split()
+
+        if tokens == ['stats']:
+            return (json.dumps(self.stats.as_dict()) + '\n').encode()
+
+        try:
+            a4_hz = STD_A4
+            if len(tokens) > 1 and tokens[1].startswith('a4='):
+                a4_hz = float(tokens.pop(1)[3:])
+
+            result = await self.timed_convert(tokens[0], tokens[1:], a4_hz)
+        except Exception as e:
+            return ('error %s\n' % e).encode()
+
+        rows = zip(result['hz'], result['midi'], result['pitch'])
+        return ('\t'.join('%r,%r,%s' % row for row in rows) + '\n').encode()
+
+    async def timed_convert(self, source, values, a4_hz):
+        start = time.perf_counter()
+
+        try:
+            if isinstance(values, (str, bytes)) or not hasattr(values, '__iter__'):
+                raise ValueError('Values must be a list.')
+            values = list(values)
+            a4_hz = float(a4_hz)
+            if not 0 < a4_hz < math.inf:
+                raise ValueError('A4 must be greater than 0 and finite.')
+            result = await self.batcher.convert(source, values, a4_hz)
+        except Exception:
+            self.stats.record_request(0, time.perf_counter() - start, error=True)
+            raise
+
+        self.stats.record_request(len(values), time.perf_counter() - start)
+
+        return result
+
+# Helper functions
+async def read_line(reader):
+    # Returns (line, True), or (start of the line, False) for a line longer
+    # than the limit of the reader, after skipping the rest of it. The line is
+    # empty at the end of the stream.
+    try:
+        return await reader.readuntil(b'\n'), True
+    except asyncio.IncompleteReadError as e:
+        return e.partial, True
+    except asyncio.LimitOverrunError as e:
+        head = await reader.readexactly(e.consumed)
+
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return head, False
+        except asyncio.IncompleteReadError:
+            return head, False
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+
+def slice_result(result, start, stop):
+    return {
+        'hz': result['hz'][start:stop].tolist(),
+        'midi': result['midi'][start:stop].tolist(),
+        'pitch': result['pitch'][start:stop].names(),
+        'a4': result['a4']
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='hz_convert.server', description='Run the batching conversion server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', default=None, help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--window-ms', type=float, default=1000 * BATCH_WINDOW,
+        help='how long to collect requests into a batch (default: %(default)s)')
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH,
+        help='values per batch before converting early (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    server = ConversionServer(args.window_ms / 1000, args.max_batch)
+
+    async def run():
+        listener = await server.start(args.host, args.port, args.unix)
+        print('Listening on %s' % (args.unix or '%s:%i' % (args.host, args.port)), file=sys.stderr)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#
+# Streaming reader for Standard MIDI Files (.mid)
+#
+# read_notes() walks the tracks of a file in time order and yields a NoteEvent
+# for every note-on and note-off. Each event carries the fractional MIDI value
+# of its note: the key plus the pitch bend of its channel at that moment,
+# scaled by the bend range of the channel. The range is 2 semitones until it is
+# set through RPN 0 (controllers 101 and 100 set to 0, then data entry 6 for
+# semitones and 38 for cents). convert_notes() groups the events into chunks
+# and converts each chunk with from_midi, so Hz values and pitch names are the
+# same as for any other input.
+#
+# Files are memory-mapped and never read as a whole. Every track is parsed by
+# its own generator and heapq.merge interleaves them by tick (tracks of format
+# 2 files play one after another), so memory use depends on the number of
+# tracks and the chunk size, not on the length of the file. Running status is
+# supported. System exclusive events and meta events other than tempo changes
+# are skipped.
+#
+# A note keeps the bend that was active when it started; bends while a note
+# sounds do not produce events. Note-offs are reported with velocity 0, like
+# note-ons of velocity 0, and with the bend active when they happen.
+#
+
+import mmap
+from collections import namedtuple
+from heapq import merge
+from itertools import islice
+
+from . import converters
+from .converters import STD_A4
+
+CHUNK_SIZE = 65536 # events per conversion
+DEFAULT_TEMPO = 500000 # microseconds per quarter note (120 bpm)
+DEFAULT_BEND_RANGE = 2 # semitones
+BEND_CENTER = 8192
+CHANNELS = 16
+
+# Status of the tempo events passed from the track parsers to the merge.
+# Channel messages use their own status byte, 0x80 through 0xEF.
+TEMPO = 0
+
+# Controllers
+DATA_ENTRY = 6
+DATA_ENTRY_FINE = 38
+RPN_LSB = 100
+RPN_MSB = 101
+NRPN_LSB = 98
+NRPN_MSB = 99
+RESET_ALL = 121
+NULL_RPN = (127, 127)
+BEND_RANGE_RPN = (0, 0)
+
+NoteEvent = namedtuple('NoteEvent', ['tick', 'time', 'track', 'channel', 'key', 'velocity', 'midi'])
+
+# Events
+def read_notes(source):
+    # source is a path or a bytes-like object holding the file
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        yield from read_notes_from(source)
+        return
+
+    with open(source, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # empty file
+            raise ValueError('%s is not a Standard MIDI File.' % source)
+
+        with data:
+            yield from read_notes_from(data)
+
+def read_notes_from(data):
+    (file_format, division, tracks) = read_header(data)
+
+    # Events are (tick, track, ...) tuples, which merge orders by tick and
+    # then by track. Events of one track keep their order.
+    if file_format == 2:
+        events = parse_sequences(data, tracks)
+    else:
+        events = merge(*[parse_track(data, start, end, track) for track, (start, end) in enumerate(tracks)])
+
+    # Tick to seconds: SMPTE divisions fix the length of a tick, otherwise it
+    # follows the tempo
+    if division & 0x8000:
+        frames_per_second = 256 - (division >> 8)
+        if frames_per_second == 29:
+            frames_per_second = 29.97
+        (ticks_per_quarter, seconds_per_tick) = (None, 1 / (frames_per_second * (division & 0xFF)))
+    else:
+        (ticks_per_quarter, seconds_per_tick) = (division, DEFAULT_TEMPO / 1e6 / division)
+    (tempo_tick, tempo_seconds) = (0, 0.0)
+
+    # Channel state
+    bend_values = [BEND_CENTER] * CHANNELS
+    bend_ranges = [[DEFAULT_BEND_RANGE, 0] for _ in range(CHANNELS)] # semitones, cents
+    bends = [0.0] * CHANNELS # semitones
+    rpns = [list(NULL_RPN) for _ in range(CHANNELS)] # MSB, LSB
+
+    for (tick, track, status, data1, data2) in events:
+        kind = status & 0xF0
+        channel = status & 0x0F
+
+        if kind == 0x90 or kind == 0x80:
+            velocity = data2 if kind == 0x90 else 0
+            yield NoteEvent(tick, tempo_seconds + (tick - tempo_tick) * seconds_per_tick, track, channel, data1, \
+                velocity, round(data1 + bends[channel], 3) if bends[channel] else float(data1))
+            continue
+
+        if kind == 0xE0:
+            bend_values[channel] = data1 | (data2 << 7)
+        elif kind == 0xB0:
+            rpn = rpns[channel]
+            if data1 == RPN_MSB:
+                rpn[0] = data2
+            elif data1 == RPN_LSB:
+                rpn[1] = data2
+            elif data1 == NRPN_MSB or data1 == NRPN_LSB:
+                rpn[:] = NULL_RPN
+            elif data1 == DATA_ENTRY and tuple(rpn) == BEND_RANGE_RPN:
+                bend_ranges[channel][:] = [data2, 0]
+            elif data1 == DATA_ENTRY_FINE and tuple(rpn) == BEND_RANGE_RPN:
+                bend_ranges[channel][1] = data2
+            elif data1 == RESET_ALL:
+                bend_values[channel] = BEND_CENTER
+                rpn[:] = NULL_RPN
+            else:
+                continue
+        elif status == TEMPO:
+            if ticks_per_quarter is not None:
+                tempo_seconds += (tick - tempo_tick) * seconds_per_tick
+                (tempo_tick, seconds_per_tick) = (tick, data1 / 1e6 / ticks_per_quarter)
+            continue
+
+        (semitones, cents) = bend_ranges[channel]
+        bends[channel] = (bend_values[channel] - BEND_CENTER) / BEND_CENTER * (semitones + cents / 100)
+
+def convert_notes(source, a4_hz=STD_A4, chunk_size=CHUNK_SIZE, spelling=None):
+    # Yields one from_midi result per chunk of events, with the events of the
+    # chunk under 'events'
+    events = read_notes(source)
+
+    while True:
+        chunk = list(islice(events, chunk_size))
+        if not chunk:
+            return
+
+        result = converters.from_midi([event.midi for event in chunk], a4_hz, spelling=spelling)
+        result['events'] = chunk
+        yield result
+
+# Parsing
+def read_header(data):
+    if len(data) < 14 or data[:4] != b'MThd':
+        raise ValueError('Not a Standard MIDI File.')
+
+    header_length = int.from_bytes(data[4:8], 'big')
+    file_format = int.from_bytes(data[8:10], 'big')
+    track_count = int.from_bytes(data[10:12], 'big')
+    division = int.from_bytes(data[12:14], 'big')
+
+    if file_format > 2 or division == 0:
+        raise ValueError('Unsupported MIDI file format %i or division %i.' % (file_format, division))
+
+    # (start, end) of each track chunk. Chunks of other types are skipped.
+    tracks = []
+    position = 8 + header_length
+
+    while len(tracks) < track_count and position + 8 <= len(data):
+        start = position + 8
+        end = start + int.from_bytes(data[position + 4:start], 'big')
+        if data[position:position + 4] == b'MTrk':
+            tracks.append((start, min(end, len(data))))
+        position = end
+
+    return file_format, division, tracks
+
+def parse_sequences(data, tracks):
+    # Format 2: each track is a separate sequence, played after the previous one
+    end_tick = 0
+    for track, (start, end) in enumerate(tracks):
+        end_tick = yield from parse_track(data, start, end, track, end_tick)
+
+def parse_track(data, start, end, track, tick=0):
+    # Yields (tick, track, status, data1, data2) for the channel messages that
+    # read_notes uses, and (tick, track, TEMPO, microseconds per quarter, 0)
+    # for tempo changes. Returns the tick of the end of the track.
+    position = start
+    status = 0
+
+    try:
+        while position < end:
+            byte = data[position]
+            position += 1
+            delta = byte & 0x7F
+            while byte & 0x80:
+                byte = data[position]
+                position += 1
+                delta = (delta << 7) | (byte & 0x7F)
+            tick += delta
+
+            byte = data[position]
+            if byte & 0x80:
+                position += 1
+
+                if byte < 0xF0:
+                    status = byte
+                elif byte == 0xFF:
+                    meta_type = data[position]
+                    (length, position) = read_varlen(data, position + 1)
+                    if meta_type == 0x51 and length == 3:
+                        yield (tick, track, TEMPO, int.from_bytes(data[position:position + 3], 'big'), 0)
+                    elif meta_type == 0x2F:
+                        return tick
+                    position += length
+                    continue
+                elif byte == 0xF0 or byte == 0xF7:
+                    (length, position) = read_varlen(data, position)
+                    position += length
+                    continue
+                else:
+                    raise ValueError('Track %i has an invalid status byte at offset %i.' % (track, position - 1))
+            elif not status:
+                raise ValueError('Track %i uses running status before any status byte.' % track)
+
+            # Channel message, with a status byte or running status
+            kind = status & 0xF0
+            if kind == 0xC0 or kind == 0xD0:
+                position += 1
+            else:
+                if kind != 0xA0:
+                    yield (tick, track, status, data[position], data[position + 1])
+                position += 2
+    except IndexError:
+        raise ValueError('Track %i ends in the middle of an event.' % track)
+
+    if position > end:
+        raise ValueError('Track %i ends in the middle of an event.' % track)
+
+    return tick
+
+def read_varlen(data, position):
+    value = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, position
@@ -0,0 +1,119 @@
+#
+# Pitches of FFT bins and spectral peaks (requires NumPy)
+#
+# A BinMapper is set up once for a sample rate, an FFT size and a value of A4.
+# It converts every bin of a real FFT, 0 through fft_size // 2, to Hz, MIDI,
+# pitch class, octave and cents up front, so naming bins is a table lookup.
+# Bin 0 (DC) has no pitch; its MIDI and cents values are NaN.
+#
+# peaks() finds the local maxima of whole magnitude frames at once, one frame
+# per column, and refines each one by fitting a parabola through the peak bin
+# and its two neighbours. The interpolated frequencies are then converted like
+# batch_from_hz. Parabolic interpolation is most accurate on log magnitudes
+# (dB), so pass those when you have them.
+#
+# MIDI values are the same as one_hz_to_midi gives for each frequency. Bins
+# and peaks above MIDI 127 are common at high sample rates and are not
+# reported through hz_convert.diagnostics.
+#
+
+import numpy as np
+
+from .batch import PitchArray, hz_to_midi, midi_to_pitch_columns
+from .converters import STD_A4
+from .spelling import get_spelling
+
+class BinMapper():
+    def __init__(self, sample_rate, fft_size, a4_hz=STD_A4, spelling=None):
+        if sample_rate <= 0 or type(fft_size) != int or fft_size < 2:
+            raise ValueError('The sample rate must be positive and the FFT size an integer of at least 2.')
+
+        self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.a4_hz = a4_hz
+        self.spelling = None if spelling is None else get_spelling(spelling)
+        self.bin_hz = sample_rate / fft_size
+        self.bin_count = fft_size // 2 + 1
+
+        # Tables indexed by bin number
+        self.hz = np.arange(self.bin_count) * self.bin_hz
+        self.midi = np.full(self.bin_count, np.nan)
+        self.cents_dev = np.full(self.bin_count, np.nan)
+        self.pitch_class = np.zeros(self.bin_count, dtype=np.int64)
+        self.octave = np.zeros(self.bin_count, dtype=np.int64)
+
+        hz_to_midi(self.hz[1:], a4_hz, out=self.midi[1:])
+        (self.pitch_class[1:], self.octave[1:], self.cents_dev[1:]) = \
+            midi_to_pitch_columns(self.midi[1:], self.spelling)
+
+    def __repr__(self):
+        return 'BinMapper(sample_rate=%r, fft_size=%i, a4_hz=%r)' % (self.sample_rate, self.fft_size, self.a4_hz)
+
+    def bins(self, indices):
+        # Columns for the given bin numbers, by table lookup
+        indices = np.asarray(indices, dtype=np.intp).reshape(-1)
+        if len(indices) and (indices.min() < 1 or indices.max() >= self.bin_count):
+            raise ValueError('Bin numbers must lie between 1 and %i.' % (self.bin_count - 1))
+
+        return {
+            'bin': indices,
+            'hz': self.hz[indices],
+            'midi': self.midi[indices],
+            'pitch': PitchArray.from_pitch_classes(self.pitch_class[indices], self.octave[indices], \
+                self.cents_dev[indices], self.spelling),
+            'pitch_class': self.pitch_class[indices],
+            'octave': self.octave[indices],
+            'cents_dev': self.cents_dev[indices],
+            'a4': self.a4_hz
+        }
+
+    def peaks(self, magnitudes, threshold=None):
+        # magnitudes has one row per bin and one column per frame, or is a
+        # single frame. Peaks are strict local maxima at or above threshold,
+        # listed by frame and then by bin.
+        magnitudes = np.asarray(magnitudes, dtype=np.float64)
+        if magnitudes.ndim == 1:
+            magnitudes = magnitudes[:, np.newaxis]
+        if magnitudes.ndim != 2 or magnitudes.shape[0] != self.bin_count:
+            raise ValueError('Magnitudes need %i rows, one for each bin.' % self.bin_count)
+
+        below = magnitudes[:-2]
+        center = magnitudes[1:-1]
+        above = magnitudes[2:]
+
+        is_peak = (center > below) & (center >= above)
+        if threshold is not None:
+            is_peak &= center >= threshold
+
+        (frames, bins) = np.nonzero(is_peak.T)
+        (below, center, above) = (below[bins, frames], center[bins, frames], above[bins, frames])
+        bins += 1
+
+        # Vertex of the parabola through the three bins, within half a bin of
+        # the peak bin. A neighbour of -inf (silence in dB) leaves the peak
+        # where it is.
+        with np.errstate(invalid='ignore'):
+            offsets = 0.5 * (below - above) / (below - 2 * center + above)
+            peak_magnitudes = center - 0.25 * (below - above) * offsets
+
+        flat = ~np.isfinite(offsets)
+        offsets[flat] = 0.0
+        peak_magnitudes[flat] = center[flat]
+
+        hzs = (bins + offsets) * self.bin_hz
+        midi_notes = hz_to_midi(hzs, self.a4_hz)
+        pitch_classes, octaves, cents_devs = midi_to_pitch_columns(midi_notes, self.spelling)
+
+        return {
+            'frame': frames,
+            'bin': bins,
+            'offset': offsets,
+            'magnitude': peak_magnitudes,
+            'hz': hzs,
+            'midi': midi_notes,
+            'pitch': PitchArray.from_pitch_classes(pitch_classes, octaves, cents_devs, self.spelling),
+            'pitch_class': pitch_classes,
+            'octave': octaves,
+            'cents_dev': cents_devs,
+            'a4': self.a4_hz
+        }
@@ -0,0 +1,108 @@
+#
+# Spelling policies: which letter and accidental name each chromatic pitch class
+#
+# Every policy picks 12 consecutive positions on the line of fifths
+# (... Bb F C G D A E B F# C# ..., with C at position 0), one for each pitch
+# class. A window starting at position s spells every pitch class with the
+# name found between s and s + 11:
+#   'default'  starts at -3: C C# D Eb E F F# G G# A Bb B
+#   'sharps'   starts at -1: C C# D D# E F F# G G# A A# B
+#   'flats'    starts at -6: C Db D Eb E F Gb G Ab A Bb B
+# A key spells with the window starting three fifths below its key signature,
+# so the seven notes of the scale keep their letters, the flat side gets the
+# minor-mode alterations, and the sharp side the leading tones. Keys far from
+# C reach double accidentals: C# major spells G as Fx.
+#
+# Each policy is compiled once into flat tables indexed by pitch class. Names
+# such as Cb and B# belong to the octave next to the note they sound, which the
+# octave_offsets table records.
+#
+
+from functools import lru_cache
+
+OCTAVE_DIV = 12
+FIFTHS_LETTERS = 'FCGDAEB' # position -1 through 5
+ACCIDENTAL_NAMES = {-2: 'd', -1: 'b', 0: '', 1: '#', 2: 'x'}
+LETTER_PCS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+POLICY_STARTS = {
+    'default': -3,
+    'sharps': -1,
+    'flats': -6
+}
+
+class Spelling():
+    def __init__(self, start, name=None):
+        # Positions -15 (Fbb) through 19 (Bx) have at most double accidentals
+        if not -15 <= start <= 8:
+            raise ValueError('Spelling windows must start between positions -15 and 8 on the line of fifths.')
+
+        self.start = start
+        self.name = name or 'window %i' % start
+
+        names = [None] * OCTAVE_DIV
+        for position in range(start, start + OCTAVE_DIV):
+            names[position * 7 % OCTAVE_DIV] = fifths_name(position)
+
+        self.names = tuple(names)
+        self.letters = tuple(name[0] for name in names)
+        self.accidentals = tuple(name[1] for name in names)
+        self.octave_offsets = tuple(name[2] for name in names)
+
+    def __repr__(self):
+        return 'Spelling(%r)' % self.name
+
+    def __eq__(self, other):
+        return isinstance(other, Spelling) and other.start == self.start
+
+    def __hash__(self):
+        return hash((Spelling, self.start))
+
+    def spell(self, pitch_class):
+        # Returns (diatonic_pc, accidental) like converters.assign_name
+        return self.names[pitch_class][:2]
+
+def fifths_name(position):
+    # (letter, accidental, octave_offset) of a position on the line of fifths
+    (sharps, index) = divmod(position + 1, 7)
+    letter = FIFTHS_LETTERS[index]
+    semitones = LETTER_PCS[letter] + sharps
+
+    # B# sounds in the octave above its letter and Cb in the octave below, so
+    # the written octave differs from the octave of the sounding note
+    octave_offset = -(semitones // OCTAVE_DIV)
+
+    return (letter, ACCIDENTAL_NAMES[sharps], octave_offset)
+
+# Policy lookup
+@lru_cache(maxsize=None)
+def get_spelling(policy):
+    # policy is 'default', 'sharps', 'flats', a key name such as 'Eb' or
+    # 'F#m', or the number of sharps (negative for flats) in a key signature
+    if isinstance(policy, Spelling):
+        return policy
+
+    if isinstance(policy, int):
+        return Spelling(policy - 3, 'key signature %+i' % policy)
+
+    if policy in POLICY_STARTS:
+        return Spelling(POLICY_STARTS[policy], policy)
+
+    return Spelling(key_fifths(policy) - 3, policy)
+
+def key_fifths(key):
+    # Position of the key signature on the line of fifths: 0 for C major and
+    # A minor, 3 for A major, -3 for C minor
+    try:
+        minor = key.endswith('m') and len(key) > 1
+        tonic = key[:-1] if minor else key
+        letter = tonic[0].upper()
+        accidental = {'': 0, 'b': -1, '#': 1}[tonic[1:]]
+        position = FIFTHS_LETTERS.index(letter) - 1 + 7 * accidental
+    except (AttributeError, IndexError, KeyError, ValueError):
+        raise ValueError('Spelling must be one of %s, a key such as Eb or F#m, or a number of sharps.' % \
+            ', '.join(POLICY_STARTS))
+
+    return position - 3 if minor else position
+
+DEFAULT = get_spelling('default')
@@ -0,0 +1,285 @@
+#! /usr/bin/env python3
+
+#
+# Non-interactive conversion of values read from files or stdin
+#
+
+import argparse
+import io
+import os
+import re
+import sys
+from collections import deque
+from itertools import islice
+
+from . import batch, output
+from .converters import STD_A4
+
+CHUNK_SIZE = 65536 # values per conversion batch
+READ_SIZE = 1 << 20 # characters per read
+SHARD_SIZE = 1 << 24 # bytes of input per shard in --workers mode
+
+CONVERTERS = {
+    'hz': batch.batch_from_hz,
+    'midi': batch.batch_from_midi,
+    'pitch': batch.batch_from_pitch
+}
+
+COLUMNS = {
+    'input': lambda tokens, result: tokens,
+    'hz': lambda tokens, result: result['hz'].tolist(),
+    'midi': lambda tokens, result: result['midi'].tolist(),
+    'pitch': lambda tokens, result: result['pitch'].names(),
+    'pitch_class': lambda tokens, result: result['pitch_class'].tolist(),
+    'octave': lambda tokens, result: result['octave'].tolist(),
+    'cents_dev': lambda tokens, result: result['cents_dev'].tolist()
+}
+
+DEFAULT_COLUMNS = ('hz', 'midi', 'pitch')
+
+# Value indices in the errors of the batch functions, like 'at index 3' or 'at
+# indices 3, 8 and 2 more'
+INDEX_PATTERN = re.compile(r'(at ind(?:ex|ices) )([0-9][0-9, ]*)')
+LINE_PATTERN = re.compile(r'^Line ([0-9]+)')
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        columns = parse_columns(args.columns)
+
+        if args.workers > 1:
+            if '-' in args.files:
+                raise ValueError('--workers requires input files; stdin cannot be split into shards.')
+
+            write_header(columns, args.format, sys.stdout, header=args.header)
+            for path in args.files:
+                for text in convert_file_sharded(path, args.source, args.a4, columns, args.format, \
+                        args.field, args.chunk_size, args.workers):
+                    sys.stdout.write(text)
+        else:
+            write_header(columns, args.format, sys.stdout, header=args.header)
+            for stream in open_inputs(args.files):
+                tokens = read_fields(stream, args.field) if args.field else read_tokens(stream)
+                chunks = convert_chunks(chunked(tokens, args.chunk_size), args.source, args.a4)
+                write_output(chunks, columns, args.format, sys.stdout)
+    except (OSError, ValueError) as e:
+        print('[error] %s' % e, file=sys.stderr)
+        return 1
+
+    return 0
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='hz_convert',
+        description='Convert Hz, MIDI, or pitch-name values read from files or stdin.')
+    parser.add_argument('files', nargs='*', default=['-'],
+        help="input files (default or '-': stdin)")
+    parser.add_argument('-f', '--from', dest='source', choices=sorted(CONVERTERS), required=True,
+        help='type of the input values')
+    parser.add_argument('-c', '--columns', default=','.join(DEFAULT_COLUMNS),
+        help='comma-separated output columns from: %s (default: %%(default)s)' % ', '.join(COLUMNS))
+    parser.add_argument('-o', '--format', choices=output.FORMATS, default='csv',
+        help='output format (default: %(default)s)')
+    parser.add_argument('-a', '--a4', type=float, default=STD_A4,
+        help='frequency of A4 in Hz (default: %(default)s)')
+    parser.add_argument('--field', type=int, default=None,
+        help='read only this 1-based field of each line (fields split on whitespace or commas)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+        help='values converted per batch (default: %(default)s)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+        help='convert input files in this many processes (default: %(default)s)')
+    parser.add_argument('--no-header', dest='header', action='store_false',
+        help='omit the header row from CSV/TSV output')
+
+    args = parser.parse_args(argv)
+
+    if args.field is not None and args.field < 1:
+        parser.error('--field must be at least 1')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    return args
+
+def parse_columns(columns):
+    columns = [column.strip() for column in columns.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in COLUMNS]
+
+    if not columns or unknown:
+        raise ValueError('Output columns must be chosen from: %s.' % ', '.join(COLUMNS))
+
+    return columns
+
+def open_inputs(files):
+    for name in files:
+        if name == '-':
+            yield sys.stdin
+        else:
+            with open(name) as stream:
+                yield stream
+
+# Pipeline stages
+def read_tokens(stream, read_size=READ_SIZE):
+    carry = ''
+
+    while True:
+        text = stream.read(read_size)
+        if not text:
+            break
+
+        tokens = (carry + text).split()
+        carry = '' if text[-1].isspace() or not tokens else tokens.pop()
+
+        yield from tokens
+
+    if carry:
+        yield carry
+
+def read_fields(stream, field):
+    for line_number, line in enumerate(stream, 1):
+        fields = line.replace(',', ' ').split()
+
+        if not fields:
+            continue
+
+        if len(fields) < field:
+            raise ValueError('Line %i has no field %i.' % (line_number, field))
+
+        yield fields[field - 1]
+
+def chunked(tokens, chunk_size):
+    tokens = iter(tokens)
+
+    while True:
+        chunk = list(islice(tokens, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def convert_chunks(chunks, source, a4_hz):
+    # Errors give the index of a bad value in the whole stream rather than in
+    # its chunk
+    convert = CONVERTERS[source]
+    converted = 0
+
+    for tokens in chunks:
+        try:
+            result = convert(tokens, a4_hz)
+        except ValueError as e:
+            raise shift_indices(e, converted) from None
+
+        converted += len(tokens)
+        yield tokens, result
+
+def write_header(columns, out_format, out, header=True):
+    if header:
+        output.write_header(columns, out, out_format)
+
+def write_output(chunks, columns, out_format, out):
+    for tokens, result in chunks:
+        output.write_rows(columns, [COLUMNS[column](tokens, result) for column in columns], out, out_format)
+
+# Sharded conversion
+def convert_file_sharded(path, source, a4_hz, columns, out_format, field, chunk_size, workers):
+    # Shards are converted in a process pool and yielded as formatted text in
+    # input order. At most two shards per worker are in flight at once.
+    shard_count = max(workers, -(-os.path.getsize(path) // SHARD_SIZE))
+    shards = find_shards(path, shard_count)
+    jobs = ((path, start, end, source, a4_hz, columns, out_format, field, chunk_size) for start, end in shards)
+
+    # Imported here so that single-process runs skip loading multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Shards number values and lines from their own start. Each output row
+    # holds one value, so the rows of the shards before a bad one place its
+    # error in the whole file; lines before it are only counted on error.
+    (converted, done) = (0, 0)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            for text in map_ordered(executor, convert_shard, jobs, 2 * workers):
+                converted += text.count('\n')
+                done += 1
+                yield text
+        except ValueError as e:
+            error = shift_indices(e, converted)
+            if LINE_PATTERN.match(str(error)):
+                error = shift_lines(error, count_lines(path, shards[done][0]))
+            raise error from None
+
+def find_shards(path, shard_count):
+    size = os.path.getsize(path)
+    starts = [0]
+
+    with open(path, 'rb') as f:
+        for i in range(1, shard_count):
+            f.seek(max(size * i // shard_count - 1, starts[-1]))
+            f.readline()
+            starts.append(min(f.tell(), size))
+
+    starts.append(size)
+
+    return [(start, end) for start, end in zip(starts, starts[1:]) if end > start]
+
+def read_line_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode()
+
+def convert_shard(job):
+    (path, start, end, source, a4_hz, columns, out_format, field, chunk_size) = job
+
+    lines = read_line_range(path, start, end)
+    tokens = read_fields(lines, field) if field else (token for line in lines for token in line.split())
+    chunks = convert_chunks(chunked(tokens, chunk_size), source, a4_hz)
+
+    out = io.StringIO()
+    write_output(chunks, columns, out_format, out)
+
+    return out.getvalue()
+
+def shift_indices(error, offset):
+    # The error with every value index moved by offset
+    def shift(match):
+        return match.group(1) + re.sub(r'[0-9]+', lambda number: str(int(number.group()) + offset), match.group(2))
+
+    return ValueError(INDEX_PATTERN.sub(shift, str(error)))
+
+def shift_lines(error, offset):
+    # The error with its line number moved by offset
+    return ValueError(LINE_PATTERN.sub(lambda match: 'Line %i' % (int(match.group(1)) + offset), str(error)))
+
+def count_lines(path, end):
+    # Number of lines that end before byte offset end
+    lines = 0
+    with open(path, 'rb') as f:
+        while f.tell() < end:
+            block = f.read(min(READ_SIZE, end - f.tell()))
+            if not block:
+                break
+            lines += block.count(b'\n')
+
+    return lines
+
+def map_ordered(executor, fn, jobs, window):
+    pending = deque()
+
+    for job in jobs:
+        pending.append(executor.submit(fn, job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#
+# Incremental conversion of frame-by-frame Hz estimates from a pitch tracker
+#
+# A PitchTracker takes one frame (or a small block of frames) at a time,
+# converts it to MIDI and cents, and segments the frames into notes. Frames
+# within tolerance cents of the running mean of the current note extend it. A
+# frame outside the tolerance starts a candidate note, which replaces the
+# current one once min_frames consecutive frames agree with it; shorter
+# excursions are absorbed into the current note. Frames with no pitch (Hz of 0
+# or less, NaN, or infinite) end the current note. The MIDI value and cents of
+# the latest frame are kept in last_midi and last_cents.
+#
+# All storage is allocated up front: the last frame_capacity frames and the
+# last note_capacity finished notes are kept in fixed-size ring buffers, and
+# each frame takes a constant amount of work. Onsets are reported
+# min_frames - 1 frames after they happen. Out-of-range MIDI values are not
+# reported through hz_convert.diagnostics, so frames never cause I/O.
+#
+
+import math
+from array import array
+from collections import namedtuple
+
+from .converters import STD_A4, hz_to_midi_value, get_cents_dev
+
+FRAME_CAPACITY = 4096
+NOTE_CAPACITY = 256
+
+TrackedNote = namedtuple('TrackedNote', ['onset', 'frames', 'midi'])
+
+class PitchTracker():
+    def __init__(self, a4_hz=STD_A4, tolerance=50.0, min_frames=3, frame_capacity=FRAME_CAPACITY, \
+            note_capacity=NOTE_CAPACITY):
+        if min_frames < 1 or frame_capacity < 1 or note_capacity < 1:
+            raise ValueError('min_frames and the buffer capacities must be at least 1.')
+
+        self.a4_hz = a4_hz
+        self.tolerance = tolerance / 100 # in semitones
+        self.min_frames = min_frames
+
+        # Frame ring buffers, indexed by frame number modulo frame_capacity
+        self.frame_midi = array('d', [math.nan]) * frame_capacity
+        self.frame_cents = array('d', [math.nan]) * frame_capacity
+
+        # Ring buffers of finished notes
+        self.note_onsets = array('q', [0]) * note_capacity
+        self.note_lengths = array('q', [0]) * note_capacity
+        self.note_midi = array('d', [0.0]) * note_capacity
+
+        self.reset()
+
+    def __repr__(self):
+        return 'PitchTracker(a4_hz=%r, tolerance=%r, min_frames=%i, %i frames, %i notes)' % \
+            (self.a4_hz, 100 * self.tolerance, self.min_frames, self.frame_count, self.note_count)
+
+    def reset(self):
+        self.frame_count = 0
+        self.note_count = 0
+
+        # MIDI value and cents of the latest frame (NaN if it had no pitch)
+        self.last_midi = math.nan
+        self.last_cents = math.nan
+
+        # Current note: onset frame (-1 if none), and the count and sum of the
+        # MIDI values in its mean, which leave out absorbed frames
+        self.onset = -1
+        self.frames = 0
+        self.midi_sum = 0.0
+
+        # Candidate note that has not reached min_frames yet
+        self.candidate_onset = -1
+        self.candidate_frames = 0
+        self.candidate_sum = 0.0
+
+    # Input
+    def push(self, hz):
+        # Processes one frame. Returns the onset frame of a note confirmed by
+        # this frame, or -1.
+        frame = self.frame_count
+        index = frame % len(self.frame_midi)
+        self.frame_count += 1
+
+        if not 0 < hz < math.inf:
+            self.frame_midi[index] = self.last_midi = math.nan
+            self.frame_cents[index] = self.last_cents = math.nan
+            self.end_note(frame)
+            self.candidate_onset = -1
+            self.candidate_frames = 0
+            return -1
+
+        midi_note = hz_to_midi_value(hz, self.a4_hz)
+        self.frame_midi[index] = self.last_midi = midi_note
+        self.frame_cents[index] = self.last_cents = get_cents_dev(midi_note, round(midi_note))
+
+        if self.onset >= 0 and abs(midi_note - self.midi_sum / self.frames) <= self.tolerance:
+            self.frames += 1
+            self.midi_sum += midi_note
+            self.candidate_onset = -1
+            self.candidate_frames = 0
+            return -1
+
+        if self.candidate_onset >= 0 and \
+                abs(midi_note - self.candidate_sum / self.candidate_frames) <= self.tolerance:
+            self.candidate_frames += 1
+            self.candidate_sum += midi_note
+        else:
+            self.candidate_onset = frame
+            self.candidate_frames = 1
+            self.candidate_sum = midi_note
+
+        if self.candidate_frames < self.min_frames:
+            return -1
+
+        # The candidate is confirmed and replaces the current note
+        self.end_note(self.candidate_onset)
+        self.onset = self.candidate_onset
+        self.frames = self.candidate_frames
+        self.midi_sum = self.candidate_sum
+        self.candidate_onset = -1
+        self.candidate_frames = 0
+
+        return self.onset
+
+    def push_block(self, hzs):
+        # Processes a block of frames. Returns the number of onsets confirmed.
+        onsets = 0
+        for hz in hzs:
+            if self.push(hz) >= 0:
+                onsets += 1
+
+        return onsets
+
+    def end_note(self, end_frame):
+        if self.onset < 0:
+            return
+
+        index = self.note_count % len(self.note_onsets)
+        self.note_onsets[index] = self.onset
+        self.note_lengths[index] = end_frame - self.onset
+        self.note_midi[index] = self.midi_sum / self.frames
+        self.note_count += 1
+
+        self.onset = -1
+        self.frames = 0
+        self.midi_sum = 0.0
+
+    # Output
+    def current_note(self):
+        # The note in progress, or None. Its length counts absorbed frames.
+        if self.onset < 0:
+            return None
+        return TrackedNote(self.onset, self.frame_count - self.onset, self.midi_sum / self.frames)
+
+    def notes(self):
+        # Finished notes still in the ring buffer, oldest first
+        capacity = len(self.note_onsets)
+        return [TrackedNote(self.note_onsets[i % capacity], self.note_lengths[i % capacity], \
+            self.note_midi[i % capacity]) for i in range(max(0, self.note_count - capacity), self.note_count)]
+
+    def recent_frames(self, count):
+        # MIDI and cents of the last count frames (NaN where there was no
+        # pitch), oldest first
+        capacity = len(self.frame_midi)
+        if count > min(capacity, self.frame_count):
+            raise ValueError('Only the last %i frames are available.' % min(capacity, self.frame_count))
+
+        indices = [i % capacity for i in range(self.frame_count - count, self.frame_count)]
+        return [self.frame_midi[i] for i in indices], [self.frame_cents[i] for i in indices]
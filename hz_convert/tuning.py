@@ -0,0 +1,93 @@
+#
+# Equal divisions of the octave (EDO) other than 12
+#
+# An EqualTemperament with N divisions numbers its steps the way MIDI numbers
+# semitones: step 0 is the bottom of octave -1 and A4 sits at
+# ref_step = 5*N + round(9*N/12), which is 69 for N = 12. Given a tuning, the
+# from_* functions report step numbers in place of MIDI values.
+#
+# Steps are named after the nearest 12-TET pitch, measured from A4, plus the
+# deviation in cents. In 19-EDO, for example, the step 14 steps below A4 is
+# 'C4 (+15.8 c)'. A pitch name always stands for the same frequency, so it
+# converts to the same Hz in every tuning.
+#
+# The 12-TET tuning is marked standard, and the from_* functions handle it with
+# their usual MIDI code paths.
+#
+
+import math
+
+from .converters import OCTAVE_DIV, MIDI_REF, DIATONIC_NAMES, Pitch, assign_name, assign_diatonic_pc, \
+    accidental_to_cents_dev
+
+class EqualTemperament():
+    def __init__(self, divisions):
+        if type(divisions) != int or divisions < 1:
+            raise ValueError('The number of divisions must be a positive integer.')
+
+        self.divisions = divisions
+        self.step_ratio = 2**(1.0/divisions)
+        self.step_cents = 1200.0 / divisions
+        self.ref_step = 5 * divisions + round(9 * divisions / OCTAVE_DIV)
+        self.standard = divisions == OCTAVE_DIV
+
+        # Name of each step class: the nearest 12-TET pitch class, its octave
+        # relative to the octave of the step, and the deviation in cents
+        ref_class = self.ref_step % divisions
+        self.step_names = []
+
+        for step_class in range(divisions):
+            semitones = MIDI_REF % OCTAVE_DIV + (step_class - ref_class) * OCTAVE_DIV / divisions
+            pitch_class = round(semitones)
+            (diatonic_pc, accidental) = assign_name(pitch_class % OCTAVE_DIV)
+            self.step_names.append((diatonic_pc, accidental, pitch_class // OCTAVE_DIV, \
+                100 * (semitones - pitch_class), pitch_class % OCTAVE_DIV))
+
+        # Inverse lookup: the step of each natural note name in octave -1
+        self.letter_steps = {letter: self.ref_step + (assign_diatonic_pc(letter) - MIDI_REF) * divisions / OCTAVE_DIV \
+            for letter in DIATONIC_NAMES}
+
+    def __repr__(self):
+        return 'EqualTemperament(%i)' % self.divisions
+
+    def __eq__(self, other):
+        return isinstance(other, EqualTemperament) and other.divisions == self.divisions
+
+    def __hash__(self):
+        return hash((EqualTemperament, self.divisions))
+
+    # Conversions, rounded like their MIDI counterparts in converters
+    def hz_to_step(self, hz, a4_hz):
+        return round(self.divisions * math.log(hz / a4_hz, 2) + self.ref_step, 3)
+
+    def step_to_hz(self, step, a4_hz):
+        return round(a4_hz * (self.step_ratio**(step - self.ref_step)), 3)
+
+    def step_to_pitch(self, step, spelling=None):
+        nearest_step = round(step)
+        (diatonic_pc, accidental, octave_offset, cents, pitch_class) = self.step_names[nearest_step % self.divisions]
+        octave = nearest_step // self.divisions - 1 + octave_offset
+
+        # A hz_convert.spelling.Spelling renames the 12-TET pitch class
+        if spelling is not None:
+            (diatonic_pc, accidental, spelling_offset) = spelling.names[pitch_class]
+            octave += spelling_offset
+
+        cents_dev = round(cents + (step - nearest_step) * self.step_cents, 1)
+
+        return Pitch(None, diatonic_pc, accidental, octave, cents_dev)
+
+    def pitch_fields_to_step(self, diatonic_pc, accidental, octave, cents_dev):
+        total_cents_dev = cents_dev + accidental_to_cents_dev(accidental)
+
+        try:
+            letter_step = self.letter_steps[diatonic_pc]
+        except KeyError:
+            raise KeyError('Invalid pitch class name.')
+
+        return round(letter_step + self.divisions * (octave + 1) + total_cents_dev * self.divisions / 1200, 3)
+
+TWELVE_TET = EqualTemperament(OCTAVE_DIV)
+
+def edo(divisions):
+    return TWELVE_TET if divisions == OCTAVE_DIV else EqualTemperament(divisions)
@@ -0,0 +1,194 @@
+import random
+import unittest
+from unittest import mock
+from io import StringIO
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+import hz_convert.tuning as t
+
+if np is not None:
+    import hz_convert.batch as b
+
+STD_A4 = 440.0
+NEW_A4 = 423.519
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBatchMatchesScalar(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def test_from_hz(self):
+        hzs = [random.uniform(5, 20000) for _ in range(5000)] + \
+            [round(random.uniform(20, 2000), 3) for _ in range(5000)]
+
+        with mock.patch('hz_convert.converters.check_midi_range'), mock.patch('sys.stdout'):
+            result = b.batch_from_hz(hzs, NEW_A4)
+            expected = c.from_hz(hzs, NEW_A4)
+
+        self.assertListEqual(result['midi'].tolist(), expected['midi'])
+        self.assertListEqual(result['cents_dev'].tolist(), [pitch.cents_dev for pitch in expected['pitch']])
+        self.assertListEqual(result['octave'].tolist(), [pitch.octave for pitch in expected['pitch']])
+        self.assertListEqual([c.assign_name(pc) for pc in result['pitch_class']],
+            [(pitch.diatonic_pc, pitch.accidental) for pitch in expected['pitch']])
+
+    def test_from_midi(self):
+        midi_notes = [random.uniform(-20, 150) for _ in range(5000)] + \
+            [round(random.uniform(0, 127), 2) for _ in range(5000)]
+
+        result = b.batch_from_midi(midi_notes, NEW_A4)
+        expected = c.from_midi(midi_notes, NEW_A4)
+
+        self.assertListEqual(result['hz'].tolist(), expected['hz'])
+        self.assertListEqual(result['cents_dev'].tolist(), [pitch.cents_dev for pitch in expected['pitch']])
+        self.assertListEqual(result['octave'].tolist(), [pitch.octave for pitch in expected['pitch']])
+
+    def test_from_pitch(self):
+        pitch_strs = 'C4 Bb3 A-1 Gx2 E(2/3)b6 F(1/2)#2 B(13/5)#-5 Dd7'
+
+        with mock.patch('sys.stdout'):
+            result = b.batch_from_pitch(pitch_strs, STD_A4)
+            expected = c.from_pitch(pitch_strs, STD_A4)
+
+        self.assertListEqual(result['midi'].tolist(), expected['midi'])
+        self.assertListEqual(result['hz'].tolist(), expected['hz'])
+        self.assertListEqual(result['pitch'].octave.tolist(), [4, 3, -1, 2, 6, 2, -5, 7])
+
+        # The other pitch columns follow the MIDI values, as in batch_from_midi
+        self.assertListEqual(result['octave'].tolist(), [4, 3, -1, 2, 6, 2, -4, 7])
+        self.assertListEqual(result['pitch_class'].tolist(), [0, 10, 9, 9, 3, 6, 2, 0])
+        with mock.patch('sys.stderr'):
+            from_midi = b.batch_from_midi(result['midi'])
+        for key in ('pitch_class', 'octave', 'cents_dev'):
+            self.assertListEqual(result[key].tolist(), from_midi[key].tolist())
+
+        result = b.batch_from_pitch('Cb4 B#3')
+        self.assertListEqual(result['pitch_class'].tolist(), [11, 0])
+        self.assertListEqual(result['octave'].tolist(), [3, 4])
+        self.assertListEqual(result['pitch'].names(), ['Cb4 (+0.0 c)', 'B#3 (+0.0 c)'])
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBatchInputs(unittest.TestCase):
+    def test_accepts_buffers_and_strings(self):
+        from array import array
+
+        self.assertListEqual(b.batch_from_midi(array('d', [60, 69]))['hz'].tolist(), [261.626, 440.0])
+        self.assertListEqual(b.batch_from_midi('60 69')['hz'].tolist(), [261.626, 440.0])
+        self.assertListEqual(b.batch_from_hz(np.array([440.0], dtype=np.float32))['midi'].tolist(), [69.0])
+
+    def test_rejects_bad_input(self):
+        with self.assertRaisesRegex(ValueError, 'greater than 0'):
+            b.batch_from_hz([440, 0])
+
+        with self.assertRaisesRegex(ValueError, 'requires a number'):
+            b.batch_from_midi('60 sixty')
+
+        with self.assertRaisesRegex(ValueError, r'bad values at indices 1, 2\)'):
+            b.batch_from_hz([440, np.inf, np.nan])
+
+        with self.assertRaisesRegex(ValueError, r'bad value at index 2\)'):
+            b.batch_from_midi(['60', 61, 'x'])
+
+        with self.assertRaisesRegex(ValueError, r'bad value at index 0\)'):
+            b.batch_from_midi(np.array([np.nan, 60]))
+
+    def test_accepts_iterators(self):
+        self.assertListEqual(b.batch_from_midi(m for m in [60, 69])['hz'].tolist(), [261.626, 440.0])
+        self.assertListEqual(b.batch_from_hz(iter([440.0]))['midi'].tolist(), [69.0])
+        self.assertListEqual(b.batch_from_pitch(p for p in ['C4', 'A4'])['midi'].tolist(), [60.0, 69.0])
+        self.assertListEqual(b.batch_from_pitch(' C4  A4 ')['midi'].tolist(), [60.0, 69.0])
+        self.assertListEqual(b.batch_from_hz(np.float32(440))['midi'].tolist(), [69.0])
+
+    def test_reports_bad_pitches(self):
+        with self.assertRaisesRegex(ValueError, r'^Invalid pitch format.*\(bad values at indices 0, 2\)$'):
+            b.batch_from_pitch(['H4', 'C4', 'C'])
+
+        with self.assertRaisesRegex(ValueError, r'requires pitch strings \(bad value at index 1\)'):
+            b.batch_from_pitch(['C4', 60])
+
+    def test_warns_once_per_batch(self):
+        with mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            b.batch_from_hz([1.0, 2.0, 440.0])
+            self.assertEqual(mock_stderr.getvalue(), '[warning] 2 MIDI notes outside of the defined range 0-127.\n')
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestSeveralReferences(unittest.TestCase):
+    A4_HZS = [415.0, 432.0, STD_A4, NEW_A4]
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_from_hz_matches_each_reference(self):
+        hzs = [random.uniform(20, 5000) for _ in range(2000)] + [440.0, 261.626, 423.519]
+
+        for tuning in (None, t.edo(19)):
+            result = b.batch_from_hz(hzs, self.A4_HZS, tuning=tuning, spelling='flats')
+            self.assertEqual(result['midi'].shape, (len(hzs), 4))
+            self.assertListEqual(result['a4'].tolist(), self.A4_HZS)
+
+            for column, a4_hz in enumerate(self.A4_HZS):
+                expected = b.batch_from_hz(hzs, a4_hz, tuning=tuning, spelling='flats')
+                for key in ('midi', 'pitch_class', 'octave', 'cents_dev'):
+                    self.assertListEqual(result[key][:, column].tolist(), expected[key].tolist())
+                self.assertListEqual(result['pitch'][:, column].names(), expected['pitch'].names())
+
+    def test_from_midi_and_pitch_match_each_reference(self):
+        midi_notes = [random.uniform(0, 127) for _ in range(2000)] + [60, 69, 70.5]
+
+        for tuning in (None, t.edo(31)):
+            result = b.batch_from_midi(midi_notes, self.A4_HZS, tuning=tuning)
+            self.assertEqual(result['hz'].shape, (len(midi_notes), 4))
+            self.assertEqual(result['octave'].shape, (len(midi_notes),))
+
+            for column, a4_hz in enumerate(self.A4_HZS):
+                expected = b.batch_from_midi(midi_notes, a4_hz, tuning=tuning)
+                self.assertListEqual(result['hz'][:, column].tolist(), expected['hz'].tolist())
+
+        result = b.batch_from_pitch('C4 A4 E(2/3)b6', np.array(self.A4_HZS))
+        for column, a4_hz in enumerate(self.A4_HZS):
+            self.assertListEqual(result['hz'][:, column].tolist(), c.from_pitch('C4 A4 E(2/3)b6', a4_hz)['hz'])
+
+    def test_pitch_rows(self):
+        pitches = b.batch_from_hz([440, 880], [440, 466.164])['pitch']
+
+        self.assertEqual(pitches.shape, (2, 2))
+        self.assertListEqual(pitches.names(), [['A4 (+0.0 c)', 'G#4 (+0.0 c)'], ['A5 (+0.0 c)', 'G#5 (+0.0 c)']])
+        self.assertEqual(pitches[1, 0], c.Pitch(None, 'A', '', 5, 0.0))
+        self.assertListEqual(pitches[0].names(), ['A4 (+0.0 c)', 'G#4 (+0.0 c)'])
+
+    def test_rejects_bad_references(self):
+        for a4_hz in (0, -440.0, np.nan, np.inf, '440x', [440, 0], [440, 'x']):
+            with self.assertRaisesRegex(ValueError, 'requires A4 to be greater than 0 and finite'):
+                b.batch_from_hz([440], a4_hz)
+            with self.assertRaisesRegex(ValueError, 'requires A4 to be greater than 0 and finite'):
+                b.batch_from_midi([60], a4_hz)
+
+    def test_converts_single_reference(self):
+        result = b.batch_from_hz([440], '442')
+        self.assertEqual(result['a4'], 442.0)
+        self.assertListEqual(result['midi'].tolist(), b.batch_from_hz([440], 442.0)['midi'].tolist())
+        self.assertListEqual(b.batch_from_midi([69], np.int64(415))['hz'].tolist(), [415.0])
+
+        with self.assertRaisesRegex(ValueError, 'at least one value of A4'):
+            b.batch_from_midi([69], [])
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestPitchArray(unittest.TestCase):
+    def test_matches_pitch_objects(self):
+        midi_notes = [60, 24.33, -3, 138, 22.5, 59.7]
+        pitches = b.batch_from_midi(midi_notes)['pitch']
+
+        self.assertEqual(len(pitches), 6)
+        self.assertListEqual(pitches.tolist(), c.from_midi(midi_notes)['pitch'])
+        self.assertListEqual(pitches.names(), c.from_midi(midi_notes)['pitch_names'])
+
+    def test_slicing_keeps_columns(self):
+        pitches = b.batch_from_pitch('C4 Bb3 E(2/3)b6 Gx2')['pitch']
+
+        self.assertListEqual(pitches[1:3].names(), ['Bb3 (+0.0 c)', 'E6 (-66.7 c)'])
+        self.assertEqual(pitches[3], c.Pitch('Gx2 (+0.0 c)', 'G', 'x', 2, 0))
+        self.assertListEqual(b.PitchArray.from_pitches(pitches).names(), pitches.names())
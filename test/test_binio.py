@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+
+if np is not None:
+    import hz_convert.binio as bio
+
+NEW_A4 = 423.519
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBinaryConversion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.hzs = np.random.default_rng(0).uniform(20, 5000, 1001).astype('<f4')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_raw_float32_to_npy_midi(self):
+        self.hzs.tofile(self.path('hz.f32'))
+        bio.convert_file(self.path('hz.f32'), self.path('midi.npy'), a4_hz=NEW_A4, block_size=100)
+
+        expected = [c.one_hz_to_midi(float(hz), NEW_A4) for hz in self.hzs]
+        self.assertListEqual(np.load(self.path('midi.npy')).tolist(), expected)
+
+    def test_npy_to_raw_float32_cents(self):
+        np.save(self.path('hz.npy'), self.hzs.astype(np.float64))
+        bio.convert_file(self.path('hz.npy'), self.path('cents.f32'), 'cents_dev', out_dtype='<f4', block_size=64)
+
+        expected = [c.one_midi_to_pitch(c.one_hz_to_midi(float(hz), 440.0)).cents_dev for hz in self.hzs]
+        self.assertListEqual(np.fromfile(self.path('cents.f32'), dtype='<f4').tolist(),
+            np.array(expected, dtype='<f4').tolist())
+
+    def test_midi_to_hz_into_preallocated_buffer(self):
+        midi_notes = np.array([60, 69, 78.43, -3, 138], dtype=np.float64)
+        out = np.zeros(5)
+
+        result = bio.midi_to_hz_into(midi_notes, out, NEW_A4, block_size=2)
+
+        self.assertIs(result, out)
+        self.assertListEqual(out.tolist(), [c.one_midi_to_hz(midi_note, NEW_A4) for midi_note in midi_notes])
+
+    @mock.patch('hz_convert.binio.MIN_THREAD_BLOCK', 16)
+    def test_threads_match_serial(self):
+        hzs = self.hzs.astype(np.float64)
+        for workers in (2, 3, 8):
+            midi_notes = bio.hz_to_midi_into(hzs, np.empty(len(hzs)), NEW_A4, block_size=100, workers=workers)
+            cents_devs = bio.hz_to_cents_dev_into(hzs, np.empty(len(hzs), dtype='<f4'), workers=workers)
+            self.assertListEqual(midi_notes.tolist(), [c.one_hz_to_midi(float(hz), NEW_A4) for hz in hzs])
+            self.assertListEqual(cents_devs.tolist(), bio.hz_to_cents_dev_into(hzs, np.empty(len(hzs), dtype='<f4')).tolist())
+
+        bad = np.full(1000, 440.0)
+        bad[[700, 300]] = 0
+        with self.assertRaisesRegex(ValueError, 'index 300'):
+            bio.hz_to_midi_into(bad, np.empty(1000), block_size=50, workers=4)
+
+    def test_reads_input_without_copying(self):
+        self.hzs.tofile(self.path('hz.f32'))
+        values = bio.open_array(self.path('hz.f32'))
+
+        self.assertIsInstance(values, np.memmap)
+        self.assertEqual(values.dtype, np.dtype('<f4'))
+
+    def test_empty_input(self):
+        open(self.path('empty.f64'), 'wb').close()
+        out = bio.convert_file(self.path('empty.f64'), self.path('out.f64'), in_dtype='<f8')
+        self.assertEqual(len(out), 0)
+
+    def test_rejects_bad_input(self):
+        np.array([440, 220, 0, -5], dtype='<f8').tofile(self.path('bad.f64'))
+
+        with self.assertRaisesRegex(ValueError, 'index 2'):
+            bio.convert_file(self.path('bad.f64'), self.path('out.f64'), in_dtype='<f8')
+
+        hzs = np.array([440, np.inf, np.nan])
+        for convert in (bio.hz_to_midi_into, bio.hz_to_cents_dev_into):
+            with self.assertRaisesRegex(ValueError, r'^Hz values must be greater than 0 and finite \(bad value at index 1\)'):
+                convert(hzs, np.empty(3))
+
+        with self.assertRaisesRegex(ValueError, 'Conversion must be one of'):
+            bio.convert_file(self.path('bad.f64'), self.path('out.f64'), 'pitch')
+
+        with self.assertRaisesRegex(ValueError, 'same length'):
+            bio.hz_to_midi_into(np.ones(3), np.ones(2))
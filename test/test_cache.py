@@ -0,0 +1,103 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from io import StringIO
+
+import hz_convert.cache as cache
+import hz_convert.converters as c
+
+NEW_A4 = 423.519
+
+class TestConversionCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = cache.ConversionCache(maxsize=3)
+
+    def test_counts_hits_and_misses(self):
+        self.assertEqual(self.cache.midi_to_hz(60.0, 440.0), 261.626)
+        self.assertEqual(self.cache.midi_to_hz(60.0, 440.0), 261.626)
+        self.assertEqual(self.cache.midi_to_hz(60.0, NEW_A4), 251.826)
+
+        self.assertEqual(self.cache.info(), cache.CacheInfo(hits=1, misses=2, maxsize=3, currsize=2))
+
+    def test_evicts_least_recently_used(self):
+        for midi_note in (60.0, 61.0, 62.0):
+            self.cache.midi_to_pitch(midi_note)
+        self.cache.midi_to_pitch(60.0)
+        self.cache.midi_to_pitch(63.0)
+
+        self.assertListEqual([key[1] for key in self.cache.entries], [62.0, 60.0, 63.0])
+
+    def test_reuses_pitch_objects(self):
+        self.assertIs(self.cache.midi_to_pitch(61.5), self.cache.midi_to_pitch(61.5))
+
+    def test_hz_hits_still_check_range(self):
+        cache.enable_cache()
+        try:
+            with mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+                c.from_hz([5.0, 440.0])
+                c.from_hz([5.0, 440.0])
+            self.assertEqual(mock_stderr.getvalue().count('[warning] MIDI note outside'), 2)
+        finally:
+            cache.disable_cache()
+
+    def test_invalidate_by_a4(self):
+        self.cache.midi_to_pitch(60.0)
+        self.cache.midi_to_hz(60.0, 440.0)
+        self.cache.hz_to_midi(440.0, NEW_A4)
+
+        self.cache.invalidate(NEW_A4)
+        self.assertListEqual(list(self.cache.entries), [('pitch', 60.0), ('hz', 60.0, 440.0)])
+
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.info().misses, 3)
+
+    def test_clear_resets_stats(self):
+        self.cache.midi_to_hz(60.0, 440.0)
+        self.cache.midi_to_hz(60.0, 440.0)
+        self.cache.clear()
+        self.assertEqual(self.cache.info(), cache.CacheInfo(hits=0, misses=0, maxsize=3, currsize=0))
+
+    def test_shared_by_threads(self):
+        # A small cache under heavy eviction, with invalidation running alongside
+        random.seed(0)
+        midi_notes = [[round(random.uniform(0, 127), 1) for _ in range(500)] for _ in range(32)]
+        shared = cache.ConversionCache(maxsize=50)
+
+        def convert(chunk):
+            shared.invalidate(440.0)
+            return [shared.midi_to_hz(midi_note, 440.0) for midi_note in chunk]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(convert, midi_notes))
+
+        self.assertEqual(results, [[c.one_midi_to_hz(midi_note, 440.0) for midi_note in chunk] for chunk in midi_notes])
+        self.assertLessEqual(len(shared), 50)
+
+    def test_rejects_bad_size(self):
+        with self.assertRaisesRegex(ValueError, 'at least 1'):
+            cache.ConversionCache(0)
+
+class TestCachedConversions(unittest.TestCase):
+    def tearDown(self):
+        cache.disable_cache()
+
+    def test_from_functions_use_cache(self):
+        uncached = (c.from_midi('69 61.5 69', NEW_A4), c.from_hz([440, 261.626, 440]))
+
+        conversion_cache = cache.enable_cache(maxsize=100)
+        self.assertIs(cache.get_cache(), conversion_cache)
+
+        for _ in range(2):
+            cached = (c.from_midi('69 61.5 69', NEW_A4), c.from_hz([440, 261.626, 440]))
+            self.assertEqual(cached, uncached)
+
+        info = conversion_cache.info()
+        self.assertEqual(info.misses, 7)
+        self.assertEqual(info.hits, 17)
+
+    def test_disable_cache(self):
+        cache.enable_cache()
+        cache.disable_cache()
+        self.assertIsNone(c.conversion_cache)
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+
+if np is not None:
+    import hz_convert.chords as ch
+
+MAJOR = 0b10010001
+MINOR = 0b10001001
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestChordArray(unittest.TestCase):
+    def setUp(self):
+        self.chords = ch.ChordArray.from_strings(['C4 E4 G4', 'A3 C4 E4 A4', ['D4', 'F(1/2)#4', 'A4'], 'G4'])
+
+    def test_layout(self):
+        self.assertEqual(len(self.chords), 4)
+        self.assertEqual(self.chords.offsets.tolist(), [0, 3, 7, 10, 11])
+        self.assertEqual(self.chords.sizes().tolist(), [3, 4, 3, 1])
+        self.assertEqual(self.chords[1].tolist(), [57.0, 60.0, 64.0, 69.0])
+        self.assertEqual(self.chords[-1].tolist(), [67.0])
+        self.assertEqual(self.chords.chord_index().tolist(), [0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 3])
+
+        padded = self.chords.padded()
+        self.assertEqual(padded.shape, (4, 4))
+        self.assertEqual(padded[1].tolist(), [57.0, 60.0, 64.0, 69.0])
+        self.assertTrue(np.isnan(padded[3, 1:]).all())
+
+    def test_matches_from_pitch(self):
+        result = c.from_pitch('C4 E4 G4 A3 C4 E4 A4 D4 F(1/2)#4 A4 G4')
+        self.assertEqual(self.chords.midi.tolist(), result['midi'])
+        self.assertEqual(self.chords.to_hz().tolist(), result['hz'])
+        self.assertEqual(self.chords.spelled().names(), [c.one_pitch_string(pitch) for pitch in result['pitch']])
+
+    def test_intervals(self):
+        self.assertEqual(self.chords.roots().tolist(), [60.0, 57.0, 62.0, 67.0])
+        self.assertEqual(self.chords.root_cents().tolist(), [0, 400, 700, 0, 300, 700, 1200, 0, 350, 700, 0])
+        self.assertEqual(self.chords.intervals().tolist(), [400, 300, 300, 400, 500, 350, 350])
+        self.assertEqual(self.chords.interval_offsets().tolist(), [0, 2, 5, 7, 7])
+
+    def test_pitch_class_sets(self):
+        # Sets are relative to the lowest note, so inversions differ
+        voicings = ch.ChordArray.from_strings(['Eb3 Bb3 G4', 'C4 C5', 'E4 G4 C5'])
+        self.assertEqual(self.chords.pitch_class_sets().tolist(), [MAJOR, MINOR, MAJOR, 1])
+        self.assertEqual(voicings.pitch_class_sets().tolist(), [MAJOR, 1, 0b100001001])
+
+    def test_transpose(self):
+        self.assertEqual(self.chords.transpose(2)[0].tolist(), [62.0, 66.0, 69.0])
+        self.assertEqual(self.chords.transpose([1, 0, -2, 0.5]).midi.tolist(), \
+            [61, 65, 68, 57, 60, 64, 69, 60, 63.5, 67, 67.5])
+        self.assertEqual(self.chords.transpose(-1).pitch_class_sets().tolist(), \
+            self.chords.pitch_class_sets().tolist())
+        self.assertRaises(ValueError, self.chords.transpose, [1, 2])
+
+    def test_rounding_matches_round(self):
+        random.seed(0)
+        chords = [[round(random.uniform(30, 90), 3) for _ in range(random.randint(1, 5))] for _ in range(2000)]
+        shifts = [round(random.uniform(-12, 12), 3) for _ in chords]
+        chord_array = ch.ChordArray.from_midi(chords)
+
+        self.assertEqual(chord_array.intervals().tolist(), \
+            [round(100 * (b - a), 1) for chord in chords for a, b in zip(chord, chord[1:])])
+        self.assertEqual(chord_array.transpose(shifts).midi.tolist(), \
+            [round(note + shift, 3) for chord, shift in zip(chords, shifts) for note in chord])
+
+    def test_empty(self):
+        chords = ch.ChordArray.from_strings([])
+        self.assertEqual(len(chords), 0)
+        self.assertEqual(chords.roots().tolist(), [])
+        self.assertEqual(chords.pitch_class_sets().tolist(), [])
+        self.assertEqual(chords.padded().shape, (0, 0))
+
+    def test_bad_input(self):
+        self.assertRaises(ValueError, ch.ChordArray.from_strings, ['C4 E4', ''])
+        self.assertRaises(ValueError, ch.ChordArray.from_strings, ['C4 H4'])
+        self.assertRaises(ValueError, ch.ChordArray.from_midi, [[60], []])
+        self.assertRaises(ValueError, ch.ChordArray.from_midi, [['x']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,14 @@
 import unittest
+from array import array
+from fractions import Fraction
 from unittest import mock
 from io import StringIO
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 import hz_convert.converters as c
 
 STD_A4 = 440.0
@@ -184,6 +191,31 @@ class TestPitchStrToPitchObj(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, '^Invalid pitch'):
             c.one_pitch_str_to_pitch_obj('C(/3)#5')
 
+class TestPitchStrParsing(unittest.TestCase):
+    def test_scanner_handles_common_spellings(self):
+        self.assertTupleEqual(c.scan_pitch_str('C4'), ('C', '', 4, 0))
+        self.assertTupleEqual(c.scan_pitch_str('Bb-1'), ('B', 'b', -1, 0))
+        self.assertTupleEqual(c.scan_pitch_str('gx12'), ('g', 'x', 12, 0))
+
+    def test_scanner_defers_other_input(self):
+        for pitch_str in ['E(1/2)b4', 'C', 'Cb', 'H4', 'C+4', 'C4.5', 'C\u00b2', 'C-']:
+            self.assertIsNone(c.scan_pitch_str(pitch_str))
+
+    def test_scanner_agrees_with_regex(self):
+        for pitch_str in ['C4', 'Cn3', 'Bb2', 'Ex-2', 'Gd200', 'a0', 'bb-10']:
+            self.assertTupleEqual(c.scan_pitch_str(pitch_str), c.match_pitch_str(pitch_str))
+
+    def test_caches_parsed_spellings(self):
+        c.parse_pitch_str.cache_clear()
+        c.from_pitch('C4 Bb3 C4 C4 Bb3')
+        info = c.parse_pitch_str.cache_info()
+        self.assertEqual((info.hits, info.misses), (3, 2))
+
+    def test_from_pitch_returns_fresh_pitch_objects(self):
+        pitches = c.from_pitch('C4 C4')['pitch']
+        self.assertIsNot(pitches[0], pitches[1])
+        self.assertListEqual([pitch.name for pitch in pitches], ['C4 (+0.0 c)', 'C4 (+0.0 c)'])
+
 class TestMidiHzConversions(unittest.TestCase):
     def test_one_midi_to_hz_standard_tuning(self):
         self.assertEqual(c.one_midi_to_hz(69, STD_A4), 440.0)
@@ -264,6 +296,27 @@ class TestMidiToPitch(unittest.TestCase):
                 pitch2.cents_dev
             ], ['D', '#', 5, -43.1])
 
+class TestPitch(unittest.TestCase):
+    def test_builds_name_on_demand(self):
+        pitch = c.Pitch(None, 'E', 'b', 3, -12.5)
+        self.assertEqual(pitch.name, 'Eb3 (-12.5 c)')
+
+        pitch.name = 'custom'
+        self.assertEqual(pitch.name, 'custom')
+
+    def test_uses_slots(self):
+        pitch = c.Pitch('A4 (+0.0 c)', 'A', '', 4, 0.0)
+        self.assertFalse(hasattr(pitch, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            pitch.frequency = 440.0
+
+    def test_equality_and_repr(self):
+        self.assertEqual(c.Pitch(None, 'C', '', 4, 0.0), c.Pitch('C4 (+0.0 c)', 'C', '', 4, 0.0))
+        self.assertNotEqual(c.Pitch(None, 'C', '', 4, 0.0), c.Pitch(None, 'C', '#', 4, 0.0))
+        self.assertEqual(repr(c.Pitch(None, 'C', '', 4, 0.0)),
+            "Pitch(name='C4 (+0.0 c)', diatonic_pc='C', accidental='', octave=4, cents_dev=0.0)")
+
 class TestOutputs(unittest.TestCase):
     def test_hz_string_one_good_input(self):
         self.assertEqual(c.hz_string(440.0), '- Hz value: 440.00')
@@ -346,10 +399,11 @@ class TestMidiToPitchHelpers(unittest.TestCase):
             c.assign_diatonic_pc(8)
 
     def test_check_midi_range(self):
-        with mock.patch('sys.stdout', new = StringIO()) as mock_stdout:
+        with mock.patch('sys.stderr', new = StringIO()) as mock_stderr:
             c.check_midi_range(-1)
             c.check_midi_range(128)
-            out = mock_stdout.getvalue().strip().split('\n')[-2:]
+            c.check_midi_range(127)
+            out = mock_stderr.getvalue().strip().split('\n')
             warning = '[warning] MIDI note outside of the defined range 0-127.'
             self.assertListEqual(out, [warning, warning])
 
@@ -377,8 +431,62 @@ class TestMidiToPitchHelpers(unittest.TestCase):
         # Should round answer to 1 decimal place
         self.assertEqual(c.get_cents_dev(120.4232, 121), -57.7)
 
+class TestInputNormalization(unittest.TestCase):
+    def test_accepts_any_iterable(self):
+        expected = c.from_midi([60.0, 69.0])
+        for midi_notes in ('60 69', '60  69', (60, 69), array('d', [60, 69]), (m for m in [60, 69]), \
+                memoryview(array('d', [60, 69]))):
+            self.assertEqual(c.from_midi(midi_notes), expected)
+
+        self.assertEqual(c.from_midi(69)['midi'], [69.0])
+        self.assertEqual(c.from_hz(('440', 220))['hz'], [440.0, 220.0])
+        self.assertEqual(c.from_pitch(pitch for pitch in ['C4', 'A4'])['midi'], [60.0, 69.0])
+        self.assertEqual(c.from_midi(Fraction(121, 2))['midi'], [60.5])
 
+    @unittest.skipIf(np is None, 'NumPy is not installed.')
+    def test_accepts_numpy_scalars(self):
+        self.assertEqual(c.from_hz(np.float32(440))['midi'], [69.0])
+        self.assertEqual(c.from_midi(np.int64(60)), c.from_midi(60))
 
+    def test_reports_every_bad_index(self):
+        with self.assertRaisesRegex(ValueError, r'^from_midi requires .* \(bad values at indices 1, 3\)\.$'):
+            c.from_midi(['60', 'sixty', 62, None])
+
+        with self.assertRaisesRegex(ValueError, r'^Hz values must be greater than 0 and finite \(bad values at indices 0, 2, 3, 4\)'):
+            c.from_hz([-1, 440, 0, 'nan', float('inf')])
+
+        with self.assertRaisesRegex(ValueError, r'bad value at index 1\)\.$'):
+            c.from_midi([60, 10**400])
+
+        with self.assertRaisesRegex(ValueError, r'^Invalid pitch format.*\(bad values at indices 0, 2\)$'):
+            c.from_pitch(['H4', 'C4', 'C'])
+
+        with self.assertRaisesRegex(ValueError, r'requires pitch strings \(bad value at index 1\)'):
+            c.from_pitch(['C4', 60])
+
+    def test_limits_reported_indices(self):
+        with self.assertRaisesRegex(ValueError, r'indices 0, 1, 2, 3, 4, 5, 6, 7, 8, 9 and 5 more\)'):
+            c.from_hz([0] * 15)
+
+    def test_rejects_non_iterables(self):
+        with self.assertRaisesRegex(ValueError, 'requires a number, string, or iterable input'):
+            c.from_hz(None)
+
+        with self.assertRaisesRegex(ValueError, 'requires a string or iterable input'):
+            c.from_pitch(60)
+
+    def test_rejects_empty_strings(self):
+        for value in ('', '  \t'):
+            with self.assertRaisesRegex(ValueError, 'requires a number, string, or iterable input'):
+                c.from_midi(value)
+            with self.assertRaisesRegex(ValueError, 'requires a number, string, or iterable input'):
+                c.from_hz(value)
+            with self.assertRaisesRegex(ValueError, 'requires a string or iterable input'):
+                c.from_pitch(value)
+
+        with mock.patch('builtins.input', side_effect=['', 'x']), mock.patch('sys.stdout'), \
+                self.assertRaises(ValueError):
+            c.midi_to_pitch_loop(STD_A4)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from io import StringIO
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+import hz_convert.diagnostics as d
+
+if np is not None:
+    import hz_convert.batch as b
+
+class TestDiagnostics(unittest.TestCase):
+    def setUp(self):
+        self.diagnostics = d.get_diagnostics()
+        self.diagnostics.reset()
+
+    def tearDown(self):
+        d.set_range_policy('warn')
+        self.diagnostics.reset()
+
+    def test_records_counts_and_indices(self):
+        with mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            c.from_midi([60, -3, 70, 140])
+            c.from_hz([440.0])
+
+        self.assertEqual(mock_stderr.getvalue(), '[warning] 2 MIDI notes outside of the defined range 0-127.\n')
+        self.assertEqual(self.diagnostics.last, d.RangeReport(1, 0, []))
+        self.assertDictEqual(self.diagnostics.summary(),
+            {'policy': 'warn', 'batches': 2, 'values': 5, 'out_of_range': 2})
+
+    def test_reports_indices_of_last_batch(self):
+        d.set_range_policy('silent')
+        c.from_pitch('C-2 A4 C10 G9')
+        self.assertEqual(self.diagnostics.last, d.RangeReport(4, 2, [0, 2]))
+
+    def test_warn_once(self):
+        d.set_range_policy('warn_once')
+        with mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            for _ in range(3):
+                c.from_hz([5.0, 440.0])
+        self.assertEqual(mock_stderr.getvalue().count('[warning]'), 1)
+        self.assertEqual(self.diagnostics.out_of_range, 3)
+
+    def test_totals_from_threads(self):
+        d.set_range_policy('warn_once')
+        with mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: c.from_midi([60, -1, 200]), range(400)))
+
+        self.assertEqual(mock_stderr.getvalue().count('[warning]'), 1)
+        self.assertDictEqual(self.diagnostics.summary(),
+            {'policy': 'warn_once', 'batches': 400, 'values': 1200, 'out_of_range': 800})
+
+    def test_silent(self):
+        d.set_range_policy('silent')
+        with mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            c.from_midi('-1 128')
+            c.one_hz_to_midi(5.0, 440.0)
+        self.assertEqual(mock_stderr.getvalue(), '')
+        self.assertEqual(self.diagnostics.out_of_range, 3)
+
+    def test_strict(self):
+        d.set_range_policy('strict')
+        with self.assertRaisesRegex(ValueError, r'^2 MIDI notes outside of the defined range 0-127 \(first at index 1\)'):
+            c.from_midi([60, 128, 129])
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaisesRegex(ValueError, 'Policy must be one of'):
+            d.set_range_policy('loud')
+
+    @unittest.skipIf(np is None, 'NumPy is not installed.')
+    def test_batch_reports_array_indices(self):
+        d.set_range_policy('silent')
+        b.batch_from_midi([60, -3, 70, 140])
+        self.assertEqual(self.diagnostics.last.count, 2)
+        self.assertListEqual(self.diagnostics.last.indices.tolist(), [1, 3])
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+import unittest
+
+CHECK_SCRIPT = '''
+import sys
+import hz_convert
+print(' '.join(sorted(name for name in sys.modules if name.split('.')[0] in ('numpy', 'test', 'unittest'))))
+'''
+
+class TestImport(unittest.TestCase):
+    def test_import_skips_optional_modules(self):
+        result = subprocess.run([sys.executable, '-c', CHECK_SCRIPT], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '')
+
+    def test_constants_live_in_package(self):
+        import hz_convert
+        self.assertEqual(hz_convert.STD_A4, 440.0)
+
+    def test_submodules_load_on_access(self):
+        import hz_convert
+        import hz_convert.converters as c
+        self.assertIs(hz_convert.converters, c)
+        self.assertIn('stream', dir(hz_convert))
+
+        for name in ('scala', 'smf', 'tracker'):
+            self.assertIn(name, dir(hz_convert))
+            self.assertEqual(getattr(hz_convert, name).__name__, 'hz_convert.' + name)
+
+        with self.assertRaises(AttributeError):
+            hz_convert.missing
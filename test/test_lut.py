@@ -0,0 +1,57 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+
+if np is not None:
+    import hz_convert.lut as lut
+
+NEW_A4 = 423.519
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestLookupTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.table = lut.LookupTable([440.0, NEW_A4], low=0, high=127, steps_per_semitone=100)
+
+    def test_grid_values_match_scalar(self):
+        midi_notes = np.round(np.random.default_rng(0).uniform(0, 127, 5000), 2)
+        expected = [c.one_midi_to_hz(midi_note, NEW_A4) for midi_note in midi_notes.tolist()]
+
+        self.assertListEqual(self.table.midi_to_hz(midi_notes, NEW_A4).tolist(), expected)
+        self.assertListEqual([self.table.one_midi_to_hz(midi_note, NEW_A4) for midi_note in midi_notes.tolist()], expected)
+
+    def test_falls_back_off_grid(self):
+        midi_notes = [60.001, -3, 127.01, 138, 69]
+        expected = [c.one_midi_to_hz(midi_note, 440.0) for midi_note in midi_notes]
+
+        self.assertListEqual(self.table.midi_to_hz(midi_notes).tolist(), expected)
+        self.assertListEqual([self.table.one_midi_to_hz(midi_note) for midi_note in midi_notes], expected)
+
+    def test_falls_back_for_other_a4(self):
+        self.assertListEqual(self.table.midi_to_hz([60, 69], 415.0).tolist(),
+            [c.one_midi_to_hz(60, 415.0), 415.0])
+        self.assertEqual(self.table.one_midi_to_hz(69, 415.0), 415.0)
+
+    def test_non_finite_values(self):
+        hzs = self.table.midi_to_hz([float('nan'), float('inf'), 69])
+        self.assertTrue(np.isnan(hzs[0]))
+        self.assertListEqual(hzs[1:].tolist(), [float('inf'), 440.0])
+        self.assertTrue(np.isnan(self.table.one_midi_to_hz(float('nan'))))
+
+    def test_whole_number_grid(self):
+        table = lut.LookupTable(415.0, low=21, high=108, steps_per_semitone=1)
+        self.assertEqual(len(table.hz[415.0]), 88)
+        self.assertListEqual(table.midi_to_hz([21, 69, 69.5], 415.0).tolist(),
+            [c.one_midi_to_hz(21, 415.0), 415.0, c.one_midi_to_hz(69.5, 415.0)])
+
+    def test_rejects_bad_ranges(self):
+        with self.assertRaisesRegex(ValueError, 'low < high'):
+            lut.LookupTable(low=60, high=60)
+
+        with self.assertRaisesRegex(ValueError, 'positive integer'):
+            lut.LookupTable(steps_per_semitone=0.5)
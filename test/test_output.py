@@ -0,0 +1,83 @@
+import csv
+import json
+import random
+import unittest
+from io import StringIO
+
+import hz_convert.converters as c
+import hz_convert.output as o
+
+NAMES = ['input', 'hz', 'octave', 'pitch']
+
+class TestPitchNames(unittest.TestCase):
+    def test_matches_one_pitch_string(self):
+        random.seed(0)
+        pitches = [c.one_midi_to_pitch(round(random.uniform(-20, 140), 2)) for _ in range(2000)]
+        pitches += [c.one_pitch_str_to_pitch_obj(s) for s in ['B(2/3)b4', 'F(1/2)#2', 'Cx-1', 'Ed10']]
+
+        expected = [c.one_pitch_string(pitch) for pitch in pitches]
+        self.assertListEqual(o.pitch_obj_names(pitches), expected)
+        self.assertEqual(c.pitch_string(pitches), '- Pitch names: ' + ', '.join(expected))
+
+    def test_signed_zero_and_off_grid_cents(self):
+        self.assertEqual(o.pitch_name('C', '#', 4, -0.0), 'C#4 (+0.0 c)')
+        self.assertEqual(o.pitch_name('B', '', 4, -66.667), 'B4 (-66.7 c)')
+        self.assertNotIn(-66.667, o.CENTS_SUFFIXES)
+
+    def test_rejects_bad_fields(self):
+        with self.assertRaisesRegex(TypeError, 'Unable to process pitch string data.'):
+            c.one_pitch_string(c.Pitch(None, None, '', 4, 0.0))
+
+class TestWriters(unittest.TestCase):
+    def setUp(self):
+        self.columns = [['440', '261.6', 'A4'], [440.0, 261.626, 440.0], [4, 4, 4], ['A4 (+0.0 c)', 'C4 (+0.0 c)', 'A4 (+0.0 c)']]
+
+    def write(self, columns, out_format, block_size=2):
+        out = StringIO()
+        o.write_rows(NAMES[:len(columns)], columns, out, out_format, block_size=block_size)
+        return out.getvalue()
+
+    def csv_text(self, columns, delimiter=','):
+        out = StringIO()
+        csv.writer(out, delimiter=delimiter, lineterminator='\n').writerows(zip(*columns))
+        return out.getvalue()
+
+    def jsonl_text(self, columns):
+        return ''.join(json.dumps(dict(zip(NAMES, row))) + '\n' for row in zip(*columns))
+
+    def test_delimited_matches_csv_writer(self):
+        self.assertEqual(self.write(self.columns, 'csv'), self.csv_text(self.columns))
+        self.assertEqual(self.write(self.columns, 'tsv'), self.csv_text(self.columns, '\t'))
+
+    def test_delimited_quotes_when_needed(self):
+        columns = [['a,b', 'say "hi"', 'plain'], [1.5, 2.5, 3.5]]
+        self.assertEqual(self.write(columns, 'csv', block_size=10), self.csv_text(columns))
+        self.assertEqual(self.write([['x', '']], 'csv'), self.csv_text([['x', '']]))
+
+    def test_jsonl_matches_json_dumps(self):
+        self.assertEqual(self.write(self.columns, 'jsonl'), self.jsonl_text(self.columns))
+
+        columns = [['café', 'tab\there'], [float('inf'), float('nan')]]
+        self.assertEqual(self.write(columns, 'jsonl'), self.jsonl_text(columns))
+
+    def test_write_values(self):
+        out = StringIO()
+        o.write_values([440, 261.6256, 29.989], out, precision=2, sep=', ', block_size=2)
+        self.assertEqual(out.getvalue(), '440.00, 261.63, 29.99, ')
+
+        out = StringIO()
+        o.write_values([0.1, 2], out)
+        self.assertEqual(out.getvalue(), '0.1\n2\n')
+
+        out = StringIO()
+        o.write_pitch_names([c.one_midi_to_pitch(69.5), c.one_midi_to_pitch(70)], out, block_size=1)
+        self.assertEqual(out.getvalue(), 'Bb4 (-50.0 c)\nBb4 (+0.0 c)\n')
+
+    def test_write_header(self):
+        out = StringIO()
+        o.write_header(['hz', 'pitch'], out, 'tsv')
+        o.write_header(['hz', 'pitch'], out, 'jsonl')
+        self.assertEqual(out.getvalue(), 'hz\tpitch\n')
+
+        with self.assertRaisesRegex(ValueError, 'Output format must be one of'):
+            o.write_rows(['hz'], [[440.0]], out, 'xml')
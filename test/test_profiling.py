@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from io import StringIO
+
+import hz_convert
+import hz_convert.converters as c
+import hz_convert.profiling as p
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.originals = [getattr(owner, attribute) for (_, owner, attribute, _) in p.STAGE_FUNCTIONS]
+        self.profiler = hz_convert.enable_profiling()
+        self.profiler.reset()
+
+    def tearDown(self):
+        hz_convert.disable_profiling()
+
+    def test_counts_stages(self):
+        c.from_midi([60, 61.5, 62])
+        c.from_pitch('C4 D4')
+        report = self.profiler.report()
+
+        self.assertEqual(report['convert']['calls'], 2)
+        self.assertEqual(report['convert']['items'], 5)
+        self.assertEqual(report['parse']['calls'], 2)
+        self.assertEqual(report['pitch']['calls'], 3)
+        self.assertEqual(report['math']['calls'], 5)
+        self.assertEqual(report['format']['calls'], 3)
+        self.assertEqual(report['range']['items'], 5)
+        self.assertGreater(report['convert']['ns'], report['math']['ns'])
+        self.assertGreater(report['convert']['items_per_sec'], 0)
+
+    def test_times_package_functions(self):
+        hz_convert.from_hz([440, 220])
+        self.assertEqual(self.profiler.report()['convert']['calls'], 1)
+
+        hz_convert.disable_profiling()
+        self.assertIs(hz_convert.from_hz, c.from_hz)
+        self.assertIs(hz_convert.from_pitch, self.originals[0])
+
+    def test_counts_items_of_any_input(self):
+        from array import array
+
+        c.from_midi(array('d', [60, 61, 62]))
+        c.from_hz(hz for hz in [440, 220])
+        c.from_pitch('C4  D4')
+        self.assertEqual(self.profiler.report()['convert']['items'], 7)
+
+        self.assertEqual(p.count_items(array('d', [440, 220])), 2)
+        self.assertEqual(p.count_items(' 440  220 '), 2)
+        self.assertEqual(p.count_items(440.0), 1)
+
+    def test_nested_calls_count_once(self):
+        # one_hz_to_midi calls hz_to_midi_value, which is in the same stage
+        with mock.patch('sys.stderr', new=StringIO()):
+            c.one_hz_to_midi(440.0, 440.0)
+        self.assertEqual(self.profiler.report()['math']['calls'], 1)
+
+    def test_results_unchanged(self):
+        conversions = [lambda: c.from_hz('440 261.6'), lambda: c.from_pitch(['Bb3', 'C(1/2)#4']), \
+            lambda: c.pitch_string(c.from_midi([60, 70.25])['pitch'])]
+        profiled = [convert() for convert in conversions]
+
+        hz_convert.disable_profiling()
+        self.assertEqual(profiled, [convert() for convert in conversions])
+        c.parse_pitch_str.cache_clear()
+
+    def test_disable_restores_functions(self):
+        hz_convert.disable_profiling()
+        self.assertFalse(self.profiler.enabled)
+        self.assertEqual([getattr(owner, attribute) for (_, owner, attribute, _) in p.STAGE_FUNCTIONS], \
+            self.originals)
+
+        c.from_midi(60)
+        self.assertEqual(self.profiler.report()['convert']['calls'], 0)
+
+    def test_context_manager(self):
+        hz_convert.disable_profiling()
+        with p.Profiler() as profiler:
+            c.from_hz(440.0)
+        self.assertIs(c.hz_to_midi_value, self.originals[6])
+        self.assertEqual(profiler.report()['convert']['calls'], 1)
+
+    def test_json_export(self):
+        c.from_midi([60, 62])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'profile.json')
+            text = self.profiler.to_json(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f), json.loads(text))
+
+        self.assertEqual(sorted(json.loads(text)), sorted(p.STAGES))
+        self.assertEqual(set(json.loads(text)['pitch']), {'calls', 'items', 'ns', 'items_per_sec'})
+
+if __name__ == '__main__':
+    unittest.main()
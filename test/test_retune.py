@@ -0,0 +1,99 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+from hz_convert import smf
+
+if np is not None:
+    import hz_convert.retune as rt
+
+def smf_bytes(*buffers):
+    # One track holding the 3-byte messages of the buffers, all at tick 0
+    messages = np.concatenate([buffer.reshape(-1, 3) for buffer in buffers])
+    body = np.hstack([np.zeros((len(messages), 1), dtype=np.uint8), messages]).tobytes() + b'\x00\xff\x2f\x00'
+    return b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x01\xe0' + b'MTrk' + len(body).to_bytes(4, 'big') + body
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestEncodeBends(unittest.TestCase):
+    def test_messages(self):
+        result = rt.encode_bends([69.0, 69.5, 60.25])
+        self.assertListEqual(result['key'].tolist(), [69, 70, 60])
+        self.assertListEqual(result['bend'].tolist(), [8192, 6144, 9216])
+        self.assertListEqual(result['channel'].tolist(), [1, 0, 2])
+        self.assertEqual(result['note_on'].tobytes().hex(' '), \
+            'e1 00 40 91 45 40 e0 00 30 90 46 40 e2 00 48 92 3c 40')
+        self.assertEqual(result['note_off'].tobytes().hex(' '), '81 45 00 80 46 00 82 3c 00')
+        self.assertEqual(len(result['setup']), 3 * 6 * 3)
+
+    def test_round_trip_through_smf(self):
+        midi_notes = c.from_hz(np.random.default_rng(24).uniform(30, 4000, 2000).round(3).tolist())['midi']
+
+        for (bend_range, allocation) in ((2.0, 'cycle'), (0.5, 'cycle'), (12.0, 'cycle'), (1.0, 'bend')):
+            notes = midi_notes if allocation == 'cycle' else [round(note * 4) / 4 for note in midi_notes]
+            result = rt.encode_bends(notes, bend_range, allocation=allocation)
+            events = smf.read_notes(smf_bytes(result['setup'], result['note_on']))
+
+            decoded = [event.midi for event in events]
+            np.testing.assert_allclose(decoded, notes, atol=0.5 * bend_range / 8192 + 0.0005)
+
+    def test_bend_allocation(self):
+        # Quarter tones use two bends and so two channels, however many notes
+        # sound together
+        result = rt.encode_bends(np.arange(48, 72, 0.5), channels=[3, 4, 5])
+        self.assertListEqual(np.unique(result['channel']).tolist(), [3, 4])
+        self.assertTrue((result['channel'][result['bend'] == 8192] == 4).all())
+
+        with self.assertRaises(ValueError):
+            rt.encode_bends(np.arange(48, 72, 0.1), channels=[3, 4, 5])
+
+    def test_bad_input(self):
+        for args in (([61.0], 0.0), ([61.0], 128), ([64.7], 0.25), ([float('nan')], 2.0), ([-3.0], 2.0)):
+            with self.assertRaises(ValueError):
+                rt.encode_bends(*args)
+
+        with self.assertRaises(ValueError):
+            rt.encode_bends([60.0], channels=[16])
+        with self.assertRaises(ValueError):
+            rt.encode_bends([60.0], allocation='lowest')
+        for velocity in (-1, 128, 300):
+            with self.assertRaises(ValueError):
+                rt.encode_bends([60.0], velocity=velocity)
+
+    def test_bend_range_messages(self):
+        self.assertEqual(rt.bend_range_messages([2], 2.5).tobytes().hex(' '), \
+            'b2 65 00 b2 64 00 b2 06 02 b2 26 32 b2 65 7f b2 64 7f')
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestEncodeMts(unittest.TestCase):
+    def test_tuning_data(self):
+        result = rt.encode_mts([69.0, 69.5, 60.25, 127.99999])
+        self.assertListEqual(result['key'].tolist(), [69, 70, 60, 127])
+        self.assertEqual(result['tuning'].tobytes().hex(' '), '45 45 00 00 46 45 40 00 3c 3c 20 00 7f 7f 7f 7e')
+        self.assertEqual(rt.encode_mts([127.9999])['tuning'].tobytes().hex(' '), '7f 7f 7f 7e')
+        self.assertEqual(result['sysex'].tobytes().hex(' '), \
+            'f0 7f 7f 08 02 00 04 ' + result['tuning'].tobytes().hex(' ') + ' f7')
+
+        tuning = result['tuning'].astype(np.int64)
+        decoded = tuning[:, 1] + (tuning[:, 2] * 128 + tuning[:, 3]) / 16384
+        np.testing.assert_allclose(decoded, result['midi'], atol=2 / 16384)
+
+    def test_splits_long_messages(self):
+        sysex = rt.encode_mts(np.full(300, 60.5), device=3, program=1)['sysex']
+        self.assertEqual(len(sysex), 3 * 8 + 4 * 300)
+        self.assertListEqual(np.flatnonzero(sysex == 0xF0).tolist(), [0, 516, 1032])
+        self.assertListEqual(sysex[[6, 522, 1038]].tolist(), [127, 127, 46])
+        self.assertListEqual(sysex[1032:1038].tolist(), [0xF0, 0x7F, 3, 8, 2, 1])
+        self.assertEqual(len(rt.encode_mts([])['sysex']), 0)
+
+    def test_bad_input(self):
+        for args in (([128.0],), ([-0.5],), ([60.0, 61.0], [60]), ([60.0], [128])):
+            with self.assertRaises(ValueError):
+                rt.encode_mts(*args)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import random
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+import hz_convert.scala as sc
+
+if np is not None:
+    import hz_convert.batch as b
+
+JUST_MAJOR = '''! just_major.scl
+!
+5-limit just major scale
+ 7
+!
+ 9/8
+ 5/4
+ 4/3
+ 3/2
+ 5/3
+ 15/8
+ 2/1
+'''
+
+EQUAL_12 = '''12-TET
+12
+''' + ''.join(' %i.0 cents\n' % (100 * i) for i in range(1, 13))
+
+# White keys only, degree 0 on middle C, and A4 (degree 5) at 440 Hz
+WHITE_KEYS = '''! white_keys.kbm
+12
+0
+127
+60
+69
+440.0
+7
+0
+x
+1
+x
+2
+3
+x
+4
+x
+5
+x
+6
+'''
+
+class TestParsing(unittest.TestCase):
+    def test_parse_scl(self):
+        scale = sc.parse_scl(JUST_MAJOR)
+        self.assertEqual(scale.description, '5-limit just major scale')
+        self.assertEqual(len(scale.cents), 7)
+        self.assertAlmostEqual(scale.cents[3], 701.955, places=3)
+        self.assertEqual(scale.cents[-1], 1200.0)
+        self.assertEqual(sc.parse_scl(EQUAL_12).cents[:2], [100.0, 200.0])
+
+    def test_parse_kbm(self):
+        keyboard_map = sc.parse_kbm(WHITE_KEYS)
+        self.assertEqual(keyboard_map.ref_hz, 440.0)
+        self.assertEqual(keyboard_map.octave_degree, 7)
+        self.assertListEqual(keyboard_map.mapping, [0, None, 1, None, 2, 3, None, 4, None, 5, None, 6])
+
+    def test_rejects_bad_files(self):
+        with self.assertRaisesRegex(ValueError, 'expected 3 notes, found 1'):
+            sc.parse_scl('short\n3\n9/8\n')
+
+        with self.assertRaisesRegex(ValueError, 'not a cents value or ratio'):
+            sc.parse_scl('bad\n1\nthree halves\n')
+
+        with self.assertRaisesRegex(ValueError, 'ratios must be positive'):
+            sc.parse_scl('bad\n1\n-2/1\n')
+
+        with self.assertRaisesRegex(ValueError, 'header needs seven numbers'):
+            sc.parse_kbm('12\n0\n127\n')
+
+class TestScaleTable(unittest.TestCase):
+    def test_equal_temperament_matches_midi(self):
+        table = sc.ScaleTable(sc.parse_scl(EQUAL_12))
+        self.assertEqual(table.key_to_hz(60), c.one_midi_to_hz(60, 440.0))
+
+        random.seed(0)
+        for _ in range(1000):
+            midi_note = round(random.uniform(0.5, 126.5), 2)
+            if abs(midi_note % 1 - 0.5) < 0.02: # Hz rounding can tip halfway values either way
+                continue
+            (key, degree, cents_dev) = table.nearest(c.one_midi_to_hz(midi_note, 440.0))
+            self.assertEqual(key, round(midi_note))
+            self.assertEqual(degree, round(midi_note) % 12)
+            self.assertAlmostEqual(cents_dev, c.get_cents_dev(midi_note, round(midi_note)), delta=0.15)
+
+    def test_just_intonation(self):
+        table = sc.ScaleTable(sc.parse_scl(JUST_MAJOR), sc.parse_kbm(WHITE_KEYS))
+        self.assertEqual(len(table), 75)
+        self.assertEqual(table.key_to_hz(69), 440.0)
+        self.assertEqual(table.key_to_hz(60), 264.0)
+        self.assertEqual(table.key_to_hz(67), 396.0)
+
+        result = table.from_hz('264 392 277')
+        self.assertListEqual(result['key'], [60, 67, 60])
+        self.assertListEqual(result['degree'], [0, 4, 0])
+        self.assertListEqual(result['cents_dev'], [0.0, -17.6, 83.2])
+
+        with self.assertRaisesRegex(ValueError, 'not mapped'):
+            table.key_to_hz(61)
+
+    def test_clamps_to_keyboard_range(self):
+        table = sc.ScaleTable(sc.parse_scl(EQUAL_12))
+        self.assertEqual(table.nearest(1.0)[0], 0)
+        self.assertEqual(table.nearest(30000.0)[0], 127)
+
+        with self.assertRaisesRegex(ValueError, 'greater than 0'):
+            table.nearest(0)
+
+    def test_load_scale_caches_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'scale.scl')
+            with open(path, 'w') as f:
+                f.write(JUST_MAJOR)
+
+            table = sc.load_scale(path)
+            self.assertIs(sc.load_scale(path), table)
+            self.assertIsNot(sc.load_scale(path, a4_hz=415), table)
+
+            with open(path, 'w') as f:
+                f.write(EQUAL_12)
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(len(sc.load_scale(path).scale.cents), 12)
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBatchScale(unittest.TestCase):
+    def test_matches_scalar(self):
+        random.seed(0)
+        table = sc.ScaleTable(sc.parse_scl(JUST_MAJOR), sc.parse_kbm(WHITE_KEYS))
+        hzs = [random.uniform(1, 20000) for _ in range(5000)] + [table.key_to_hz(60) * 1.0001, 1e-3, 1e6]
+
+        expected = table.from_hz(hzs)
+        result = b.batch_from_scale(hzs, table)
+
+        for column in ('key', 'degree', 'cents_dev'):
+            self.assertListEqual(result[column].tolist(), expected[column])
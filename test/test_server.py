@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+
+if np is not None:
+    import hz_convert.server as srv
+
+NEW_A4 = 423.519
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBatcher(unittest.TestCase):
+    def test_coalesces_concurrent_requests(self):
+        async def run():
+            batcher = srv.Batcher(window=0.01)
+            results = await asyncio.gather(
+                batcher.convert('midi', [60, 69]),
+                batcher.convert('midi', [22.5]),
+                batcher.convert('midi', [69], NEW_A4))
+            return batcher, results
+
+        batcher, results = asyncio.run(run())
+
+        self.assertEqual(batcher.stats.batches, 2)
+        self.assertListEqual([result['hz'] for result in results], [[261.626, 440.0], [29.989], [NEW_A4]])
+        self.assertListEqual(results[1]['pitch'], ['Bb0 (+50.0 c)'])
+
+    def test_flushes_at_max_batch(self):
+        async def run():
+            batcher = srv.Batcher(window=60, max_batch=3)
+            results = await asyncio.gather(batcher.convert('hz', [440, 220]), batcher.convert('hz', [110]))
+            return batcher, results
+
+        batcher, results = asyncio.run(run())
+
+        self.assertEqual(batcher.stats.batches, 1)
+        self.assertListEqual([result['midi'] for result in results], [[69.0, 57.0], [45.0]])
+
+    def test_isolates_bad_requests(self):
+        async def run():
+            batcher = srv.Batcher(window=0.01)
+            return await asyncio.gather(
+                batcher.convert('hz', [440]),
+                batcher.convert('hz', [-1]),
+                return_exceptions=True)
+
+        good, bad = asyncio.run(run())
+
+        self.assertEqual(good['midi'], [69.0])
+        self.assertIsInstance(bad, ValueError)
+
+    def test_fails_every_request_on_unexpected_errors(self):
+        def convert(values, a4_hz):
+            raise ZeroDivisionError('float division by zero')
+
+        async def run():
+            batcher = srv.Batcher(window=0.01)
+            return await asyncio.gather(
+                batcher.convert('hz', [440]),
+                batcher.convert('hz', [220]),
+                return_exceptions=True)
+
+        with mock.patch.dict(srv.CONVERTERS, {'hz': convert}):
+            results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(result, ZeroDivisionError) for result in results))
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestConversionServer(unittest.TestCase):
+    async def exchange(self, rounds, path=None, max_batch=srv.MAX_BATCH if np is not None else None):
+        # Each round of lines is sent at once, and its replies are read before
+        # the next round is sent
+        server = srv.ConversionServer(window=0.005, max_batch=max_batch)
+        listener = await server.start(port=0, path=path)
+
+        if path is None:
+            reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2], limit=2**24)
+        else:
+            reader, writer = await asyncio.open_unix_connection(path, limit=2**24)
+
+        replies = []
+        for lines in rounds:
+            writer.write(''.join(line + '\n' for line in lines).encode())
+            await writer.drain()
+            replies += [(await reader.readline()).decode().rstrip('\n') for _ in lines]
+
+        writer.write_eof()
+        await reader.read()
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+
+        return replies
+
+    def test_json_requests(self):
+        replies = asyncio.run(self.exchange([[
+            json.dumps({'id': 1, 'from': 'pitch', 'values': ['An4', 'Cn4'], 'a4': NEW_A4}),
+            json.dumps({'id': 2, 'from': 'hz', 'values': [0]})
+        ], [
+            json.dumps({'id': 3, 'stats': True})
+        ]]))
+        replies = [json.loads(reply) for reply in replies]
+
+        self.assertEqual(replies[0]['id'], 1)
+        self.assertListEqual(replies[0]['hz'], [NEW_A4, c.one_midi_to_hz(60.0, NEW_A4)])
+        self.assertEqual(replies[1], {'id': 2, 'error': 'Hz values must be greater than 0 and finite (bad value at index 0).'})
+        self.assertEqual(replies[2]['stats']['requests'], 2)
+        self.assertEqual(replies[2]['stats']['errors'], 1)
+
+    def test_line_protocol(self):
+        replies = asyncio.run(self.exchange([['midi 69 22.5', 'hz a4=423.519 423.519', 'volume 3'], ['stats']]))
+
+        self.assertEqual(replies[0], '440.0,69.0,A4 (+0.0 c)\t29.989,22.5,Bb0 (+50.0 c)')
+        self.assertEqual(replies[1], '423.519,69.0,A4 (+0.0 c)')
+        self.assertTrue(replies[2].startswith('error Input type must be one of'))
+        self.assertEqual(json.loads(replies[3])['values'], 3)
+
+    def test_rejects_bad_a4(self):
+        replies = asyncio.run(self.exchange([[
+            json.dumps({'from': 'hz', 'values': [440], 'a4': 0}),
+            'hz a4=nan 440',
+            'midi a4=-440 60',
+            'midi 69'
+        ]]))
+
+        self.assertEqual(json.loads(replies[0]), {'error': 'A4 must be greater than 0 and finite.'})
+        self.assertEqual(replies[1], 'error A4 must be greater than 0 and finite.')
+        self.assertEqual(replies[2], 'error A4 must be greater than 0 and finite.')
+        self.assertEqual(replies[3], '440.0,69.0,A4 (+0.0 c)')
+
+    def test_long_requests(self):
+        # 10000 values fit the default limit; a request beyond the limit of a
+        # small server gets an error and the connection carries on
+        values = [round(random.uniform(20, 2000), 3) for _ in range(10000)]
+        replies = asyncio.run(self.exchange([[json.dumps({'id': 1, 'from': 'hz', 'values': values})]]))
+        self.assertEqual(len(json.loads(replies[0])['midi']), 10000)
+
+        replies = asyncio.run(self.exchange([
+            [json.dumps({'from': 'hz', 'values': values})],
+            ['midi ' + ' '.join(['60.5'] * 20000)],
+            ['midi 69']
+        ], max_batch=16))
+
+        self.assertEqual(json.loads(replies[0]), {'error': 'Requests must be shorter than 65536 bytes.'})
+        self.assertEqual(replies[1], 'error Requests must be shorter than 65536 bytes.')
+        self.assertEqual(replies[2], '440.0,69.0,A4 (+0.0 c)')
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), 'Unix sockets are not available.')
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            replies = asyncio.run(self.exchange([['midi 69']], path=os.path.join(tmp, 'hz.sock')))
+        self.assertEqual(replies, ['440.0,69.0,A4 (+0.0 c)'])
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+
+import hz_convert.converters as c
+from hz_convert import smf
+
+def varlen(value):
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        encoded.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(encoded))
+
+def track(*events):
+    # events are (delta, message bytes) pairs
+    body = b''.join(varlen(delta) + bytes(message) for delta, message in events) + b'\x00\xff\x2f\x00'
+    return b'MTrk' + len(body).to_bytes(4, 'big') + body
+
+def midi_file(*tracks, file_format=1, division=480):
+    header = b'MThd' + (6).to_bytes(4, 'big') + file_format.to_bytes(2, 'big') + \
+        len(tracks).to_bytes(2, 'big') + division.to_bytes(2, 'big')
+    return header + b''.join(tracks)
+
+def bend(channel, value):
+    return [0xE0 | channel, value & 0x7F, value >> 7]
+
+class TestReadNotes(unittest.TestCase):
+    def test_notes_and_running_status(self):
+        data = midi_file(track(
+            (0, [0x90, 60, 100]),
+            (240, [64, 90]),           # running status
+            (240, [60, 0]),            # note-on with velocity 0 ends the note
+            (0, [0xC1, 5]),            # program change, skipped
+            (0, [0x90, 64, 0]),
+            (480, [0x80, 67, 64])
+        ))
+        events = list(smf.read_notes(data))
+
+        self.assertListEqual([(event.tick, event.key, event.velocity) for event in events], \
+            [(0, 60, 100), (240, 64, 90), (480, 60, 0), (480, 64, 0), (960, 67, 0)])
+        self.assertListEqual([event.time for event in events], [0.0, 0.25, 0.5, 0.5, 1.0])
+        self.assertListEqual([event.midi for event in events], [60.0, 64.0, 60.0, 64.0, 67.0])
+
+    def test_pitch_bend_and_range(self):
+        data = midi_file(track(
+            (0, bend(0, 12288)),                   # +1 semitone with the default range
+            (0, [0x90, 60, 100]),
+            (0, [0xB0, 101, 0]), (0, [100, 0]),    # RPN 0: bend range
+            (0, [6, 1]), (0, [38, 50]),            # 1.5 semitones
+            (0, [0x90, 62, 100]),
+            (0, bend(0, 0)),
+            (0, [0x90, 64, 100]),
+            (0, [0x91, 64, 100]),                  # other channels are not bent
+            (0, [0xB0, 121, 0]),                   # reset all controllers
+            (0, [0x90, 65, 100])
+        ))
+
+        self.assertListEqual([event.midi for event in smf.read_notes(data)], [61.0, 62.75, 62.5, 64.0, 65.0])
+
+    def test_tracks_merge_by_tick(self):
+        data = midi_file(
+            track((0, [0xFF, 0x51, 3, 0x0F, 0x42, 0x40]), (960, [0xFF, 0x51, 3, 0x03, 0xD0, 0x90])),
+            track((480, [0x90, 60, 100]), (960, [0x90, 62, 100])),
+            track((0, [0xF0, 2, 0x7E, 0xF7]), (960, [0x92, 61, 100]))
+        )
+        events = list(smf.read_notes(data))
+
+        self.assertListEqual([(event.tick, event.track, event.key) for event in events], \
+            [(480, 1, 60), (960, 2, 61), (1440, 1, 62)])
+
+        # 1 s per quarter note until tick 960, then 0.25 s
+        self.assertListEqual([event.time for event in events], [1.0, 2.0, 2.25])
+
+    def test_format_2_plays_tracks_in_turn(self):
+        data = midi_file(track((480, [0x90, 60, 100])), track((480, [0x90, 62, 100])), file_format=2)
+        self.assertListEqual([event.tick for event in smf.read_notes(data)], [480, 960])
+
+    def test_smpte_division(self):
+        # 25 frames per second, 40 ticks per frame: 1 ms per tick
+        data = midi_file(track((500, [0x90, 60, 100])), division=0xE728)
+        self.assertListEqual([event.time for event in smf.read_notes(data)], [0.5])
+
+    def test_bad_files(self):
+        for data in (b'', b'RIFF' + bytes(10), midi_file(track((0, [60, 100]))), \
+                midi_file(track((0, [0x90, 60, 100])))[:-6]):
+            with self.assertRaises(ValueError):
+                list(smf.read_notes(data))
+
+    def test_reads_paths(self):
+        data = midi_file(track((0, [0x90, 69, 100])))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'a.mid')
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.assertListEqual(list(smf.read_notes(path)), list(smf.read_notes(data)))
+
+            open(path, 'wb').close()
+            with self.assertRaises(ValueError):
+                list(smf.read_notes(path))
+
+class TestConvertNotes(unittest.TestCase):
+    def test_chunks_match_from_midi(self):
+        messages = [(0, bend(3, 8192 + 1024))]
+        messages += [(10, [0x93, key, 100]) for key in range(40, 90)]
+        data = midi_file(track(*messages))
+
+        chunks = list(smf.convert_notes(data, a4_hz=442.0, chunk_size=16))
+        self.assertListEqual([len(chunk['events']) for chunk in chunks], [16, 16, 16, 2])
+
+        midi_notes = [key + 0.25 for key in range(40, 90)]
+        expected = c.from_midi(midi_notes, 442.0)
+        self.assertListEqual(sum([chunk['midi'] for chunk in chunks], []), midi_notes)
+        self.assertListEqual(sum([chunk['hz'] for chunk in chunks], []), expected['hz'])
+        self.assertListEqual(sum([chunk['pitch_names'] for chunk in chunks], []), expected['pitch_names'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.converters as c
+
+if np is not None:
+    import hz_convert.spectrum as sp
+
+SAMPLE_RATE = 44100
+FFT_SIZE = 4096
+
+def tone_frame(hz, fft_size=FFT_SIZE):
+    # Magnitudes in dB of a Hann-windowed sine
+    t = np.arange(fft_size) / SAMPLE_RATE
+    spectrum = np.fft.rfft(np.sin(2 * np.pi * hz * t) * np.hanning(fft_size))
+    return 20 * np.log10(np.abs(spectrum) + 1e-12)
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBinMapper(unittest.TestCase):
+    def setUp(self):
+        self.mapper = sp.BinMapper(SAMPLE_RATE, FFT_SIZE, a4_hz=442.0)
+
+    def test_tables_match_scalar(self):
+        self.assertEqual(len(self.mapper.midi), FFT_SIZE // 2 + 1)
+        self.assertTrue(np.isnan(self.mapper.midi[0]))
+
+        result = c.from_hz(self.mapper.hz[1:], a4_hz=442.0)
+        self.assertListEqual(self.mapper.midi[1:].tolist(), result['midi'])
+        self.assertListEqual(self.mapper.bins(range(1, FFT_SIZE // 2 + 1))['pitch'].names(), result['pitch_names'])
+
+    def test_bins(self):
+        result = self.mapper.bins([41, 1000])
+        self.assertListEqual(result['hz'].tolist(), [41 * SAMPLE_RATE / FFT_SIZE, 1000 * SAMPLE_RATE / FFT_SIZE])
+        self.assertListEqual(result['pitch'].names(), c.from_hz(result['hz'], 442.0)['pitch_names'])
+
+        for bad_bins in ([0], [FFT_SIZE // 2 + 1]):
+            with self.assertRaises(ValueError):
+                self.mapper.bins(bad_bins)
+
+    def test_spelling(self):
+        mapper = sp.BinMapper(SAMPLE_RATE, FFT_SIZE, spelling='flats')
+        hzs = mapper.hz[1:].tolist()
+        self.assertListEqual(mapper.bins(range(1, len(hzs) + 1))['pitch'].names(), \
+            c.from_hz(hzs, spelling='flats')['pitch_names'])
+
+    def test_interpolated_peaks(self):
+        tones = [440.0, 261.63, 1234.5]
+        frames = np.stack([tone_frame(hz) for hz in tones], axis=1)
+        result = sp.BinMapper(SAMPLE_RATE, FFT_SIZE).peaks(frames, threshold=20)
+
+        self.assertListEqual(result['frame'].tolist(), [0, 1, 2])
+        for hz, peak_hz in zip(tones, result['hz']):
+            # Far closer than the 10.8 Hz bin spacing
+            self.assertLess(abs(peak_hz - hz), 0.5)
+        self.assertListEqual([name[:3] for name in result['pitch'].names()], ['A4 ', 'C4 ', 'Eb6'])
+        self.assertTrue((np.abs(result['offset']) <= 0.5).all())
+
+        expected = c.from_hz(result['hz'])
+        self.assertListEqual(result['midi'].tolist(), expected['midi'])
+        self.assertListEqual(result['pitch'].names(), expected['pitch_names'])
+
+    def test_peak_order_and_shapes(self):
+        magnitudes = np.zeros((9, 2))
+        magnitudes[[2, 5], 0] = 1.0
+        magnitudes[3, 1] = 2.0
+        magnitudes[[2, 4], 1] = 1.0
+
+        mapper = sp.BinMapper(800, 16)
+        result = mapper.peaks(magnitudes)
+        self.assertListEqual(result['frame'].tolist(), [0, 0, 1])
+        self.assertListEqual(result['bin'].tolist(), [2, 5, 3])
+        self.assertListEqual(result['offset'].tolist(), [0.0, 0.0, 0.0])
+        self.assertListEqual(result['hz'].tolist(), [100.0, 250.0, 150.0])
+
+        self.assertListEqual(mapper.peaks(magnitudes[:, 1])['bin'].tolist(), [3])
+        self.assertEqual(len(mapper.peaks(magnitudes, threshold=1.5)['bin']), 1)
+
+        with self.assertRaises(ValueError):
+            mapper.peaks(np.zeros((8, 2)))
+
+    def test_silent_neighbours(self):
+        magnitudes = np.full(9, -np.inf)
+        magnitudes[4] = -10.0
+        result = sp.BinMapper(800, 16).peaks(magnitudes)
+        self.assertListEqual(result['offset'].tolist(), [0.0])
+        self.assertListEqual(result['magnitude'].tolist(), [-10.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import random
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.cache as cache
+import hz_convert.converters as c
+from hz_convert.spelling import Spelling, DEFAULT, get_spelling, key_fifths
+from hz_convert.tuning import edo
+
+if np is not None:
+    import hz_convert.batch as b
+
+POLICIES = ('default', 'sharps', 'flats', 'Eb', 'F#m', 'C#', 'Cb', -7, 7)
+
+class TestSpelling(unittest.TestCase):
+    def test_default_matches_assign_name(self):
+        self.assertListEqual([DEFAULT.spell(pc) for pc in range(12)], [c.assign_name(pc) for pc in range(12)])
+        self.assertTupleEqual(DEFAULT.octave_offsets, (0,) * 12)
+
+    def test_policies(self):
+        self.assertListEqual([''.join(get_spelling('sharps').spell(pc)) for pc in (1, 3, 10)], ['C#', 'D#', 'A#'])
+        self.assertListEqual([''.join(get_spelling('flats').spell(pc)) for pc in (1, 6, 8)], ['Db', 'Gb', 'Ab'])
+
+    def test_keys(self):
+        self.assertListEqual([key_fifths(key) for key in ('C', 'Am', 'A', 'Eb', 'Cm', 'F#m', 'Cb')], \
+            [0, 0, 3, -3, -3, 3, -7])
+        self.assertEqual(get_spelling('Eb'), get_spelling(-3))
+        self.assertIs(get_spelling('Eb'), get_spelling('Eb'))
+
+        # E major spells its leading tone D#, E minor its sixth C
+        self.assertTupleEqual(get_spelling('E').spell(3), ('D', '#'))
+        self.assertTupleEqual(get_spelling('Em').spell(0), ('C', ''))
+
+    def test_double_accidentals_and_octave_offsets(self):
+        spelling = get_spelling('C#')
+        self.assertTupleEqual(spelling.names[0], ('B', '#', -1))
+        self.assertTupleEqual(spelling.names[7], ('F', 'x', 0))
+        self.assertTupleEqual(get_spelling('Cb').names[11], ('C', 'b', 1))
+        self.assertTupleEqual(Spelling(-15).names[3], ('F', 'd', 0))
+
+    def test_bad_policies(self):
+        for policy in ('H', 'Ebb', '', 'minor', None, 20):
+            with self.assertRaises(ValueError):
+                get_spelling(policy)
+
+class TestSpelledConversions(unittest.TestCase):
+    def test_from_midi(self):
+        self.assertListEqual(c.from_midi('61 70', spelling='flats')['pitch_names'], ['Db4 (+0.0 c)', 'Bb4 (+0.0 c)'])
+        self.assertListEqual(c.from_midi('60 71.6', spelling='C#')['pitch_names'], ['B#3 (+0.0 c)', 'B#4 (-40.0 c)'])
+        self.assertListEqual(c.from_hz([493.883], spelling='Cb')['pitch_names'], ['Cb5 (+0.0 c)'])
+
+    def test_octave_follows_nearest_pitch(self):
+        # 71.6 rounds to C5, not to a C in the octave of 71
+        self.assertListEqual(c.from_midi('71.6 59.5 47.5')['pitch_names'], \
+            ['C5 (-40.0 c)', 'C4 (-50.0 c)', 'C3 (-50.0 c)'])
+
+    def test_spelled_names_parse_back(self):
+        for policy in POLICIES:
+            midi_notes = [float(note) for note in range(12, 116)]
+            names = [name.split(' ')[0] for name in c.from_midi(midi_notes, spelling=policy)['pitch_names']]
+            self.assertListEqual(c.from_pitch(names)['midi'], midi_notes, policy)
+
+    def test_other_tunings(self):
+        self.assertEqual(edo(19).step_to_pitch(104, get_spelling('flats')).name, 'Gb4 (-15.8 c)')
+        self.assertListEqual(c.from_midi([104], tuning=edo(19), spelling='flats')['pitch_names'], ['Gb4 (-15.8 c)'])
+
+    def test_cache_keeps_spellings_apart(self):
+        cache.enable_cache()
+        try:
+            self.assertListEqual(c.from_midi('61 61')['pitch_names'], ['C#4 (+0.0 c)'] * 2)
+            self.assertListEqual(c.from_midi('61 61', spelling='flats')['pitch_names'], ['Db4 (+0.0 c)'] * 2)
+        finally:
+            cache.disable_cache()
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBatchSpelling(unittest.TestCase):
+    def test_matches_scalar(self):
+        rng = random.Random(21)
+        midi_notes = [round(rng.uniform(0, 127), 2) for _ in range(500)] + [71.6, 59.5, 0.5, 127.0]
+
+        for policy in POLICIES:
+            expected = c.from_midi(midi_notes, spelling=policy)
+            result = b.batch_from_midi(midi_notes, spelling=policy)
+            self.assertListEqual(result['pitch'].names(), expected['pitch_names'], policy)
+            self.assertListEqual(result['octave'].tolist(), [pitch.octave for pitch in expected['pitch']])
+
+            hzs = [round(rng.uniform(30, 4000), 3) for _ in range(50)]
+            self.assertListEqual(b.batch_from_hz(hzs, spelling=policy)['pitch'].names(), \
+                c.from_hz(hzs, spelling=policy)['pitch_names'])
+
+    def test_other_tunings(self):
+        steps = list(range(60, 140))
+        for policy in ('flats', 'C#'):
+            self.assertListEqual(b.batch_from_midi(steps, tuning=edo(19), spelling=policy)['pitch'].names(), \
+                c.from_midi(steps, tuning=edo(19), spelling=policy)['pitch_names'])
+
+
+if __name__ == '__main__':
+    unittest.main()
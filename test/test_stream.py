@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from io import StringIO
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    import hz_convert.stream as st
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestReaders(unittest.TestCase):
+    def test_read_tokens_across_chunk_boundaries(self):
+        text = '440 261.626\n\n 29.989\t5 1000'
+        for read_size in (1, 2, 3, 7, 100):
+            tokens = list(st.read_tokens(StringIO(text), read_size))
+            self.assertListEqual(tokens, ['440', '261.626', '29.989', '5', '1000'])
+
+    def test_read_fields(self):
+        stream = StringIO('0.0, 440\n\n0.1 220\n')
+        self.assertListEqual(list(st.read_fields(stream, 2)), ['440', '220'])
+
+    def test_read_fields_missing_field(self):
+        with self.assertRaisesRegex(ValueError, 'Line 2 has no field 2'):
+            list(st.read_fields(StringIO('0.0 440\n0.1\n'), 2))
+
+    def test_chunked(self):
+        chunks = list(st.chunked(iter(range(7)), 3))
+        self.assertListEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestMain(unittest.TestCase):
+    def run_main(self, argv, stdin=''):
+        with mock.patch('sys.stdin', new=StringIO(stdin)), \
+                mock.patch('sys.stdout', new=StringIO()) as mock_stdout, \
+                mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            code = st.main(argv)
+        return code, mock_stdout.getvalue(), mock_stderr.getvalue()
+
+    def test_csv_from_stdin(self):
+        code, out, _ = self.run_main(['-f', 'midi', '--chunk-size', '2'], '69\n62 22.5\n')
+        self.assertEqual(code, 0)
+        self.assertListEqual(out.splitlines(), [
+            'hz,midi,pitch',
+            '440.0,69.0,A4 (+0.0 c)',
+            '293.665,62.0,D4 (+0.0 c)',
+            '29.989,22.5,Bb0 (+50.0 c)'
+        ])
+
+    def test_tsv_columns_and_a4(self):
+        code, out, _ = self.run_main(['-f', 'pitch', '-o', 'tsv', '-c', 'input,hz', '-a', '423.519', '--no-header'], 'An4 Cn4')
+        self.assertEqual(code, 0)
+        self.assertEqual(out, 'An4\t423.519\nCn4\t251.826\n')
+
+    def test_jsonl_from_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, name) for name in ('a.txt', 'b.txt')]
+            for path, text in zip(paths, ('0.0,440\n', '0.1,880\n')):
+                with open(path, 'w') as f:
+                    f.write(text)
+
+            code, out, _ = self.run_main(['-f', 'hz', '--field', '2', '-o', 'jsonl', '-c', 'midi,octave'] + paths)
+
+        self.assertEqual(code, 0)
+        self.assertListEqual([json.loads(line) for line in out.splitlines()],
+            [{'midi': 69.0, 'octave': 4}, {'midi': 81.0, 'octave': 5}])
+
+    def test_reports_errors(self):
+        code, _, err = self.run_main(['-f', 'hz'], '440 -3')
+        self.assertEqual(code, 1)
+        self.assertIn('[error] Hz values must be greater than 0 and finite (bad value at index 1).', err)
+
+        code, _, err = self.run_main(['-f', 'hz', '--chunk-size', '2'], '440 441 442 0 443')
+        self.assertIn('[error] Hz values must be greater than 0 and finite (bad value at index 3).', err)
+
+        code, _, err = self.run_main(['-f', 'midi', '--chunk-size', '3'], '60 61 62 x 64 y')
+        self.assertIn('(bad values at indices 3, 5).', err)
+
+        code, _, err = self.run_main(['-f', 'hz', '-c', 'hz,volume'])
+        self.assertEqual(code, 1)
+        self.assertIn('[error] Output columns must be chosen from', err)
+
+        code, _, err = self.run_main(['-f', 'hz', 'no/such/file.txt'])
+        self.assertEqual(code, 1)
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'hz.txt')
+        with open(self.path, 'w') as f:
+            f.writelines('%.3f %.3f\n' % (20 + i * 1.7, 30 + i * 2.3) for i in range(500))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shards_start_on_line_boundaries(self):
+        shards = st.find_shards(self.path, 7)
+
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], os.path.getsize(self.path))
+        self.assertTrue(all(end == start for (_, end), (start, _) in zip(shards, shards[1:])))
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.assertTrue(all(data[start - 1:start] == b'\n' for start, _ in shards[1:]))
+
+    def test_more_shards_than_lines(self):
+        shards = st.find_shards(self.path, 2000)
+        self.assertEqual(len(shards), 500)
+
+    def test_workers_match_single_process(self):
+        argv = ['-f', 'hz', '-c', 'input,midi,pitch', '--chunk-size', '64', self.path]
+
+        with mock.patch('sys.stdout', new=StringIO()) as mock_stdout:
+            st.main(argv)
+        expected = mock_stdout.getvalue()
+
+        with mock.patch('hz_convert.stream.SHARD_SIZE', 512), \
+                mock.patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.assertEqual(st.main(argv + ['--workers', '3']), 0)
+
+        self.assertEqual(mock_stdout.getvalue(), expected)
+
+    def test_workers_report_positions_in_file(self):
+        with open(self.path, 'a') as f:
+            f.write('440 0\n')
+
+        with mock.patch('hz_convert.stream.SHARD_SIZE', 512), \
+                mock.patch('sys.stdout', new=StringIO()), mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            self.assertEqual(st.main(['-f', 'hz', '--chunk-size', '64', '--workers', '3', self.path]), 1)
+
+        self.assertIn('(bad value at index 1001).', mock_stderr.getvalue())
+
+    def test_workers_report_lines_in_file(self):
+        with open(self.path, 'a') as f:
+            f.write('440\n')
+
+        with mock.patch('hz_convert.stream.SHARD_SIZE', 512), \
+                mock.patch('sys.stdout', new=StringIO()), mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            self.assertEqual(st.main(['-f', 'hz', '--field', '2', '--workers', '3', self.path]), 1)
+
+        self.assertIn('[error] Line 501 has no field 2.', mock_stderr.getvalue())
+
+    def test_workers_require_files(self):
+        with mock.patch('sys.stderr', new=StringIO()) as mock_stderr:
+            self.assertEqual(st.main(['-f', 'hz', '--workers', '2']), 1)
+        self.assertIn('stdin cannot be split', mock_stderr.getvalue())
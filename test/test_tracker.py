@@ -0,0 +1,87 @@
+import math
+import unittest
+
+import hz_convert.converters as c
+import hz_convert.tracker as t
+
+def note_hz(midi_note, cents=0.0):
+    return 440.0 * 2**((midi_note - 69 + cents / 100) / 12)
+
+class TestPitchTracker(unittest.TestCase):
+    def test_frame_values_match_from_hz(self):
+        hzs = [261.6, 440.0, 445.0, 1000.0, 27.5]
+        tracker = t.PitchTracker(min_frames=1)
+        tracker.push_block(hzs)
+        (midi_notes, cents_devs) = tracker.recent_frames(len(hzs))
+
+        result = c.from_hz(hzs)
+        self.assertEqual(midi_notes, result['midi'])
+        self.assertEqual([round(cents, 1) for cents in cents_devs], [p.cents_dev for p in result['pitch']])
+
+    def test_segments_notes(self):
+        hzs = [note_hz(60, cents) for cents in (0, 10, -10, 5)] + [note_hz(64)] * 4 + [0.0] * 2 + [note_hz(67)] * 3
+        tracker = t.PitchTracker(tolerance=30, min_frames=3)
+        onsets = [tracker.push(hz) for hz in hzs]
+
+        self.assertEqual([onset for onset in onsets if onset >= 0], [0, 4, 10])
+        self.assertEqual(onsets.index(4), 6) # reported min_frames - 1 frames late
+
+        notes = tracker.notes()
+        self.assertEqual([(note.onset, note.frames) for note in notes], [(0, 4), (4, 4)])
+        self.assertAlmostEqual(notes[0].midi, 60.0125, places=3)
+        self.assertAlmostEqual(notes[1].midi, 64.0, places=3)
+        self.assertEqual(tracker.current_note().onset, 10)
+        self.assertEqual(tracker.current_note().frames, 3)
+
+    def test_absorbs_short_excursions(self):
+        # A one-frame octave error does not split the note
+        hzs = [note_hz(69)] * 3 + [note_hz(81)] + [note_hz(69)] * 3
+        tracker = t.PitchTracker(min_frames=2)
+
+        self.assertEqual(tracker.push_block(hzs), 1)
+        self.assertEqual(tracker.current_note(), t.TrackedNote(0, 7, 69.0))
+
+    def test_unvoiced_frames(self):
+        tracker = t.PitchTracker(min_frames=1)
+        tracker.push_block([440.0, math.nan, -1.0, math.inf, 440.0])
+        (midi_notes, cents_devs) = tracker.recent_frames(5)
+
+        self.assertTrue(math.isnan(midi_notes[1]) and math.isnan(cents_devs[2]) and math.isnan(midi_notes[3]))
+        self.assertEqual([(note.onset, note.frames) for note in tracker.notes()], [(0, 1)])
+        self.assertEqual(tracker.current_note().onset, 4)
+
+    def test_last_frame(self):
+        tracker = t.PitchTracker()
+        self.assertTrue(math.isnan(tracker.last_midi))
+
+        tracker.push(445.0)
+        self.assertEqual((tracker.last_midi, round(tracker.last_cents, 1)), (69.196, 19.6))
+
+        tracker.push(math.inf)
+        self.assertTrue(math.isnan(tracker.last_midi) and math.isnan(tracker.last_cents))
+
+    def test_ring_buffers_wrap(self):
+        tracker = t.PitchTracker(min_frames=1, frame_capacity=4, note_capacity=2)
+        for midi_note in range(60, 70):
+            tracker.push(note_hz(midi_note))
+
+        self.assertEqual(tracker.recent_frames(4)[0], [66.0, 67.0, 68.0, 69.0])
+        self.assertEqual([note.onset for note in tracker.notes()], [7, 8])
+        self.assertEqual(tracker.note_count, 9)
+        self.assertRaises(ValueError, tracker.recent_frames, 5)
+
+        tracker.reset()
+        self.assertEqual(tracker.notes(), [])
+        self.assertIsNone(tracker.current_note())
+
+    def test_a4_hz(self):
+        tracker = t.PitchTracker(a4_hz=415.0, min_frames=1)
+        tracker.push(415.0)
+        self.assertEqual(tracker.current_note().midi, 69.0)
+
+    def test_bad_arguments(self):
+        self.assertRaises(ValueError, t.PitchTracker, min_frames=0)
+        self.assertRaises(ValueError, t.PitchTracker, frame_capacity=0)
+
+if __name__ == '__main__':
+    unittest.main()
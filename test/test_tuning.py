@@ -0,0 +1,91 @@
+import random
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import hz_convert.cache as cache
+import hz_convert.converters as c
+from hz_convert.tuning import EqualTemperament, TWELVE_TET, edo
+
+if np is not None:
+    import hz_convert.batch as b
+
+NEW_A4 = 423.519
+DIVISIONS = (5, 19, 24, 31, 53)
+
+class TestEqualTemperament(unittest.TestCase):
+    def test_reference_steps(self):
+        self.assertListEqual([edo(n).ref_step for n in (12, 19, 24, 31, 53)], [69, 109, 138, 178, 305])
+        self.assertIs(edo(12), TWELVE_TET)
+        self.assertTrue(TWELVE_TET.standard)
+        self.assertEqual(edo(31), EqualTemperament(31))
+
+    def test_names_steps_from_a4(self):
+        tuning = edo(19)
+        self.assertEqual(tuning.step_to_pitch(109).name, 'A4 (+0.0 c)')
+        self.assertEqual(tuning.step_to_pitch(95).name, 'C4 (+15.8 c)')
+        self.assertEqual(tuning.step_to_pitch(96.5).name, 'C#4 (+10.5 c)')
+
+        # The top steps of 24-EDO's octave are named after the next C
+        self.assertEqual(edo(24).step_to_pitch(143).name, 'C5 (-50.0 c)')
+
+    def test_pitch_names_keep_their_frequency(self):
+        for divisions in DIVISIONS:
+            result = c.from_pitch('C4 A4 F(1/2)#2 Bb-1', NEW_A4, tuning=edo(divisions))
+            self.assertListEqual(result['hz'], c.from_pitch('C4 A4 F(1/2)#2 Bb-1', NEW_A4)['hz'])
+
+    def test_round_trips(self):
+        tuning = edo(31)
+        result = c.from_hz([440.0, 261.626, 1000.0], tuning=tuning)
+        self.assertListEqual(result['midi'], [178.0, 154.75, 214.717])
+        self.assertListEqual(result['pitch_names'], ['A4 (+0.0 c)', 'C4 (+0.0 c)', 'B5 (+21.3 c)'])
+        self.assertListEqual(c.from_midi([178, 154.75], tuning=tuning)['hz'], [440.0, 261.626])
+
+        result = c.from_pitch('C4 B5', tuning=tuning)
+        self.assertListEqual(result['midi'], [154.75, 214.167])
+        self.assertListEqual(c.from_midi(result['midi'], tuning=tuning)['pitch_names'], ['C4 (+0.0 c)', 'B5 (+0.0 c)'])
+
+    def test_standard_tuning_uses_midi_paths(self):
+        midi_notes = [60.2, 24.33, 70]
+        self.assertEqual(c.from_midi(midi_notes, tuning=TWELVE_TET), c.from_midi(midi_notes))
+
+    def test_cache_keeps_tunings_apart(self):
+        conversion_cache = cache.enable_cache()
+        try:
+            self.assertListEqual(c.from_hz([440.0, 440.0], tuning=edo(19))['midi'], [109.0, 109.0])
+            self.assertListEqual(c.from_hz([440.0], tuning=edo(24))['midi'], [138.0])
+            self.assertListEqual(c.from_hz([440.0])['midi'], [69.0])
+            self.assertEqual(conversion_cache.info().misses, 6)
+        finally:
+            cache.disable_cache()
+
+    def test_rejects_bad_divisions(self):
+        for divisions in (0, 12.0, '19'):
+            with self.assertRaisesRegex(ValueError, 'positive integer'):
+                EqualTemperament(divisions)
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBatchTuning(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def test_batch_matches_scalar(self):
+        hzs = [random.uniform(5, 20000) for _ in range(2000)]
+        pitch_strs = [random.choice('CDEFGAB') + random.choice(['', 'b', '#', '(1/3)#', '(1/2)b']) + \
+            str(random.randint(-1, 9)) for _ in range(2000)]
+
+        for divisions in DIVISIONS:
+            tuning = edo(divisions)
+            steps = [round(random.uniform(-10, 12 * divisions), random.choice([0, 1, 3])) for _ in range(2000)]
+
+            for convert, batch_convert, values in ((c.from_hz, b.batch_from_hz, hzs), \
+                    (c.from_midi, b.batch_from_midi, steps), (c.from_pitch, b.batch_from_pitch, pitch_strs)):
+                expected = convert(values, NEW_A4, tuning=tuning)
+                result = batch_convert(values, NEW_A4, tuning=tuning)
+
+                self.assertListEqual(result['hz'].tolist(), [float(hz) for hz in expected['hz']])
+                self.assertListEqual(result['midi'].tolist(), [float(step) for step in expected['midi']])
+                self.assertListEqual(result['pitch'].names(), [pitch.name for pitch in expected['pitch']])